@@ -0,0 +1,153 @@
+# app/core/compression.py
+"""
+Response Compression
+
+CompressionMiddleware compresses HTTP responses for clients that send a
+matching Accept-Encoding header. Brotli ("br") is preferred when the Brotli
+package is installed, gzip otherwise.
+
+Only responses that are worth it are compressed:
+
+- the whole body is sent in one message; streamed responses (the NDJSON
+  /stream endpoint, StreamingResponse) pass through unchanged, so nothing
+  is held back from the client
+- the body is at least minimum_size bytes; a small JSON result would come
+  out larger once compression headers are added
+- the content type is text (HTML, JSON, JavaScript, Prometheus metrics, ...)
+- the response has no Content-Encoding yet, e.g. the precompressed landing
+  page served by app.core.static_pages
+
+Starlette's GZipMiddleware is not used because it has no brotli support and
+compresses streamed responses chunk by chunk.
+"""
+
+import gzip
+from typing import Iterable, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - Brotli is in requirements.txt
+    brotli = None
+
+# Content codings the server can produce, most preferred first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Content types that are compressed (prefixes), plus any "+json"/"+xml" type
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def negotiate_encoding(accept_encoding: str, available: Sequence[str] = ENCODINGS) -> Optional[str]:
+    """
+    Return the first of the available encodings that an Accept-Encoding
+    header allows, or None to send the response uncompressed.
+
+    The server's order of preference wins over the client's q-values; a
+    coding with q=0 is refused, and "*" stands for any coding not listed.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Compress body with "br" or "gzip".
+
+    level is the brotli quality (0-11, default 4) or the gzip level (1-9,
+    default 6); the defaults suit per-request compression, build-time
+    assets use the maximum. gzip output has no timestamp, so the same body
+    always gives the same bytes.
+    """
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("Brotli compression needs the Brotli package.")
+        return brotli.compress(body, quality=4 if level is None else level)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6 if level is None else level, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def is_compressible(content_type: str) -> bool:
+    """Whether a response with this Content-Type should be compressed."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES) or media_type.endswith(("+json", "+xml"))
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete, text responses of at least
+    minimum_size bytes with brotli or gzip.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, encodings: Iterable[str] = ENCODINGS):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(encodings)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            # First body message: decide once for the whole response
+            passthrough = True
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
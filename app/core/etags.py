@@ -0,0 +1,51 @@
+# app/core/etags.py
+"""
+ETags and Conditional Requests
+
+Helpers for answering If-None-Match requests with 304 Not Modified:
+
+- weak_etag() builds a weak ETag (W/"...") from the values that identify a
+  version of a resource, e.g. a calculation's id and updated_at. Weak
+  ETags only promise equivalent content, not identical bytes, so the same
+  ETag stays valid whether or not the response was compressed.
+- etag_matches() compares an If-None-Match header with a resource's
+  current ETags using the weak comparison that RFC 9110 prescribes for
+  If-None-Match.
+
+The routes compute the version values with a query that only reads them,
+so a matching request is answered without loading or encoding the
+resource itself.
+"""
+
+import hashlib
+from typing import Any, Iterable
+
+
+def weak_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from the string forms of parts.
+
+    The parts are hashed, so the ETag does not expose them and has a fixed
+    length however many there are (e.g. one per calculation on a page).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\x1f")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    """The quoted part of an ETag, without the weak indicator."""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: str, etags: Iterable[str]) -> bool:
+    """
+    Whether an If-None-Match header matches any of etags (or is "*").
+    """
+    tags = {_opaque_tag(tag) for tag in if_none_match.split(",")}
+    if "*" in tags:
+        return True
+    return any(_opaque_tag(etag) in tags for etag in etags)
@@ -0,0 +1,141 @@
+# app/core/metrics.py
+"""
+Prometheus Metrics
+
+This module defines the application's Prometheus metrics and an ASGI
+middleware that records them for every HTTP request:
+
+- http_requests_total: requests per method, route and status code
+- http_request_duration_seconds: latency histogram with the same labels
+- http_requests_in_flight: requests currently being handled
+- operation_errors_total: failed arithmetic operations (e.g. divide by zero)
+- validation_errors_total: requests rejected by request validation
+
+Routes are labelled by their path template (e.g. /calculations/{calculation_id})
+rather than the raw URL, which keeps label cardinality bounded.
+
+Multiple worker processes:
+    When PROMETHEUS_MULTIPROC_DIR is set (it must point to an empty,
+    writable directory before the app starts), every worker writes its
+    values to files in that directory and /metrics aggregates all of them,
+    so any worker can answer a scrape with the totals for the whole server.
+    The files of a previous run would still be counted, so the directory
+    must be emptied before the server starts (the Dockerfile's CMD does
+    this), and a worker calls mark_process_dead() when it shuts down so
+    its in-flight gauge no longer counts.
+"""
+
+import os
+import time
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+OPERATION_ERRORS = Counter(
+    "operation_errors_total",
+    "Arithmetic operations that failed, e.g. division by zero",
+    ["operation"],
+)
+VALIDATION_ERRORS = Counter(
+    "validation_errors_total",
+    "Requests rejected by request validation",
+    ["route"],
+)
+
+# Route label for requests that did not match any route (404s), so that
+# arbitrary URLs cannot create new label values
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_label(scope) -> str:
+    """
+    Return the path template of the route that handled a request.
+
+    FastAPI stores the matched route in the ASGI scope while routing.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Returns:
+        (body, content_type)
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """
+    In multiprocess mode, drop the live gauge values (the in-flight
+    requests) of a worker process that is exiting; by default the
+    current one.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid() if pid is None else pid)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, latency and in-flight requests.
+
+    Written as plain ASGI (rather than BaseHTTPMiddleware) so it adds no
+    extra task or response buffering to each request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            labels = (scope["method"], route_label(scope), str(status))
+            REQUESTS.labels(*labels).inc()
+            REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - start)
@@ -0,0 +1,177 @@
+# app/core/pool_stats.py
+"""
+Connection Pool Statistics
+
+This module records how the SQLAlchemy connection pools are used, so pool
+sizes can be chosen from real data rather than guesses:
+
+- checkout wait time: how long callers waited to get a connection
+- in-use count: connections currently checked out (and the peak)
+- overflow count: connections opened beyond pool_size (and the peak)
+- timeouts: checkouts that gave up after pool_timeout
+
+Wait time is measured by the Instrumented*Pool classes (there is no pool
+event that fires before a checkout starts). In-use and overflow counts are
+maintained by pool event listeners registered with instrument_engine().
+
+Statistics are per process. With several uvicorn workers, each worker has
+its own pools, so the total connection count is the sum over workers.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """
+    Thread-safe counters describing the usage of one connection pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters to zero."""
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connections_opened = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.in_use = 0
+            self.in_use_peak = 0
+            self.overflow = 0
+            self.overflow_peak = 0
+
+    def record_wait(self, seconds: float) -> None:
+        """Record the time spent waiting for one successful checkout."""
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self) -> None:
+        """Record a checkout that timed out waiting for a connection."""
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        """Record a new DBAPI connection being opened."""
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_checkout(self, overflow: int) -> None:
+        """Record a connection being checked out of the pool."""
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.in_use_peak = max(self.in_use_peak, self.in_use)
+            self.overflow = overflow
+            self.overflow_peak = max(self.overflow_peak, overflow)
+
+    def record_checkin(self, overflow: int) -> None:
+        """Record a connection being returned to the pool."""
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+            self.overflow = overflow
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the current counters as a dictionary.
+
+        Returns:
+            dict: Counters plus the average checkout wait in seconds
+        """
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connections_opened": self.connections_opened,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+                "in_use": self.in_use,
+                "in_use_peak": self.in_use_peak,
+                "overflow": self.overflow,
+                "overflow_peak": self.overflow_peak,
+            }
+
+
+class _CheckoutTimerMixin:
+    """
+    Pool mixin that measures how long each checkout waits.
+
+    The PoolStats instance is carried over when the pool is recreated
+    (e.g. by engine.dispose()), just like the pool's event listeners.
+    """
+    stats: Optional[PoolStats] = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.record_timeout()
+            raise
+        if self.stats is not None:
+            self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_CheckoutTimerMixin, QueuePool):
+    """QueuePool that records checkout wait times."""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_CheckoutTimerMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait times."""
+
+
+def _current_overflow(pool) -> int:
+    """Overflow of the pool, or 0 for pool classes without overflow."""
+    return max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0
+
+
+def instrument_engine(engine) -> PoolStats:
+    """
+    Attach a PoolStats instance to an engine's connection pool.
+
+    Works with both Engine and AsyncEngine. Checkout wait times are only
+    recorded when the engine uses one of the Instrumented*Pool classes; the
+    other counters work with any pool.
+
+    Args:
+        engine: A SQLAlchemy Engine or AsyncEngine
+
+    Returns:
+        PoolStats: The statistics object updated by the pool
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    stats = PoolStats()
+    if isinstance(sync_engine.pool, _CheckoutTimerMixin):
+        sync_engine.pool.stats = stats
+
+    # Listeners look up engine.pool on each call because dispose() replaces
+    # the pool (the listeners themselves are carried over to the new pool)
+    @event.listens_for(sync_engine.pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.record_connect()
+
+    @event.listens_for(sync_engine.pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.record_checkout(_current_overflow(sync_engine.pool))
+
+    @event.listens_for(sync_engine.pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        stats.record_checkin(_current_overflow(sync_engine.pool))
+
+    return stats
@@ -0,0 +1,105 @@
+# app/core/replicas.py
+"""
+Read Replica Routing
+
+A ReplicaSet spreads read-only work over one or more replica engines,
+round-robin. Replicas that cannot be reached are skipped for a while
+(retry_interval seconds) and retried afterwards, so one failed replica does
+not fail every read request. When no replica is available, callers fall
+back to the primary database.
+
+The health check is the connection checkout itself: replica engines are
+created with pool_pre_ping, so a dead replica fails at checkout (before any
+query has run) rather than in the middle of a request.
+
+Replicas lag behind the primary. Only send them reads that can tolerate
+slightly stale data (history listings, reports); reads that must see the
+caller's own writes stay on the primary.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+
+def parse_replica_urls(value: str) -> List[str]:
+    """Split a comma-separated list of database URLs, ignoring blanks."""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+class ReplicaSet:
+    """
+    Round-robin choice among replica engines, skipping unreachable ones.
+
+    Args:
+        engines: The replica engines
+        retry_interval: Seconds an unreachable replica is skipped before
+                        it is tried again
+        clock: Monotonic time source (for tests)
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[Engine],
+        retry_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.engines = list(engines)
+        self.retry_interval = retry_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = [0.0] * len(self.engines)
+
+    def _candidates(self) -> List[int]:
+        """Indexes of the replicas to try, starting at the next in turn."""
+        with self._lock:
+            count = len(self.engines)
+            start = self._next
+            self._next = (start + 1) % count if count else 0
+            now = self.clock()
+            return [
+                index
+                for index in ((start + offset) % count for offset in range(count))
+                if self._down_until[index] <= now
+            ]
+
+    def mark_down(self, index: int) -> None:
+        """Skip a replica for the next retry_interval seconds."""
+        with self._lock:
+            self._down_until[index] = self.clock() + self.retry_interval
+
+    def is_healthy(self, index: int) -> bool:
+        """Whether a replica is currently used (not marked down)."""
+        with self._lock:
+            return self._down_until[index] <= self.clock()
+
+    def connect(self) -> Optional[Connection]:
+        """
+        Open a connection to the next healthy replica.
+
+        Each replica that fails to connect is marked down and the next one
+        is tried.
+
+        Returns:
+            A connection, or None when there are no replicas or none could
+            be reached (the caller should use the primary)
+        """
+        for index in self._candidates():
+            try:
+                return self.engines[index].connect()
+            except exc.DBAPIError as error:
+                self.mark_down(index)
+                logger.warning(
+                    "Read replica %s unavailable for %ss: %s",
+                    self.engines[index].url.render_as_string(hide_password=True),
+                    self.retry_interval,
+                    error.orig,
+                )
+        return None
@@ -0,0 +1,49 @@
+# app/core/responses.py
+"""
+Fast JSON Responses
+
+FastAPI's default response path validates a route's return value against
+its response_model, converts it to JSON-compatible Python objects, and then
+encodes those with the standard library's json module. For lists of
+calculations (UUIDs, datetimes, long float arrays) that encoding step is
+the largest cost of a request.
+
+FastJSONResponse encodes with orjson instead (pydantic-core's to_json when
+orjson is not installed). It is the application's default response class.
+Routes that return a FastJSONResponse themselves also skip the
+response_model step; the calculation routes do this with data built by
+app.schemas.calculation.calculation_payload().
+
+UUIDs and datetimes are written in the same format as before (e.g.
+"2025-01-01T12:00:00.123456"). NaN and infinite floats, which are not valid
+JSON and made the standard JSONResponse fail, are written as null.
+"""
+
+from typing import Any
+
+from pydantic_core import to_json, to_jsonable_python
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode content as JSON bytes.
+
+    Types orjson does not know (pydantic models, Decimal, ...) are
+    converted with pydantic-core.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=to_jsonable_python, option=orjson.OPT_SERIALIZE_NUMPY)
+    return to_json(content, inf_nan_mode="null")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson (or pydantic-core)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,200 @@
+# app/core/static_pages.py
+"""
+Precompressed Static Pages
+
+templates/index.html is mostly explanatory HTML, CSS and JavaScript
+comments, and it does not depend on the request. Rendering it with Jinja2
+and sending it uncompressed on every visit costs CPU and tens of KB of
+bandwidth for nothing.
+
+scripts/build_index.py renders the template once, at build time, strips
+the comments and redundant whitespace (minify_html), and writes the page
+next to its gzip (and, with Brotli installed, brotli) compressed copies:
+
+    build/index/index.html
+    build/index/index.html.gz
+    build/index/index.html.br
+
+With INDEX_PAGE_DIR pointing at that directory, GET / serves the files
+through PrecompressedPage: the smallest encoding the client accepts, a
+strong ETag per encoding, Cache-Control and 304 Not Modified responses for
+If-None-Match revalidations. Nothing is rendered or compressed per request.
+
+minify_html() is deliberately small and only meant for this repository's
+templates: it understands HTML comments, <style>/<script> blocks and
+string literals, but not JavaScript regular expression literals.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from jinja2 import Environment, FileSystemLoader
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+from app.core.compression import ENCODINGS, compress, negotiate_encoding
+from app.core.etags import etag_matches
+
+# File suffix of each precompressed variant
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# HTML comments, and the elements whose content is not plain HTML text
+_HTML_TOKENS = re.compile(
+    r"<!--(?!\[if).*?-->|(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _minify_code(code: str, line_comments: bool) -> str:
+    """
+    Remove comments from CSS or JavaScript (line_comments) and collapse
+    whitespace outside string literals. A run of whitespace containing a
+    line break becomes one line break, so JavaScript's automatic semicolon
+    insertion still sees the same statements.
+    """
+    out = []
+    i, n = 0, len(code)
+    quote = None
+    while i < n:
+        ch = code[i]
+        if quote:
+            out.append(ch)
+            if ch == "\\" and i + 1 < n:
+                out.append(code[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+        elif ch in "'\"`":
+            quote = ch
+            out.append(ch)
+            i += 1
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif line_comments and code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end < 0 else end
+        elif ch.isspace():
+            start = i
+            while i < n and code[i].isspace():
+                i += 1
+            separator = "\n" if "\n" in code[start:i] else " "
+            # Merge with the whitespace left before a removed comment
+            if out and out[-1] in (" ", "\n"):
+                out[-1] = "\n" if "\n" in (out[-1], separator) else " "
+            else:
+                out.append(separator)
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out).strip()
+
+
+def _collapse_whitespace(text: str) -> str:
+    """Collapse whitespace in HTML text; browsers render any run as one space."""
+    text = re.sub(r"\s*\n\s*", "\n", text)
+    return re.sub(r"[ \t]+", " ", text)
+
+
+def minify_html(html: str) -> str:
+    """
+    Minify an HTML page: drop HTML, CSS and JavaScript comments and
+    collapse whitespace. <pre> and <textarea> content is left untouched.
+    """
+    parts = []
+    position = 0
+    for match in _HTML_TOKENS.finditer(html):
+        parts.append(_collapse_whitespace(html[position:match.start()]))
+        position = match.end()
+        if match.group(1) is None:
+            continue  # HTML comment
+        open_tag, element, content, close_tag = match.group(1, 2, 3, 4)
+        if element.lower() == "script":
+            content = _minify_code(content, line_comments=True)
+        elif element.lower() == "style":
+            content = _minify_code(content, line_comments=False)
+        parts.append(open_tag + content + close_tag)
+    parts.append(_collapse_whitespace(html[position:]))
+    return re.sub(r"\n{2,}", "\n", "".join(parts)).strip() + "\n"
+
+
+def build_page(template_dir: Union[str, Path], name: str, output_dir: Union[str, Path]) -> Dict[Optional[str], Path]:
+    """
+    Render the template name from template_dir (without a request), minify
+    it and write it with its compressed variants to output_dir.
+
+    Returns the written files by encoding (None for the uncompressed page).
+    """
+    html = Environment(loader=FileSystemLoader(str(template_dir)), autoescape=True).get_template(name).render()
+    body = minify_html(html).encode("utf-8")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = {None: output_dir / name}
+    written[None].write_bytes(body)
+    for encoding in ENCODINGS:
+        path = output_dir / (name + SUFFIXES[encoding])
+        path.write_bytes(compress(body, encoding, level=11 if encoding == "br" else 9))
+        written[encoding] = path
+    return written
+
+
+class PrecompressedPage:
+    """
+    A static page and its precompressed variants, served with strong ETags
+    and Cache-Control.
+    """
+
+    def __init__(self, variants: Dict[Optional[str], bytes], media_type: str = "text/html", max_age: int = 300):
+        if None not in variants:
+            raise ValueError("The uncompressed page is required.")
+        self.variants = variants
+        self.media_type = media_type
+        self.cache_control = f"public, max-age={max_age}"
+        # The encodings are different representations, so each gets its own
+        # strong ETag, all derived from the uncompressed content
+        digest = hashlib.sha256(variants[None]).hexdigest()[:32]
+        self.etags = {
+            encoding: f'"{digest}"' if encoding is None else f'"{digest}-{encoding}"'
+            for encoding in variants
+        }
+        self.encodings = [encoding for encoding in ENCODINGS if encoding in variants]
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path], name: str = "index.html", **kwargs) -> "PrecompressedPage":
+        """Load a page written by build_page()."""
+        directory = Path(directory)
+        path = directory / name
+        if not path.is_file():
+            raise FileNotFoundError(f"{path} does not exist; build it with scripts/build_index.py.")
+        variants = {None: path.read_bytes()}
+        for encoding, suffix in SUFFIXES.items():
+            compressed = directory / (name + suffix)
+            if compressed.is_file():
+                variants[encoding] = compressed.read_bytes()
+        return cls(variants, **kwargs)
+
+    def not_modified(self, if_none_match: str) -> bool:
+        """
+        Whether an If-None-Match header matches the page. Any of its ETags
+        counts, since all encodings carry the same content.
+        """
+        return etag_matches(if_none_match, self.etags.values())
+
+    def response(self, request_headers: Headers) -> Response:
+        """The page response (or 304) for a request with these headers."""
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), self.encodings)
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if self.not_modified(request_headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(self.variants[encoding], media_type=self.media_type, headers=headers)
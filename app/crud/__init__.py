@@ -0,0 +1,8 @@
+# app/crud/__init__.py
+"""
+CRUD Package
+
+This package contains the database access functions used by the API routes.
+Keeping queries here lets main.py stay focused on HTTP concerns while the
+persistence logic can be reused (and tested) on its own.
+"""
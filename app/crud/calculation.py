@@ -0,0 +1,500 @@
+# app/crud/calculation.py
+"""
+Calculation CRUD Operations
+
+This module implements create, read, update and delete operations for
+calculations. Results are computed when a calculation is written so that
+reads never have to recompute them; backfill_results() fills them in for
+rows written before that was the case.
+
+Bulk creation inserts all rows with a single multi-row
+INSERT ... VALUES ... RETURNING statement instead of one flush per object.
+
+The *_rows functions select only the requested columns and return plain
+rows instead of Calculation objects, for listings that do not need the
+(potentially large) inputs or any model behaviour.
+
+migrate_inputs_storage() converts the inputs column between the storage
+formats of app/models/types.py.
+
+Writes that bypass the ORM record themselves in the per-user statistics
+(app/models/calculation_stats.py); ORM writes are recorded by the model's
+listeners. get_user_calculation_stats() reads those statistics.
+
+get_calculation_version_async() and list_user_calculation_rows(columns=
+["updated_at", "result"]) read just enough to compute the ETags of the calculation
+responses (see calculation_etag() in app/schemas/calculation.py).
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Column, MetaData, Table, bindparam, insert, inspect, select, text, tuple_, update
+)
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import sqltypes
+
+from app.models.calculation import Calculation
+from app.models.calculation_stats import CalculationStats, record_added, record_results
+from app.models.types import CalculationInputs
+from app.operations.factory import CalculationFactory
+from app.schemas.calculation import CalculationCreate, CalculationUpdate
+
+
+def create_calculation(db: Session, data: CalculationCreate) -> Calculation:
+    """
+    Create and persist a single calculation.
+
+    Args:
+        db: Database session
+        data: Validated calculation data
+
+    Returns:
+        The persisted Calculation subclass instance
+    """
+    calculation = CalculationFactory.create(data.type.value, data.user_id, data.inputs)
+    db.add(calculation)
+    db.commit()
+    db.refresh(calculation)
+    return calculation
+
+
+def bulk_create_calculations(db: Session, items: List[CalculationCreate]):
+    """
+    Create many calculations with one INSERT ... RETURNING statement.
+
+    Primary keys are generated here rather than by the database so that the
+    returned rows can be put back in request order, regardless of the order
+    in which the database returns them.
+
+    Args:
+        db: Database session
+        items: Validated calculation data
+
+    Returns:
+        The inserted rows (with every column of the calculations table), in
+        the same order as items
+    """
+    if not items:
+        return []
+    rows = CalculationFactory.build_rows(items)
+    table = Calculation.__table__
+    inserted = db.execute(insert(table).values(rows).returning(*table.c)).all()
+    record_added(db.connection(), rows)
+    db.commit()
+    by_id = {row.id: row for row in inserted}
+    return [by_id[row["id"]] for row in rows]
+
+
+def get_calculation(db: Session, calculation_id: uuid.UUID) -> Optional[Calculation]:
+    """
+    Fetch a calculation by id.
+
+    Returns:
+        The Calculation subclass instance, or None if it does not exist
+    """
+    return db.get(Calculation, calculation_id)
+
+
+async def get_calculation_async(db: AsyncSession, calculation_id: uuid.UUID) -> Optional[Calculation]:
+    """
+    Fetch a calculation by id using an async session.
+
+    Returns:
+        The Calculation subclass instance, or None if it does not exist
+    """
+    return await db.get(Calculation, calculation_id)
+
+
+async def get_calculation_version_async(db: AsyncSession, calculation_id: uuid.UUID) -> Optional[Row]:
+    """
+    Fetch only a calculation's id, updated_at and result, e.g. to check an
+    ETag without loading its inputs.
+
+    Returns:
+        The row, or None if the calculation does not exist
+    """
+    table = Calculation.__table__
+    query = select(table.c.id, table.c.updated_at, table.c.result).where(table.c.id == calculation_id)
+    return (await db.execute(query)).first()
+
+
+def encode_cursor(created_at: datetime, calculation_id: uuid.UUID) -> str:
+    """
+    Encode the position of a calculation in a user's history as an opaque,
+    URL-safe cursor token.
+    """
+    payload = json.dumps([created_at.isoformat(), str(calculation_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, calculation_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(calculation_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor.") from e
+
+
+# Columns returned by the row queries below unless others are requested.
+# The inputs column is left out because it can be very large.
+SUMMARY_COLUMNS = ("id", "type", "result", "created_at")
+
+
+def _history_query(query, user_id: uuid.UUID, cursor: Optional[str] = None):
+    """
+    Restrict a query to a user's calculations, newest first, starting after
+    the cursor. Backed by the ix_calculations_user_id_created_at_id index.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    table = Calculation.__table__
+    query = query.where(table.c.user_id == user_id).order_by(table.c.created_at.desc(), table.c.id.desc())
+    if cursor is not None:
+        query = query.where(tuple_(table.c.created_at, table.c.id) < tuple_(*decode_cursor(cursor)))
+    return query
+
+
+def _select_columns(columns: Sequence[str]):
+    """
+    Build a SELECT of the named columns of the calculations table.
+
+    Raises:
+        ValueError: If a column does not exist
+    """
+    table = Calculation.__table__
+    unknown = [name for name in columns if name not in table.c]
+    if unknown:
+        raise ValueError(f"Unknown calculation columns: {', '.join(unknown)}")
+    return select(*(table.c[name] for name in columns))
+
+
+def _page(items: list, limit: int) -> Tuple[list, Optional[str]]:
+    """Split off the extra row fetched to detect whether another page follows."""
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
+
+
+def list_user_calculations(
+    db: Session, user_id: uuid.UUID, limit: int = 50, cursor: Optional[str] = None
+) -> Tuple[List[Calculation], Optional[str]]:
+    """
+    Return one page of a user's calculations, newest first.
+
+    Uses keyset pagination on (created_at, id) backed by the
+    ix_calculations_user_id_created_at_id index: instead of OFFSET, each page
+    starts strictly after the last row of the previous one, so deep pages
+    are as fast as the first.
+
+    Args:
+        db: Database session
+        user_id: Owner of the calculations
+        limit: Maximum number of calculations to return
+        cursor: next_cursor from the previous page, or None for the first page
+
+    Returns:
+        (calculations, next_cursor): next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = _history_query(select(Calculation), user_id, cursor).limit(limit + 1)
+    return _page(list(db.scalars(query)), limit)
+
+
+def list_user_calculation_rows(
+    db: Session,
+    user_id: uuid.UUID,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    columns: Sequence[str] = SUMMARY_COLUMNS,
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Return one page of a user's calculations as plain rows, newest first.
+
+    Like list_user_calculations(), but only the requested columns are
+    selected and rows are returned as named tuples (row.id, row.result, ...)
+    instead of Calculation objects. Nothing is added to the session's
+    identity map and no polymorphic subclass is instantiated, which makes
+    listing several times faster, and the potentially large inputs column
+    is only read when it is requested.
+
+    Args:
+        db: Database session
+        user_id: Owner of the calculations
+        limit: Maximum number of calculations to return
+        cursor: next_cursor from the previous page, or None for the first page
+        columns: Names of the columns to select; id and created_at are always
+                 selected as well because pages are keyed on them
+
+    Returns:
+        (rows, next_cursor): next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed or a column does not exist
+    """
+    columns = list(columns) + [name for name in ("id", "created_at") if name not in columns]
+    query = _history_query(_select_columns(columns), user_id, cursor).limit(limit + 1)
+    return _page(db.execute(query).all(), limit)
+
+
+def stream_user_calculation_rows(
+    db: Session,
+    user_id: uuid.UUID,
+    columns: Sequence[str] = SUMMARY_COLUMNS,
+    chunk_size: int = 1000,
+) -> Iterator[Row]:
+    """
+    Yield all of a user's calculations as plain rows, newest first.
+
+    Rows are fetched chunk_size at a time (yield_per), using a server-side
+    cursor on PostgreSQL, so memory use stays flat however many rows there
+    are. Consume the iterator before the session's transaction ends.
+
+    Args:
+        db: Database session
+        user_id: Owner of the calculations
+        columns: Names of the columns to select
+        chunk_size: Number of rows fetched from the database at a time
+
+    Returns:
+        An iterator of named rows with the requested columns
+
+    Raises:
+        ValueError: If a column does not exist
+    """
+    query = _history_query(_select_columns(columns), user_id)
+    return iter(db.execute(query.execution_options(yield_per=chunk_size)))
+
+
+def get_user_calculation_stats(db: Session, user_id: uuid.UUID) -> List[CalculationStats]:
+    """
+    Read a user's calculation statistics, one entry per calculation type.
+
+    This reads at most one precomputed row per type (a primary key range
+    scan), however many calculations the user has.
+    """
+    return list(db.scalars(
+        select(CalculationStats)
+        .where(CalculationStats.user_id == user_id, CalculationStats.count > 0)
+        .order_by(CalculationStats.type)
+    ))
+
+
+def update_calculation(db: Session, calculation: Calculation, data: CalculationUpdate) -> Calculation:
+    """
+    Apply a partial update to a calculation and recompute its result.
+
+    Raises:
+        ValueError: If the new inputs are invalid for the calculation type
+                    (e.g. dividing by zero)
+    """
+    if data.inputs is not None:
+        # Validate on a transient copy so a bad update leaves the row untouched;
+        # the result itself is recomputed by the model's before_update listener
+        CalculationFactory.create(calculation.type, calculation.user_id, data.inputs)
+        calculation.inputs = data.inputs
+    db.commit()
+    db.refresh(calculation)
+    return calculation
+
+
+def delete_calculation(db: Session, calculation: Calculation) -> None:
+    """
+    Delete a calculation.
+    """
+    db.delete(calculation)
+    db.commit()
+
+
+def backfill_results(db: Session, chunk_size: int = 1000) -> Iterator[Tuple[int, int]]:
+    """
+    Compute and store the result of every calculation whose result is NULL.
+
+    Rows are processed in chunks of chunk_size, walking the primary key so
+    each chunk is a cheap index range scan, and every chunk is committed in
+    its own short transaction. Only the rows of the current chunk are
+    locked, so the table stays available to the application while this
+    runs.
+
+    Rows whose inputs cannot be computed (e.g. an unknown type or a zero
+    divisor) are left NULL and counted as failed.
+
+    Args:
+        db: Database session
+        chunk_size: Number of rows to read and update per transaction
+
+    Yields:
+        (updated, failed): Row counts for each committed chunk
+    """
+    table = Calculation.__table__
+    last_id = None
+    while True:
+        query = (
+            select(table.c.id, table.c.user_id, table.c.type, table.c.inputs)
+            .where(table.c.result.is_(None))
+            .order_by(table.c.id)
+            .limit(chunk_size)
+            # Lock the chunk so no concurrent write fills in a result between
+            # this select and the update (which would count it twice in the
+            # statistics)
+            .with_for_update()
+        )
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        rows = db.execute(query).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+
+        results, _ = Calculation.compute_results(rows)
+        updates = [
+            {"calculation_id": row.id, "user_id": row.user_id, "type": row.type, "new_result": result}
+            for row, result in zip(rows, results)
+            if result is not None
+        ]
+        if updates:
+            db.execute(
+                update(table)
+                .where(table.c.id == bindparam("calculation_id"))
+                # Keep updated_at: filling in a derived column is not a user edit
+                .values(result=bindparam("new_result"), updated_at=table.c.updated_at),
+                updates,
+            )
+            record_results(
+                db.connection(),
+                ({"user_id": item["user_id"], "type": item["type"], "result": item["new_result"]} for item in updates),
+            )
+        db.commit()
+        yield len(updates), len(rows) - len(updates)
+
+
+def get_inputs_storage(connection) -> str:
+    """
+    Return the storage format of the calculations.inputs column in the
+    database, which may differ from settings.CALCULATION_INPUTS_STORAGE
+    while a migration is pending.
+    """
+    for column in inspect(connection).get_columns(Calculation.__tablename__):
+        if column["name"] == "inputs":
+            if isinstance(column["type"], sqltypes.ARRAY):
+                return "array"
+            if isinstance(column["type"], sqltypes._Binary):
+                return "binary"
+            return "json"
+    raise ValueError("The calculations table has no inputs column.")
+
+
+def migrate_inputs_storage(engine: Engine, storage: str, chunk_size: int = 1000) -> Iterator[int]:
+    """
+    Convert calculations.inputs to another storage format (see
+    app/models/types.py) in place.
+
+    The converted inputs are written to a new column in chunks of
+    chunk_size, each committed in its own transaction like
+    backfill_results(), so the application keeps running. A final
+    transaction locks the table, converts rows inserted or updated in the
+    meantime (by updated_at) and replaces the old column with the new one.
+    Chunks walk the primary key, so the whole migration reads every row
+    about once. Restart the application with CALCULATION_INPUTS_STORAGE
+    set to the new format afterwards.
+
+    Args:
+        engine: Engine connected to the database to migrate
+        storage: 'json', 'array' or 'binary'
+        chunk_size: Number of rows to convert per transaction
+
+    Yields:
+        Number of rows converted in each committed chunk
+
+    Raises:
+        ValueError: If the storage format is unknown
+        TypeError: If stored inputs are not numbers (array/binary storage)
+    """
+    target_type = CalculationInputs(storage)
+    with engine.connect() as connection:
+        current = get_inputs_storage(connection)
+    if target_type.storage_for(engine.dialect) == CalculationInputs(current).storage_for(engine.dialect):
+        return
+
+    table = Table(
+        Calculation.__tablename__,
+        MetaData(),
+        Column("id", Calculation.__table__.c.id.type, primary_key=True),
+        Column("inputs", CalculationInputs(current)),
+        Column("inputs_migrated", target_type),
+        Column("updated_at", Calculation.__table__.c.updated_at.type),
+    )
+    started_at = datetime.utcnow()
+    preparer = engine.dialect.identifier_preparer
+    table_name = preparer.format_table(table)
+    with engine.begin() as connection:
+        column_type = target_type.load_dialect_impl(engine.dialect).compile(dialect=engine.dialect)
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN inputs_migrated {column_type}"))
+
+    def convert_chunk(connection, last_id) -> Tuple[int, Optional[uuid.UUID]]:
+        # Walk the primary key like backfill_results(), so each chunk is an
+        # index range scan instead of rescanning the rows already converted
+        query = (
+            select(table.c.id, table.c.inputs)
+            .where(table.c.inputs_migrated.is_(None))
+            .order_by(table.c.id)
+            .limit(chunk_size)
+        )
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        rows = connection.execute(query).all()
+        if not rows:
+            return 0, last_id
+        connection.execute(
+            update(table)
+            .where(table.c.id == bindparam("calculation_id"))
+            .values(inputs_migrated=bindparam("new_inputs")),
+            [{"calculation_id": row.id, "new_inputs": row.inputs} for row in rows],
+        )
+        return len(rows), rows[-1].id
+
+    last_id = None
+    while True:
+        with engine.begin() as connection:
+            converted, last_id = convert_chunk(connection, last_id)
+        if not converted:
+            break
+        yield converted
+
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.execute(text(f"LOCK TABLE {table_name} IN EXCLUSIVE MODE"))
+        connection.execute(
+            update(table).where(table.c.updated_at >= started_at).values(inputs_migrated=None)
+        )
+        # Start over: rows inserted during the first pass may sort before
+        # where it ended
+        last_id = None
+        while True:
+            converted, last_id = convert_chunk(connection, last_id)
+            if not converted:
+                break
+            yield converted
+        connection.execute(text(f"ALTER TABLE {table_name} DROP COLUMN inputs"))
+        connection.execute(text(f"ALTER TABLE {table_name} RENAME COLUMN inputs_migrated TO inputs"))
+        if engine.dialect.name == "postgresql":
+            # SQLite cannot add NOT NULL to an existing column
+            connection.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN inputs SET NOT NULL"))
@@ -0,0 +1,211 @@
+# app/crud/partitions.py
+"""
+Calculations Table Partitioning
+
+On PostgreSQL the calculations table can optionally be created partitioned
+by month of created_at (scripts/init_db.py --partitioned). Each partition
+has its own, small indexes, and a BRIN index on created_at makes time-range
+scans cheap, since rows arrive roughly in created_at order. Removing old
+data becomes detaching (and dropping) a partition instead of a huge DELETE
+(the per-user statistics are then rebuilt from the remaining rows).
+
+PostgreSQL requires the primary key of a partitioned table to include the
+partition column, so the table's primary key is (id, created_at). The ORM
+mapping is unchanged and still identifies calculations by id alone; ids are
+random UUIDs, so they stay unique in practice.
+
+Partitions are named calculations_YYYY_MM. A default partition catches
+rows outside the existing months, and ensure_partitions() creates the
+upcoming months in advance. The API runs it at startup and then every
+CALCULATION_PARTITIONS_INTERVAL seconds; scripts/partitions.py ensure runs
+it from cron when that is disabled. Concurrent runs (several workers) are
+safe: each partition is created by whichever takes the table lock first.
+"""
+
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Index, MetaData, PrimaryKeyConstraint, Table, text
+from sqlalchemy.engine import Engine
+
+from app.models.calculation import Calculation
+from app.models.calculation_stats import rebuild_calculation_stats
+from app.models.user import User
+
+TABLE_NAME = Calculation.__tablename__
+DEFAULT_PARTITION = f"{TABLE_NAME}_default"
+
+
+def partitioned_table(metadata: Optional[MetaData] = None) -> Table:
+    """
+    Build the partitioned variant of the calculations table: the same
+    columns and indexes, the primary key (id, created_at), partitioning by
+    range of created_at and a BRIN index on created_at.
+    """
+    metadata = metadata or MetaData()
+    if User.__tablename__ not in metadata.tables:
+        User.__table__.to_metadata(metadata)
+    table = Calculation.__table__.to_metadata(metadata)
+    table.c.created_at.primary_key = True
+    table.append_constraint(PrimaryKeyConstraint(table.c.id, table.c.created_at))
+    table.dialect_kwargs["postgresql_partition_by"] = "RANGE (created_at)"
+    Index(f"ix_{TABLE_NAME}_created_at_brin", table.c.created_at, postgresql_using="brin")
+    return table
+
+
+def is_partitioned(connection) -> bool:
+    """Whether the calculations table exists and is partitioned."""
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name))"),
+        {"name": TABLE_NAME},
+    ).scalar_one()
+
+
+def create_partitioned_table(engine: Engine, months_ahead: int = 3) -> List[str]:
+    """
+    Create the calculations table partitioned by month, with a default
+    partition and partitions for the current and upcoming months.
+
+    Returns:
+        The names of the partitions created
+
+    Raises:
+        ValueError: If the database is not PostgreSQL, or a calculations
+                    table that is not partitioned already exists
+    """
+    if engine.dialect.name != "postgresql":
+        raise ValueError("Partitioning needs PostgreSQL.")
+    with engine.begin() as connection:
+        exists = connection.execute(text("SELECT to_regclass(:name)"), {"name": TABLE_NAME}).scalar()
+        if exists is not None and not is_partitioned(connection):
+            raise ValueError(
+                f"The {TABLE_NAME} table already exists and is not partitioned. Export it "
+                "(scripts/copy_data.py), drop it, create it partitioned and import it again."
+            )
+        table = partitioned_table()
+        table.create(connection, checkfirst=True)
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE_NAME} DEFAULT"))
+    return ensure_partitions(engine, months_ahead)
+
+
+def _month_start(value: date, months: int = 0) -> date:
+    """First day of the month `months` months after the month of value."""
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding the given month, e.g. calculations_2025_01."""
+    return f"{TABLE_NAME}_{month.year:04d}_{month.month:02d}"
+
+
+def create_partition(connection, month: date) -> bool:
+    """
+    Create the partition for one month if it does not exist.
+
+    Rows for that month already in the default partition are moved into it.
+
+    Returns:
+        True if the partition was created
+    """
+    start, end = _month_start(month), _month_start(month, 1)
+    name = partition_name(start)
+    exists = text("SELECT to_regclass(:name) IS NOT NULL")
+    if connection.execute(exists, {"name": name}).scalar():
+        return False
+    bounds = {"start": datetime(start.year, start.month, 1), "end": datetime(end.year, end.month, 1)}
+    # A new partition cannot overlap rows in the default partition, so move
+    # them out first (the table lock keeps new ones from arriving meanwhile)
+    connection.execute(text(f"LOCK TABLE {TABLE_NAME} IN SHARE ROW EXCLUSIVE MODE"))
+    # Another process (e.g. another worker starting up) may have created the
+    # partition while this one waited for the lock
+    if connection.execute(exists, {"name": name}).scalar():
+        return False
+    connection.execute(
+        text(
+            f"CREATE TEMPORARY TABLE _partition_rows ON COMMIT DROP AS "
+            f"SELECT * FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end"
+        ),
+        bounds,
+    )
+    connection.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end"), bounds
+    )
+    connection.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {TABLE_NAME} "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    ))
+    connection.execute(text(f"INSERT INTO {TABLE_NAME} SELECT * FROM _partition_rows"))
+    connection.execute(text("DROP TABLE _partition_rows"))
+    return True
+
+
+def ensure_partitions(engine: Engine, months_ahead: int = 3, today: Optional[date] = None) -> List[str]:
+    """
+    Create the partitions for the current month and the next months_ahead
+    months, if the calculations table is partitioned.
+
+    Returns:
+        The names of the partitions created (empty if the table is not
+        partitioned or they all exist)
+    """
+    today = today or datetime.utcnow().date()
+    created = []
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            return []
+        for offset in range(months_ahead + 1):
+            month = _month_start(today, offset)
+            if create_partition(connection, month):
+                created.append(partition_name(month))
+    return created
+
+
+def list_partitions(connection) -> List[Tuple[str, str]]:
+    """
+    Return the partitions of the calculations table.
+
+    Returns:
+        (name, bounds) pairs, e.g. ("calculations_2025_01",
+        "FOR VALUES FROM ('2025-01-01 00:00:00') TO ('2025-02-01 00:00:00')")
+    """
+    return [
+        tuple(row)
+        for row in connection.execute(text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:name) ORDER BY child.relname"
+        ), {"name": TABLE_NAME})
+    ]
+
+
+def detach_partition(engine: Engine, month: date, drop: bool = False) -> str:
+    """
+    Detach the partition of one month from the calculations table.
+
+    The detached table keeps its rows (e.g. to archive them with pg_dump)
+    unless drop is True. Either way this is a quick catalog change rather
+    than a DELETE of every row. The per-user statistics are rebuilt in the
+    same transaction, which blocks writes to the table while it runs.
+
+    Returns:
+        The name of the detached partition
+
+    Raises:
+        ValueError: If the table is not partitioned or has no such partition
+    """
+    name = partition_name(_month_start(month))
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            raise ValueError(f"The {TABLE_NAME} table is not partitioned.")
+        if name not in [partition for partition, _ in list_partitions(connection)]:
+            raise ValueError(f"No partition named {name}.")
+        connection.execute(text(f"ALTER TABLE {TABLE_NAME} DETACH PARTITION {name}"))
+        if drop:
+            connection.execute(text(f"DROP TABLE {name}"))
+        rebuild_calculation_stats(connection)
+    return name
@@ -0,0 +1,369 @@
+# app/crud/transfer.py
+"""
+Bulk Import and Export
+
+This module streams whole tables (users and calculations) in and out of the
+database for backups and migrations, without going through the ORM.
+
+On PostgreSQL it uses COPY ... TO STDOUT / COPY ... FROM STDIN in CSV or
+PostgreSQL's binary format. Exports stream straight to the output file.
+Imports are split into chunks of rows, each loaded with its own COPY and
+committed separately, so memory use stays constant and an interrupted
+import keeps the chunks that completed.
+
+Other databases fall back to a streamed SELECT for exports and batched
+executemany INSERTs for imports, in the same CSV format as PostgreSQL's
+(header line, NULL as an empty unquoted field). The binary format is
+PostgreSQL's own and needs PostgreSQL on both ends.
+
+Imports bypass the incremental maintenance of the per-user statistics, so
+importing calculations rebuilds them once the last chunk is loaded.
+
+Files hold the values as the database stores them, so the calculations
+table must use the same CALCULATION_INPUTS_STORAGE on both ends.
+
+Usage:
+    with open("calculations.csv", "wb") as out:
+        export_table(engine, "calculations", out)
+    with open("calculations.csv", "rb") as source:
+        for rows in import_table(engine, "calculations", source):
+            print(rows)
+"""
+
+import csv
+import io
+import json
+import struct
+import uuid
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Table, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import sqltypes
+
+from app.models.calculation import Calculation
+from app.models.calculation_stats import rebuild_calculation_stats
+from app.models.types import CalculationInputs, pack_inputs, unpack_inputs
+from app.models.user import User
+
+TABLES: Dict[str, Table] = {
+    "users": User.__table__,
+    "calculations": Calculation.__table__,
+}
+FORMATS = ("csv", "binary")
+
+# Start of every file in PostgreSQL's binary COPY format
+BINARY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+BINARY_TRAILER = b"\xff\xff"
+
+# How often (in bytes written) exports report progress
+PROGRESS_INTERVAL = 1 << 20
+
+
+def _get_table(table_name: str) -> Table:
+    if table_name not in TABLES:
+        raise ValueError(f"Unknown table: {table_name}. Expected one of: {', '.join(TABLES)}")
+    return TABLES[table_name]
+
+
+def _check_format(engine: Engine, file_format: str) -> None:
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format: {file_format}. Expected one of: {', '.join(FORMATS)}")
+    if file_format == "binary" and not _uses_copy(engine):
+        raise ValueError("The binary format needs PostgreSQL.")
+
+
+def _uses_copy(engine: Engine) -> bool:
+    """Whether the engine's driver supports COPY (psycopg2's copy_expert)."""
+    return engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+
+def _column_list(engine: Engine, table: Table, names: Optional[List[str]] = None) -> str:
+    quote = engine.dialect.identifier_preparer.quote
+    return ", ".join(quote(name) for name in (names or [column.name for column in table.columns]))
+
+
+class _ProgressWriter:
+    """File wrapper reporting the number of bytes written so far."""
+
+    def __init__(self, out: BinaryIO, progress: Optional[Callable[[int], None]]):
+        self.out = out
+        self.progress = progress
+        self.written = 0
+        self._reported = 0
+
+    def write(self, data) -> int:
+        if isinstance(data, str):
+            data = data.encode()
+        self.out.write(data)
+        self.written += len(data)
+        if self.progress and self.written - self._reported >= PROGRESS_INTERVAL:
+            self._reported = self.written
+            self.progress(self.written)
+        return len(data)
+
+
+def export_table(
+    engine: Engine,
+    table_name: str,
+    out: BinaryIO,
+    file_format: str = "csv",
+    progress: Optional[Callable[[int], None]] = None,
+    chunk_size: int = 1000,
+) -> int:
+    """
+    Write every row of a table to a file.
+
+    Args:
+        engine: Engine connected to the source database
+        table_name: 'users' or 'calculations'
+        out: Binary file to write to
+        file_format: 'csv' (with a header line) or 'binary' (PostgreSQL only)
+        progress: Called with the number of bytes written so far, about
+                  once per megabyte
+        chunk_size: Rows fetched at a time when COPY is not available
+
+    Returns:
+        The number of rows exported
+
+    Raises:
+        ValueError: If the table or format is unknown, or the binary format
+                    is used without PostgreSQL
+    """
+    table = _get_table(table_name)
+    _check_format(engine, file_format)
+    writer = _ProgressWriter(out, progress)
+
+    if _uses_copy(engine):
+        options = "FORMAT csv, HEADER" if file_format == "csv" else "FORMAT binary"
+        statement = (
+            f"COPY {engine.dialect.identifier_preparer.format_table(table)} "
+            f"({_column_list(engine, table)}) TO STDOUT WITH ({options})"
+        )
+        connection = engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(statement, writer)
+                count = cursor.rowcount
+            connection.commit()
+        finally:
+            connection.close()
+        return count
+
+    buffer = io.StringIO(newline="")
+    csv_writer = csv.writer(buffer, lineterminator="\n")
+    csv_writer.writerow([column.name for column in table.columns])
+    formatters = [_formatter(engine, column.type) for column in table.columns]
+    count = 0
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=chunk_size).execute(select(table))
+        for rows in result.partitions():
+            csv_writer.writerows(
+                ["" if value is None else format_value(value) for format_value, value in zip(formatters, row)]
+                for row in rows
+            )
+            count += len(rows)
+            writer.write(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+    writer.write(buffer.getvalue().encode("utf-8"))
+    return count
+
+
+def import_table(
+    engine: Engine,
+    table_name: str,
+    source: BinaryIO,
+    file_format: str = "csv",
+    chunk_size: int = 10000,
+) -> Iterator[int]:
+    """
+    Load rows from a file written by export_table() into a table.
+
+    The rows are loaded and committed chunk_size at a time. Rows must not
+    already exist, and users must be imported before their calculations.
+    After the last chunk of calculations, the per-user statistics are
+    rebuilt (if the import stops early, rebuild them with
+    rebuild_calculation_stats()).
+
+    Args:
+        engine: Engine connected to the target database
+        table_name: 'users' or 'calculations'
+        source: Binary file to read from
+        file_format: 'csv' or 'binary' (PostgreSQL only)
+        chunk_size: Number of rows per transaction
+
+    Yields:
+        Number of rows loaded by each committed chunk
+
+    Raises:
+        ValueError: If the table or format is unknown, the binary format is
+                    used without PostgreSQL, or the file is malformed
+    """
+    table = _get_table(table_name)
+    _check_format(engine, file_format)
+
+    if file_format == "binary":
+        columns = None
+        chunks = split_binary(source, chunk_size)
+    else:
+        header = source.readline()
+        columns = next(csv.reader([header.decode("utf-8")]), None)
+        if not columns:
+            raise ValueError("The CSV file has no header line.")
+        unknown = [name for name in columns if name not in table.c]
+        if unknown:
+            raise ValueError(f"Unknown columns in CSV header: {', '.join(unknown)}")
+        chunks = split_csv(source, chunk_size)
+
+    if not _uses_copy(engine):
+        yield from _insert_csv_chunks(engine, table, columns, chunks)
+        _rebuild_stats(engine, table)
+        return
+
+    options = "FORMAT csv" if file_format == "csv" else "FORMAT binary"
+    statement = (
+        f"COPY {engine.dialect.identifier_preparer.format_table(table)} "
+        f"({_column_list(engine, table, columns)}) FROM STDIN WITH ({options})"
+    )
+    connection = engine.raw_connection()
+    try:
+        for chunk, count in chunks:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(statement, io.BytesIO(chunk))
+            connection.commit()
+            yield count
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    _rebuild_stats(engine, table)
+
+
+def _rebuild_stats(engine: Engine, table: Table) -> None:
+    if table is Calculation.__table__:
+        with engine.begin() as connection:
+            rebuild_calculation_stats(connection)
+
+
+def split_csv(source: BinaryIO, chunk_size: int) -> Iterator[Tuple[bytes, int]]:
+    """
+    Split CSV records (after the header) into chunks of chunk_size records.
+
+    A newline inside a quoted field does not end a record: a line only
+    completes a record when the number of quote characters so far is even.
+
+    Yields:
+        (data, records): The raw bytes of each chunk and its record count
+    """
+    buffer = bytearray()
+    records = 0
+    quotes = 0
+    for line in source:
+        buffer += line
+        quotes += line.count(b'"')
+        if quotes % 2:
+            continue
+        records += 1
+        if records == chunk_size:
+            yield bytes(buffer), records
+            buffer.clear()
+            records = 0
+    if quotes % 2:
+        raise ValueError("The CSV file ends inside a quoted field.")
+    if records:
+        yield bytes(buffer), records
+
+
+def split_binary(source: BinaryIO, chunk_size: int) -> Iterator[Tuple[bytes, int]]:
+    """
+    Split a file in PostgreSQL's binary COPY format into chunks of
+    chunk_size rows, each a complete binary COPY file of its own.
+
+    Yields:
+        (data, rows): The bytes of each chunk and its row count
+    """
+    def read(size: int) -> bytes:
+        data = source.read(size)
+        if len(data) != size:
+            raise ValueError("The binary COPY file is truncated.")
+        return data
+
+    header = read(len(BINARY_SIGNATURE) + 8)
+    if not header.startswith(BINARY_SIGNATURE):
+        raise ValueError("Not a PostgreSQL binary COPY file.")
+    (extension_length,) = struct.unpack("!i", header[-4:])
+    header += read(extension_length)
+
+    buffer = bytearray(header)
+    rows = 0
+    while True:
+        field_count_bytes = read(2)
+        (field_count,) = struct.unpack("!h", field_count_bytes)
+        if field_count == -1:
+            break
+        buffer += field_count_bytes
+        for _ in range(field_count):
+            length_bytes = read(4)
+            (length,) = struct.unpack("!i", length_bytes)
+            buffer += length_bytes
+            if length > 0:
+                buffer += read(length)
+        rows += 1
+        if rows == chunk_size:
+            yield bytes(buffer + BINARY_TRAILER), rows
+            buffer = bytearray(header)
+            rows = 0
+    if rows:
+        yield bytes(buffer + BINARY_TRAILER), rows
+
+
+def _formatter(engine: Engine, column_type) -> Callable[[Any], str]:
+    """Text form of a column's values, matching PostgreSQL's CSV output."""
+    if isinstance(column_type, CalculationInputs):
+        if column_type.storage_for(engine.dialect) == "binary":
+            return lambda value: "\\x" + pack_inputs(value).hex()
+        return json.dumps
+    if isinstance(column_type, sqltypes.DateTime):
+        return lambda value: value.isoformat(sep=" ")
+    if isinstance(column_type, sqltypes.Float):
+        return repr
+    return str
+
+
+def _parser(engine: Engine, column) -> Callable[[str], Any]:
+    """Inverse of _formatter(): parse a CSV field into a column value."""
+    column_type = column.type
+    if isinstance(column_type, CalculationInputs):
+        if column_type.storage_for(engine.dialect) == "binary":
+            parse = lambda text: unpack_inputs(bytes.fromhex(text[2:]))
+        else:
+            parse = json.loads
+    elif isinstance(column_type, sqltypes.Uuid):
+        parse = uuid.UUID
+    elif isinstance(column_type, sqltypes.DateTime):
+        parse = datetime.fromisoformat
+    elif isinstance(column_type, sqltypes.Float):
+        parse = float
+    else:
+        parse = str
+    if column.nullable:
+        return lambda text: None if text == "" else parse(text)
+    return parse
+
+
+def _insert_csv_chunks(engine: Engine, table: Table, columns: List[str], chunks) -> Iterator[int]:
+    """Load CSV chunks with batched INSERTs, committing each chunk."""
+    parsers = [_parser(engine, table.c[name]) for name in columns]
+    statement = insert(table)
+    for chunk, count in chunks:
+        reader = csv.reader(io.StringIO(chunk.decode("utf-8"), newline=""))
+        rows = [
+            {name: parse(text) for name, parse, text in zip(columns, parsers, record)}
+            for record in reader
+        ]
+        with engine.begin() as connection:
+            connection.execute(statement, rows)
+        yield count
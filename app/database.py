@@ -11,24 +11,129 @@ Key Components:
 - engine: SQLAlchemy engine for database connections
 - SessionLocal: Session factory for creating database sessions
 - get_db: Dependency function for FastAPI routes to get database sessions
+- async_engine / AsyncSessionLocal / get_async_db: Async counterparts for
+  routes declared with `async def`, so queries do not block the event loop
+  or hold a threadpool slot
+- replicas / get_read_db: Read-only sessions on the read replicas in
+  DATABASE_REPLICA_URLS (round-robin, skipping unreachable replicas), for
+  queries that can tolerate replication lag; the primary is used when no
+  replica is configured or reachable
+- get_pool_stats: Connection pool usage (checkout wait, in-use, overflow)
+  for both engines, configured through the DB_POOL_* settings
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.pool_stats import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    instrument_engine,
+)
+from app.core.replicas import ReplicaSet, parse_replica_urls
+
+# Async drivers used when deriving the async URL from DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Derive an async database URL from a synchronous one.
+
+    The backend is kept and the driver is replaced with its async
+    counterpart, e.g. postgresql+psycopg2://... becomes
+    postgresql+asyncpg://...
+
+    Args:
+        database_url: A synchronous database connection URL
+
+    Returns:
+        str: The same URL using an async driver
+
+    Raises:
+        ValueError: If there is no known async driver for the backend
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def get_pool_options(database_url: str, is_async: bool = False) -> dict:
+    """
+    Build the connection pool arguments for create_engine() from settings.
+
+    SQLite keeps SQLAlchemy's default pool classes (which do not support
+    pool_size/max_overflow); other backends use an instrumented queue pool
+    sized by the DB_POOL_* settings.
+
+    Args:
+        database_url: The database connection URL
+        is_async: Whether the options are for an async engine
+
+    Returns:
+        dict: Keyword arguments for create_engine()/create_async_engine()
+    """
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
 
 # Get database URL from settings
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+SQLALCHEMY_ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(SQLALCHEMY_DATABASE_URL)
 
 # Create the SQLAlchemy engine
 # The engine is the starting point for any SQLAlchemy application
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **get_pool_options(SQLALCHEMY_DATABASE_URL))
 
 # Create a SessionLocal class
 # Each instance of SessionLocal will be a database session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create the async engine and session factory
+# expire_on_commit=False keeps loaded attributes usable after commit, since
+# lazy loading is not available on an AsyncSession
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL, **get_pool_options(SQLALCHEMY_ASYNC_DATABASE_URL, is_async=True)
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Engines for the read replicas. pool_pre_ping makes each checkout a health
+# check, so an unreachable replica is detected before a query runs on it
+replicas = ReplicaSet(
+    [
+        create_engine(url, **{**get_pool_options(url), "pool_pre_ping": True})
+        for url in parse_replica_urls(settings.DATABASE_REPLICA_URLS)
+    ],
+    retry_interval=settings.DATABASE_REPLICA_RETRY_INTERVAL,
+)
+
+# Record pool usage for both engines (see get_pool_stats)
+pool_stats = {
+    "sync": instrument_engine(engine),
+    "async": instrument_engine(async_engine),
+}
+
 # Create a Base class for declarative models
 # All SQLAlchemy models will inherit from this Base class
 Base = declarative_base()
@@ -58,6 +163,68 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """
+    Read-only database session dependency for FastAPI.
+
+    The session is bound to the next available read replica, or to the
+    primary when there is none. Replicas may lag behind the primary, so use
+    this only for queries that can return slightly stale data, such as
+    history listings; anything that writes, or must see a write the client
+    just made, uses get_db().
+
+    Yields:
+        Session: A SQLAlchemy database session
+    """
+    connection = replicas.connect()
+    db = SessionLocal(bind=connection) if connection is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        if connection is not None:
+            connection.close()
+
+
+async def get_async_db():
+    """
+    Async database session dependency for FastAPI.
+
+    The async counterpart of get_db(), for routes declared with `async def`.
+    The session is closed after the request is complete.
+
+    Yields:
+        AsyncSession: A SQLAlchemy async database session
+
+    Example:
+        @app.get("/items/{item_id}")
+        async def read_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+            return await db.get(Item, item_id)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_stats() -> dict:
+    """
+    Report connection pool usage for the sync and async engines.
+
+    Counters are per worker process and accumulate since startup.
+
+    Returns:
+        dict: For each engine ("sync" and "async"), the PoolStats counters
+              plus the configured pool size and the connections currently
+              idle in the pool
+    """
+    report = {}
+    for name, pool_engine in (("sync", engine), ("async", async_engine.sync_engine)):
+        pool = pool_engine.pool
+        report[name] = pool_stats[name].snapshot()
+        report[name]["pool_size"] = pool.size() if hasattr(pool, "size") else None
+        report[name]["idle"] = pool.checkedin() if hasattr(pool, "checkedin") else None
+    return report
+
+
 def get_engine(database_url: str = SQLALCHEMY_DATABASE_URL):
     """
     Factory function to create a new SQLAlchemy engine.
@@ -71,7 +238,7 @@ def get_engine(database_url: str = SQLALCHEMY_DATABASE_URL):
     Returns:
         Engine: A SQLAlchemy engine instance
     """
-    return create_engine(database_url)
+    return create_engine(database_url, **get_pool_options(database_url))
 
 
 def get_sessionmaker(engine):
@@ -85,3 +252,31 @@ def get_sessionmaker(engine):
         sessionmaker: A configured session factory
     """
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_async_engine(database_url: str = SQLALCHEMY_ASYNC_DATABASE_URL):
+    """
+    Factory function to create a new SQLAlchemy async engine.
+
+    Args:
+        database_url: The database connection URL, using an async driver
+
+    Returns:
+        AsyncEngine: A SQLAlchemy async engine instance
+    """
+    return create_async_engine(database_url, **get_pool_options(database_url, is_async=True))
+
+
+def get_async_sessionmaker(engine):
+    """
+    Factory function to create a new async sessionmaker bound to the given engine.
+
+    Args:
+        engine: A SQLAlchemy async engine instance
+
+    Returns:
+        async_sessionmaker: A configured async session factory
+    """
+    return async_sessionmaker(
+        bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
@@ -14,6 +14,7 @@ from app.models.calculation import (
     Multiplication,
     Division
 )
+from app.models.calculation_stats import CalculationStats
 
 __all__ = [
     "User",
@@ -21,5 +22,6 @@ __all__ = [
     "Addition",
     "Subtraction",
     "Multiplication",
-    "Division"
+    "Division",
+    "CalculationStats"
 ]
@@ -19,15 +19,30 @@ This design pattern allows for:
 2. Automatic type resolution: SQLAlchemy returns the correct subclass
 3. Type-specific behavior: Each subclass implements get_result() differently
 4. Easy extensibility: Add new calculation types by creating new subclasses
+
+Performance: get_result() on subtractions, multiplications and divisions
+with many inputs (at least settings.VECTORIZE_THRESHOLD) uses the
+C-implemented builtin reductions of app/operations/vectorized.py instead of
+a Python loop, and Calculation.compute_results() computes the results of
+many calculations at once with NumPy. Calculation.computed_result computes results inside PostgreSQL, so
+reports over many rows never load them into Python.
 """
 
 from datetime import datetime
+from itertools import chain
 import uuid
-from typing import List
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Float
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import (
+    Column, String, DateTime, ForeignKey, Index, Float, case, cast, event, func, inspect, null, select
+)
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, declared_attr
+from app.core.config import settings
 from app.database import Base
+from app.models.types import CalculationInputs
+from app.operations.vectorized import REDUCTIONS, reduce_inputs, reduce_ragged
 
 
 class AbstractCalculation:
@@ -91,14 +106,15 @@ class AbstractCalculation:
     @declared_attr
     def inputs(cls):
         """
-        JSON column storing the list of numbers for the calculation.
+        Column storing the list of numbers for the calculation.
         
-        Using JSON allows for flexible storage of variable-length input lists.
-        PostgreSQL's native JSON support provides efficient querying and
-        indexing capabilities.
+        Stored as JSON by default, which allows for flexible storage of
+        variable-length input lists. Calculations with many inputs load
+        much faster from a float8[] or packed binary column; see
+        settings.CALCULATION_INPUTS_STORAGE and app/models/types.py.
         """
         return Column(
-            JSON,
+            CalculationInputs(),
             nullable=False
         )
 
@@ -107,8 +123,12 @@ class AbstractCalculation:
         """
         The computed result of the calculation.
         
-        Stored as Float to handle decimal values. Can be NULL initially
-        and computed on-demand using get_result() method.
+        Stored as Float to handle decimal values. It is computed when the
+        calculation is created (CalculationFactory.create) and recomputed
+        whenever its inputs change (see the before_insert/before_update
+        listeners below), so reads never need to call get_result(). Rows
+        written before this was introduced may be NULL until the backfill
+        script (scripts/backfill_results.py) has run.
         """
         return Column(
             Float,
@@ -191,6 +211,88 @@ class AbstractCalculation:
         return f"<Calculation(type={self.type}, inputs={self.inputs})>"
 
 
+# ln() of the largest and smallest positive float8; exp() raises an
+# out-of-range error beyond them, so results are clamped to inf/0 instead
+_MAX_LN = 709.78
+_MIN_LN = -745.13
+
+
+def _signed_exp(log_magnitude, negative_count):
+    """
+    SQL for sign * exp(log_magnitude), where the sign is negative when
+    negative_count is odd. Used to compute products as exp(sum(ln|x|)),
+    since PostgreSQL has no product aggregate.
+    """
+    magnitude = case(
+        (log_magnitude > _MAX_LN, cast("Infinity", Float)),
+        (log_magnitude < _MIN_LN, 0.0),
+        else_=func.exp(log_magnitude),
+    )
+    return magnitude * case((negative_count % 2 == 1, -1.0), else_=1.0)
+
+
+def _result_expression(cls):
+    """
+    Build a correlated scalar subquery computing the result of each row.
+
+    The inputs are unnested with json_array_elements_text() (or unnest()
+    with array storage) WITH ORDINALITY and aggregated once per row:
+
+    - addition: sum(x)
+    - subtraction: x1 - sum(rest)
+    - multiplication: exp(sum(ln|x|)) with the sign from the number of
+      negative inputs, or 0 if any input is 0
+    - division: the same product with the divisors' logarithms negated, or
+      NULL if any divisor is 0 (where get_result() would raise)
+
+    A CASE on the type column picks the aggregate for each row; rows of an
+    unknown type give NULL.
+    """
+    storage = cls.__table__.c.inputs.type.storage
+    if storage == "json":
+        unnest = func.json_array_elements_text(cls.inputs)
+    elif storage == "array":
+        unnest = func.unnest(cls.inputs)
+    else:
+        raise NotImplementedError(
+            f"Results cannot be computed in SQL with {storage} inputs storage."
+        )
+    elements = unnest.table_valued(
+        "value", with_ordinality="position"
+    ).render_derived(name="input_element")
+    value = cast(elements.c.value, Float)
+    is_first = elements.c.position == 1
+    # ln(0) is an error, so zero inputs are skipped here and handled apart
+    log_abs = func.ln(func.abs(func.nullif(value, 0)))
+    negative_count = func.count().filter(value < 0)
+
+    first = func.max(value).filter(is_first)
+    addition = func.sum(value)
+    subtraction = first - func.coalesce(func.sum(value).filter(~is_first), 0.0)
+    multiplication = case(
+        (func.bool_or(value == 0), 0.0),
+        else_=_signed_exp(func.sum(log_abs), negative_count),
+    )
+    division = case(
+        (func.bool_or(value == 0).filter(~is_first), null()),
+        (first == 0, 0.0),
+        else_=_signed_exp(
+            func.sum(case((is_first, log_abs), else_=-log_abs)), negative_count
+        ),
+    )
+    expressions = {
+        "addition": addition,
+        "subtraction": subtraction,
+        "multiplication": multiplication,
+        "division": division,
+    }
+
+    # Dispatch on the type column even for subclasses: queries on a
+    # subclass's columns are not restricted to rows of that type
+    result = case(expressions, value=cls.type)
+    return select(result).select_from(elements).scalar_subquery().label("computed_result")
+
+
 class Calculation(Base, AbstractCalculation):
     """
     Base calculation model with polymorphic configuration.
@@ -212,6 +314,172 @@ class Calculation(Base, AbstractCalculation):
         "polymorphic_identity": "calculation",
     }
 
+    # Supports keyset pagination of a user's history ordered by
+    # (created_at, id): the cursor condition becomes an index range scan,
+    # so every page costs the same no matter how deep it is.
+    __table_args__ = (
+        Index("ix_calculations_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
+    @hybrid_property
+    def computed_result(self) -> float:
+        """
+        The result of the calculation, computable in SQL.
+
+        On an instance this is get_result(). On the class it is a SQL
+        expression (PostgreSQL with json or array inputs storage) that
+        computes the result from the inputs column inside the database, so it can be aggregated,
+        filtered and sorted on without loading rows into Python:
+
+            select(Calculation.user_id, func.sum(Calculation.computed_result))
+                .group_by(Calculation.user_id)
+            select(Calculation).where(Calculation.computed_result > 100)
+
+        The SQL sums in a different order and computes products through
+        logarithms, so results can differ from get_result() in the last
+        few digits. Sums that overflow raise a PostgreSQL error instead
+        of returning inf. A division by zero gives NULL.
+
+        When the stored result column is filled in (see
+        scripts/backfill_results.py), querying it directly is cheaper;
+        this expression is for reporting on rows without one or for
+        checking stored results.
+        """
+        return self.get_result()
+
+    @computed_result.inplace.expression
+    @classmethod
+    def _computed_result_expression(cls):
+        return _result_expression(cls)
+
+    @classmethod
+    def compute_results(
+        cls, items: Iterable[Any]
+    ) -> Tuple[List[Optional[float]], Dict[int, str]]:
+        """
+        Compute the results of many calculations at once.
+
+        Instead of calling get_result() on each calculation, the items are
+        grouped by type and the inputs of each group are concatenated into
+        one flat array with the offset of every calculation in it, so each
+        group is reduced with a single NumPy call. This is much faster for
+        recomputing thousands of stored rows, especially when they are
+        selected as plain rows rather than loaded as ORM objects.
+
+        Results are bit-for-bit what get_result() returns,
+        so stored results do not depend on which path computed them (e.g.
+        CalculationFactory.create() or create_many()). Calculations with
+        fewer than settings.VECTORIZE_THRESHOLD inputs, for which
+        get_result() loops, are reduced strictly left to right. Longer ones,
+        for which get_result() uses the reductions of
+        app/operations/vectorized.py (first - sum(rest) unless
+        settings.VECTORIZE_EXACT_ORDER is set), are computed with
+        get_result() itself, as are groups whose inputs are not all numbers
+        that fit in a float.
+
+        Args:
+            items: Calculation objects, rows with `type` and `inputs`
+                   attributes, or (type, inputs) tuples
+
+        Returns:
+            A tuple (results, errors). results is aligned with the input and
+            holds None for failed items; errors maps the index of each
+            failed item to its error message.
+
+        Example:
+            results, errors = Calculation.compute_results(
+                [("addition", [1, 2]), ("division", [1, 0])]
+            )
+            # results == [3.0, None]
+            # errors == {1: "Cannot divide by zero."}
+        """
+        groups: Dict[str, List[Tuple[int, list]]] = {}
+        # Calculations that get_result() computes with vectorized reductions
+        long_rows: List[Tuple[int, str, list]] = []
+        errors: Dict[int, str] = {}
+        count = 0
+        for index, item in enumerate(items):
+            count += 1
+            if hasattr(item, "inputs"):
+                calculation_type, inputs = item.type, item.inputs
+            else:
+                calculation_type, inputs = item
+            if calculation_type not in REDUCTIONS:
+                errors[index] = f"Unsupported calculation type: {calculation_type}"
+            elif not isinstance(inputs, list):
+                errors[index] = "Inputs must be a list of numbers."
+            elif len(inputs) < 2:
+                errors[index] = "Inputs must be a list with at least two numbers."
+            elif len(inputs) >= settings.VECTORIZE_THRESHOLD:
+                long_rows.append((index, calculation_type, inputs))
+            else:
+                groups.setdefault(calculation_type, []).append((index, inputs))
+
+        results: List[Optional[float]] = [None] * count
+        for index, calculation_type, inputs in long_rows:
+            calculation_class = cls.__mapper__.polymorphic_map[calculation_type].class_
+            try:
+                results[index] = calculation_class(inputs=inputs).get_result()
+            except (TypeError, ValueError) as e:
+                errors[index] = str(e)
+        for calculation_type, group in groups.items():
+            indices = [index for index, _ in group]
+            rows = [inputs for _, inputs in group]
+            lengths = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+            try:
+                values = np.fromiter(
+                    chain.from_iterable(rows), dtype=np.float64, count=int(lengths.sum())
+                )
+            except (TypeError, ValueError, OverflowError):
+                calculation_class = cls.__mapper__.polymorphic_map[calculation_type].class_
+                for index, inputs in group:
+                    try:
+                        results[index] = calculation_class(inputs=inputs).get_result()
+                    except (TypeError, ValueError) as e:
+                        errors[index] = str(e)
+                continue
+
+            offsets = np.zeros_like(lengths)
+            np.cumsum(lengths[:-1], out=offsets[1:])
+            values, zero_division = reduce_ragged(calculation_type, values, offsets, exact=True)
+            for index, value, failed in zip(indices, values.tolist(), zero_division.tolist()):
+                if failed:
+                    errors[index] = "Cannot divide by zero."
+                else:
+                    results[index] = value
+        return results, errors
+
+
+@event.listens_for(Calculation, "before_insert", propagate=True)
+def _compute_result_on_insert(mapper, connection, target):
+    """
+    Fill in the result of a new calculation if it was not set already.
+
+    Raises:
+        ValueError: If the inputs are invalid for the calculation type
+    """
+    if target.result is None:
+        try:
+            target.result = target.get_result()
+        except NotImplementedError:
+            # The base Calculation type has no result to compute
+            pass
+
+
+@event.listens_for(Calculation, "before_update", propagate=True)
+def _compute_result_on_update(mapper, connection, target):
+    """
+    Recompute the result when the inputs of a calculation are replaced.
+
+    Raises:
+        ValueError: If the new inputs are invalid for the calculation type
+    """
+    if inspect(target).attrs.inputs.history.has_changes():
+        try:
+            target.result = target.get_result()
+        except NotImplementedError:
+            pass
+
 
 class Addition(Calculation):
     """
@@ -236,13 +504,14 @@ class Addition(Calculation):
         Raises:
             ValueError: If inputs is not a list or has fewer than 2 numbers
         """
-        if not isinstance(self.inputs, list):
+        inputs = self.inputs
+        if not isinstance(inputs, list):
             raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
+        if len(inputs) < 2:
             raise ValueError(
                 "Inputs must be a list with at least two numbers."
             )
-        return sum(self.inputs)
+        return sum(inputs)
 
 
 class Subtraction(Calculation):
@@ -268,14 +537,20 @@ class Subtraction(Calculation):
         Raises:
             ValueError: If inputs is not a list or has fewer than 2 numbers
         """
-        if not isinstance(self.inputs, list):
+        inputs = self.inputs
+        if not isinstance(inputs, list):
             raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
+        if len(inputs) < 2:
             raise ValueError(
                 "Inputs must be a list with at least two numbers."
             )
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
+        if len(inputs) >= settings.VECTORIZE_THRESHOLD:
+            result = reduce_inputs("subtraction", inputs)
+            if result is not None:
+                return result
+        values = iter(inputs)
+        result = next(values)
+        for value in values:
             result -= value
         return result
 
@@ -303,14 +578,19 @@ class Multiplication(Calculation):
         Raises:
             ValueError: If inputs is not a list or has fewer than 2 numbers
         """
-        if not isinstance(self.inputs, list):
+        inputs = self.inputs
+        if not isinstance(inputs, list):
             raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
+        if len(inputs) < 2:
             raise ValueError(
                 "Inputs must be a list with at least two numbers."
             )
+        if len(inputs) >= settings.VECTORIZE_THRESHOLD:
+            result = reduce_inputs("multiplication", inputs)
+            if result is not None:
+                return result
         result = 1
-        for value in self.inputs:
+        for value in inputs:
             result *= value
         return result
 
@@ -342,14 +622,20 @@ class Division(Calculation):
             ValueError: If inputs is not a list, has fewer than 2 numbers,
                        or if attempting to divide by zero
         """
-        if not isinstance(self.inputs, list):
+        inputs = self.inputs
+        if not isinstance(inputs, list):
             raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
+        if len(inputs) < 2:
             raise ValueError(
                 "Inputs must be a list with at least two numbers."
             )
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
+        if len(inputs) >= settings.VECTORIZE_THRESHOLD:
+            result = reduce_inputs("division", inputs)
+            if result is not None:
+                return result
+        values = iter(inputs)
+        result = next(values)
+        for value in values:
             if value == 0:
                 raise ValueError("Cannot divide by zero.")
             result /= value
@@ -0,0 +1,376 @@
+# app/models/calculation_stats.py
+"""
+Per-User Calculation Statistics
+
+The calculation_stats table holds, for each user and calculation type, the
+number of calculations and the total, minimum and maximum of their results,
+so dashboards read a handful of rows instead of every calculation.
+
+The table is kept up to date incrementally, in the same transaction as the
+change to calculations:
+
+- ORM inserts, updates and deletes of Calculation objects are recorded by
+  the mapper listeners at the end of this module.
+- Core statements that bypass the ORM (bulk inserts, the results backfill)
+  call record_added() or record_results() themselves.
+- Bulk loads and partition detaches, which touch the table wholesale, call
+  rebuild_calculation_stats() afterwards.
+
+Additions are single upserts (INSERT ... ON CONFLICT DO UPDATE) that add to
+the stored count and total, so concurrent writers never lose each other's
+updates. A removal subtracts from the count and total; when it removes the
+current minimum or maximum, that user's and type's row is recomputed from
+the calculations table (refresh_stats()). The stats row is locked before
+the calculations are read, so the recomputation sees every change
+committed before it, and changes committed after it are applied on top.
+
+Totals are maintained by adding and subtracting floats, so after many
+updates they can drift from a fresh sum in the last digits;
+rebuild_calculation_stats() recomputes them exactly. Calculations whose
+result is NULL (not backfilled yet) are counted but do not contribute to the
+total, minimum or maximum.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+import uuid
+
+from sqlalchemy import (
+    Column, DateTime, Float, ForeignKey, Integer, String, and_, case, delete, event, func, inspect,
+    or_, select, text, update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from app.models.calculation import Calculation
+
+
+class CalculationStats(Base):
+    """
+    Statistics of one user's calculations of one type.
+
+    Attributes:
+        user_id: The user (rows are deleted with the user)
+        type: The calculation type
+        count: Number of calculations
+        total: Sum of their results
+        minimum: Smallest result (None if no result is known)
+        maximum: Largest result (None if no result is known)
+        last_activity: Time of the last calculation created, updated or
+                       deleted
+    """
+    __tablename__ = "calculation_stats"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)
+    minimum = Column(Float, nullable=True)
+    maximum = Column(Float, nullable=True)
+    last_activity = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @property
+    def average(self) -> Optional[float]:
+        """Average result, or None when there are no calculations."""
+        return self.total / self.count if self.count else None
+
+    def __repr__(self):
+        return f"<CalculationStats(user_id={self.user_id}, type={self.type}, count={self.count})>"
+
+
+stats_table = CalculationStats.__table__
+calculations_table = Calculation.__table__
+
+Key = Tuple[uuid.UUID, str]
+
+
+def _field(item: Any, name: str) -> Any:
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def _aggregate(items: Iterable[Any]) -> Dict[Key, Dict[str, Any]]:
+    """Group items (objects, rows or dicts) by (user_id, type)."""
+    groups: Dict[Key, Dict[str, Any]] = {}
+    for item in items:
+        key = (_field(item, "user_id"), _field(item, "type"))
+        result = _field(item, "result")
+        group = groups.setdefault(key, {"count": 0, "total": 0.0, "minimum": None, "maximum": None})
+        group["count"] += 1
+        if result is not None:
+            group["total"] += result
+            if group["minimum"] is None or result < group["minimum"]:
+                group["minimum"] = result
+            if group["maximum"] is None or result > group["maximum"]:
+                group["maximum"] = result
+    return groups
+
+
+def _sorted(groups: Dict[Key, Dict[str, Any]]):
+    """
+    Groups in a fixed key order. Stats rows are locked in this order in
+    every transaction, so concurrent bulk writes cannot deadlock on them.
+    """
+    return sorted(groups.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+
+
+def _upsert(connection):
+    """The INSERT ... ON CONFLICT construct of the connection's dialect."""
+    if connection.dialect.name == "postgresql":
+        return postgresql.insert(stats_table)
+    if connection.dialect.name == "sqlite":
+        return sqlite.insert(stats_table)
+    raise NotImplementedError(f"Calculation statistics are not supported on {connection.dialect.name}.")
+
+
+def _merge(connection, items: Iterable[Any], count_rows: bool, now: Optional[datetime] = None) -> None:
+    groups = _aggregate(items)
+    if not groups:
+        return
+    now = now or datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "type": calculation_type,
+            "count": group["count"] if count_rows else 0,
+            "total": group["total"],
+            "minimum": group["minimum"],
+            "maximum": group["maximum"],
+            "last_activity": now,
+        }
+        for (user_id, calculation_type), group in _sorted(groups)
+    ]
+    statement = _upsert(connection)
+    excluded = statement.excluded
+    stats = stats_table.c
+    connection.execute(
+        statement.values(rows).on_conflict_do_update(
+            index_elements=[stats.user_id, stats.type],
+            set_={
+                "count": stats.count + excluded.count,
+                "total": stats.total + excluded.total,
+                "minimum": case(
+                    (or_(stats.minimum.is_(None), excluded.minimum < stats.minimum), excluded.minimum),
+                    else_=stats.minimum,
+                ),
+                "maximum": case(
+                    (or_(stats.maximum.is_(None), excluded.maximum > stats.maximum), excluded.maximum),
+                    else_=stats.maximum,
+                ),
+                "last_activity": case(
+                    (excluded.last_activity > stats.last_activity, excluded.last_activity),
+                    else_=stats.last_activity,
+                ),
+            },
+        )
+    )
+
+
+def record_added(connection, items: Iterable[Any], now: Optional[datetime] = None) -> None:
+    """
+    Add new calculations to the statistics.
+
+    Args:
+        connection: Connection of the transaction that
+                    inserted the calculations
+        items: The new calculations: objects, rows or dicts with user_id,
+               type and result
+        now: Time recorded as the last activity (defaults to now)
+    """
+    _merge(connection, items, count_rows=True, now=now)
+
+
+def record_results(connection, items: Iterable[Any], now: Optional[datetime] = None) -> None:
+    """
+    Add results filled in for calculations that are already counted but
+    whose result was NULL (see backfill_results()).
+    """
+    _merge(connection, items, count_rows=False, now=now)
+
+
+def refresh_stats(connection, user_id: uuid.UUID, calculation_type: str, now: Optional[datetime] = None) -> None:
+    """
+    Recompute one user's statistics for one type from the calculations table.
+
+    The stats row is locked (created if missing) before the calculations
+    are read. Every writer changes the stats row before committing, so once
+    the lock is held the read sees all committed changes, and changes not
+    committed yet are applied on top of the recomputed values afterwards.
+    """
+    now = now or datetime.utcnow()
+    stats = stats_table.c
+    key = and_(stats.user_id == user_id, stats.type == calculation_type)
+    lock = _upsert(connection).values(
+        user_id=user_id, type=calculation_type, count=0, total=0.0, last_activity=now
+    )
+    connection.execute(lock.on_conflict_do_update(
+        index_elements=[stats.user_id, stats.type], set_={"last_activity": lock.excluded.last_activity}
+    ))
+
+    calculations = calculations_table.c
+    count, total, minimum, maximum = connection.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(calculations.result), 0.0),
+            func.min(calculations.result),
+            func.max(calculations.result),
+        ).where(calculations.user_id == user_id, calculations.type == calculation_type)
+    ).one()
+    if not count:
+        connection.execute(delete(stats_table).where(key))
+        return
+    connection.execute(
+        update(stats_table).where(key).values(count=count, total=total, minimum=minimum, maximum=maximum)
+    )
+
+
+def record_removed(connection, items: Iterable[Any], now: Optional[datetime] = None) -> None:
+    """
+    Remove deleted calculations (or the old version of updated ones) from
+    the statistics.
+
+    Args:
+        connection: Connection of the transaction that removed
+                    the calculations, after the change has been executed
+        items: The removed calculations: objects, rows or dicts with
+               user_id, type and result
+        now: Time recorded as the last activity (defaults to now)
+    """
+    now = now or datetime.utcnow()
+    stats = stats_table.c
+    for (user_id, calculation_type), group in _sorted(_aggregate(items)):
+        # Locks the stats row until commit, so a recomputation below sees
+        # every concurrent change that got the lock first
+        row = connection.execute(
+            update(stats_table)
+            .where(stats.user_id == user_id, stats.type == calculation_type)
+            .values(count=stats.count - group["count"], total=stats.total - group["total"], last_activity=now)
+            .returning(stats.count, stats.minimum, stats.maximum)
+        ).first()
+        removed_extreme = row is not None and group["minimum"] is not None and (
+            row.minimum is None or group["minimum"] <= row.minimum
+            or row.maximum is None or group["maximum"] >= row.maximum
+        )
+        if row is None or row.count <= 0 or removed_extreme:
+            refresh_stats(connection, user_id, calculation_type, now=now)
+
+
+def record_changed(
+    connection,
+    user_id: uuid.UUID,
+    calculation_type: str,
+    old_result: Optional[float],
+    new_result: Optional[float],
+    now: Optional[datetime] = None,
+) -> None:
+    """
+    Replace the result of an updated calculation in the statistics.
+
+    Args:
+        connection: Connection of the transaction that updated
+                    the calculation, after the update has been executed
+        user_id: Owner of the calculation
+        calculation_type: Type of the calculation
+        old_result: Result before the update
+        new_result: Result after the update
+        now: Time recorded as the last activity (defaults to now)
+    """
+    now = now or datetime.utcnow()
+    stats = stats_table.c
+    values = {"total": stats.total + ((new_result or 0.0) - (old_result or 0.0)), "last_activity": now}
+    if new_result is not None:
+        values["minimum"] = case(
+            (or_(stats.minimum.is_(None), stats.minimum > new_result), new_result), else_=stats.minimum
+        )
+        values["maximum"] = case(
+            (or_(stats.maximum.is_(None), stats.maximum < new_result), new_result), else_=stats.maximum
+        )
+    row = connection.execute(
+        update(stats_table)
+        .where(stats.user_id == user_id, stats.type == calculation_type)
+        .values(values)
+        .returning(stats.minimum, stats.maximum)
+    ).first()
+    # The old result may have been the minimum or maximum, in which case
+    # the new one is not known without looking at the other calculations
+    if row is None or (old_result is not None and (
+        row.minimum is None or old_result <= row.minimum or row.maximum is None or old_result >= row.maximum
+    )):
+        refresh_stats(connection, user_id, calculation_type, now=now)
+
+
+def rebuild_calculation_stats(connection, user_id: Optional[uuid.UUID] = None) -> int:
+    """
+    Recompute the statistics from the calculations table.
+
+    Needed after changes that bypass the incremental maintenance, such as
+    COPY imports or detaching a partition. On PostgreSQL writes to the
+    calculations table are blocked (reads are not) until the transaction
+    ends, so the rebuilt statistics match the table exactly.
+
+    Args:
+        connection: Connection in a transaction (the caller commits)
+        user_id: Only rebuild this user's statistics
+
+    Returns:
+        The number of statistics rows written
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(f"LOCK TABLE {calculations_table.name} IN SHARE MODE"))
+    calculations = calculations_table.c
+    query = select(
+        calculations.user_id,
+        calculations.type,
+        func.count(),
+        func.coalesce(func.sum(calculations.result), 0.0),
+        func.min(calculations.result),
+        func.max(calculations.result),
+        func.max(calculations.updated_at),
+    ).group_by(calculations.user_id, calculations.type)
+    clear = delete(stats_table)
+    if user_id is not None:
+        query = query.where(calculations.user_id == user_id)
+        clear = clear.where(stats_table.c.user_id == user_id)
+    connection.execute(clear)
+    result = connection.execute(
+        stats_table.insert().from_select(
+            ["user_id", "type", "count", "total", "minimum", "maximum", "last_activity"], query
+        )
+    )
+    return result.rowcount
+
+
+@event.listens_for(Calculation, "after_insert", propagate=True)
+def _record_insert(mapper, connection, target):
+    record_added(connection, [target])
+
+
+@event.listens_for(Calculation, "after_update", propagate=True)
+def _record_update(mapper, connection, target):
+    state = inspect(target)
+    result_history = state.attrs.result.history
+    user_history = state.attrs.user_id.history
+    if not (result_history.has_changes() or user_history.has_changes()):
+        return
+    old_user_id = user_history.deleted[0] if user_history.deleted else target.user_id
+    if result_history.has_changes() and not result_history.deleted:
+        # The old result was never loaded, so its contribution is unknown
+        refresh_stats(connection, old_user_id, target.type)
+        if old_user_id != target.user_id:
+            refresh_stats(connection, target.user_id, target.type)
+        return
+    old_result = result_history.deleted[0] if result_history.has_changes() else target.result
+    now = datetime.utcnow()
+    if old_user_id == target.user_id:
+        record_changed(connection, target.user_id, target.type, old_result, target.result, now=now)
+    else:
+        record_removed(connection, [{"user_id": old_user_id, "type": target.type, "result": old_result}], now=now)
+        record_added(connection, [target], now=now)
+
+
+@event.listens_for(Calculation, "after_delete", propagate=True)
+def _record_delete(mapper, connection, target):
+    record_removed(connection, [target])
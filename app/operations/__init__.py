@@ -118,3 +118,12 @@ def divide(a: Number, b: Number) -> float:
     # Perform division of a by b and return the result as a float
     result = a / b
     return result
+
+# Map operation names (as used by the API routes) to their implementations.
+# This lets callers dispatch on a string without a chain of if/elif checks.
+OPERATIONS = {
+    "add": add,
+    "subtract": subtract,
+    "multiply": multiply,
+    "divide": divide,
+}
@@ -0,0 +1,91 @@
+"""
+Batch Operations
+
+This module evaluates many two-operand operations in a single pass. Instead of
+calling add()/subtract()/multiply()/divide() once per item, the items are
+grouped by operation and each group is computed with one vectorized NumPy
+call. Errors (such as division by zero) are reported per item so that one bad
+item does not fail the whole batch.
+
+Usage:
+    from app.operations.batch import evaluate_batch
+    results, errors = evaluate_batch(["add", "divide"], [1, 4], [2, 0])
+    # results == [3.0, None]
+    # errors == {1: "Cannot divide by zero!"}
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.operations import OPERATIONS, Number
+
+# NumPy ufuncs matching the scalar functions in app.operations
+VECTORIZED_OPERATIONS = {
+    "add": np.add,
+    "subtract": np.subtract,
+    "multiply": np.multiply,
+    "divide": np.true_divide,
+}
+
+
+def evaluate_batch(
+    ops: Sequence[str],
+    a: Sequence[Number],
+    b: Sequence[Number],
+) -> Tuple[List[Optional[float]], Dict[int, str]]:
+    """
+    Evaluate a batch of two-operand operations.
+
+    Items are grouped by operation name and each group is computed with a
+    single array operation, so the cost per item is a few nanoseconds rather
+    than a full function call.
+
+    Args:
+        ops: Operation names, one of the keys of app.operations.OPERATIONS
+        a: First operand of each item
+        b: Second operand of each item
+
+    Returns:
+        A tuple (results, errors). results is aligned with the input and holds
+        None for failed items; errors maps the index of each failed item to
+        its error message.
+
+    Raises:
+        ValueError: If the sequences differ in length or an operation name
+                    is not supported
+    """
+    if not len(ops) == len(a) == len(b):
+        raise ValueError("ops, a and b must have the same length.")
+
+    op_names = np.asarray(ops, dtype=object)
+    left = np.asarray(a, dtype=np.float64)
+    right = np.asarray(b, dtype=np.float64)
+    values = np.full(len(op_names), np.nan, dtype=np.float64)
+    failed = np.zeros(len(op_names), dtype=bool)
+    errors: Dict[int, str] = {}
+
+    for name in set(ops):
+        if name not in OPERATIONS:
+            raise ValueError(f"Unsupported operation: {name}")
+        mask = op_names == name
+        if name == "divide":
+            # Match divide(): a zero divisor is an error, not inf/nan
+            zero = mask & (right == 0)
+            for index in np.flatnonzero(zero):
+                errors[int(index)] = "Cannot divide by zero!"
+            failed |= zero
+            mask &= ~zero
+        with np.errstate(all="ignore"):
+            values[mask] = VECTORIZED_OPERATIONS[name](left[mask], right[mask])
+
+    # inf/nan cannot be represented in a JSON response
+    overflow = ~failed & ~np.isfinite(values)
+    for index in np.flatnonzero(overflow):
+        errors[int(index)] = "Result is not a finite number."
+    failed |= overflow
+
+    results: List[Optional[float]] = values.tolist()
+    for index in np.flatnonzero(failed):
+        results[index] = None
+    return results, errors
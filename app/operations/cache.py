@@ -0,0 +1,110 @@
+"""
+Operation Result Cache
+
+This module provides a bounded, thread-safe LRU cache with a time-to-live
+for the results of the arithmetic operations. Repeated requests for the same
+(operation, a, b) can then be answered without recomputing or rebuilding the
+response model.
+
+Usage:
+    from app.operations.cache import OperationCache
+    cache = OperationCache(maxsize=1024, ttl=60)
+    result = cache.get(("add", 1.0, 2.0))
+    if result is None:
+        result = add(1.0, 2.0)
+        cache.set(("add", 1.0, 2.0), result)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class OperationCache:
+    """
+    Least-recently-used cache whose entries also expire after `ttl` seconds.
+
+    A maxsize of 0 disables the cache: get() always misses and set() stores
+    nothing. Memory use is bounded by maxsize entries.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+        return self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: The cache key, e.g. ("add", a, b)
+
+        Returns:
+            The cached value, or None if it is missing or has expired
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: The cache key
+            value: The value to cache (must not be None)
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: size, maxsize, ttl, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
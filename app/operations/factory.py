@@ -5,14 +5,22 @@ This module implements the Factory Pattern for creating calculation objects.
 It centralizes the logic for instantiating the correct calculation subclass
 (Addition, Subtraction, Multiplication, Division) based on the requested type.
 
+For imports and other bulk writes, create_many() validates and inserts many
+calculations without building an ORM object for each one.
+
 Usage:
     from app.operations.factory import CalculationFactory
     calc = CalculationFactory.create(calculation_type, user_id, inputs)
+    ids = CalculationFactory.create_many(db, [(calculation_type, user_id, inputs), ...])
 """
 
-from typing import List
+from itertools import islice
+from typing import Any, Dict, Iterable, List
 import uuid
-from app.models.calculation import Addition, Subtraction, Multiplication, Division
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.calculation import Calculation, Addition, Subtraction, Multiplication, Division
+from app.models.calculation_stats import record_added
 
 class CalculationFactory:
     """
@@ -36,17 +44,108 @@ class CalculationFactory:
             inputs: List of numbers to calculate
 
         Returns:
-            An instance of the appropriate Calculation subclass
+            An instance of the appropriate Calculation subclass, with its
+            result already computed
 
         Raises:
-            ValueError: If calculation_type is not supported
+            ValueError: If calculation_type is not supported or the inputs
+                        are invalid for it
         """
-        calculation_class = cls.calculation_classes.get(calculation_type.lower())
+        calculation_type = calculation_type.lower()
+        calculation_class = cls.calculation_classes.get(calculation_type)
         if not calculation_class:
             raise ValueError(
                 f"Unsupported calculation type: {calculation_type}"
             )
         # Division by zero validation
-        if calculation_type.lower() == "division" and any(x == 0 for x in inputs[1:]):
+        if calculation_type == "division" and any(x == 0 for x in inputs[1:]):
             raise ValueError("Cannot divide by zero.")
-        return calculation_class(user_id=user_id, inputs=inputs)
+        calculation = calculation_class(user_id=user_id, inputs=inputs)
+        calculation.result = calculation.get_result()
+        return calculation
+
+    @classmethod
+    def build_rows(cls, items: Iterable[Any], start: int = 0) -> List[Dict[str, Any]]:
+        """
+        Validate many calculations and build their table rows.
+
+        All items are validated in one pass and their results computed
+        together with Calculation.compute_results(), instead of creating
+        and checking one object at a time.
+
+        Args:
+            items: (type, user_id, inputs) tuples or CalculationCreate objects
+            start: Number of the first item in error messages
+
+        Returns:
+            One dict per item with the id (generated here), user_id, type,
+            inputs and result columns
+
+        Raises:
+            ValueError: If any item has an unsupported type or invalid inputs;
+                        the message names the first such item
+        """
+        rows = []
+        for item in items:
+            if hasattr(item, "user_id"):
+                calculation_type, user_id, inputs = item.type, item.user_id, item.inputs
+            else:
+                calculation_type, user_id, inputs = item
+            calculation_type = getattr(calculation_type, "value", calculation_type).lower()
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "type": calculation_type,
+                "inputs": inputs,
+            })
+
+        results, errors = Calculation.compute_results(
+            (row["type"], row["inputs"]) for row in rows
+        )
+        if errors:
+            index = min(errors)
+            raise ValueError(f"Item {start + index}: {errors[index]}")
+        for row, result in zip(rows, results):
+            row["result"] = result
+        return rows
+
+    @classmethod
+    def create_many(cls, db: Session, items: Iterable[Any], chunk_size: int = 1000) -> List[uuid.UUID]:
+        """
+        Validate and insert many calculations.
+
+        Items are consumed chunk_size at a time, so any iterable (e.g. a
+        generator reading a file) can be imported without holding it all in
+        memory. Each chunk is validated with build_rows() and written with
+        one executemany INSERT, which SQLAlchemy sends as multi-row
+        INSERT ... VALUES statements ("insertmanyvalues"), and added to the
+        per-user statistics with one upsert. No ORM objects are created.
+
+        Nothing is committed: the caller commits (or rolls back) the whole
+        import as one transaction.
+
+        Args:
+            db: Database session
+            items: (type, user_id, inputs) tuples or CalculationCreate objects
+            chunk_size: Number of calculations validated and inserted at a time
+
+        Returns:
+            The ids of the new calculations, in the order of items
+
+        Raises:
+            ValueError: If an item is invalid (rows of earlier chunks have
+                        already been sent and must be rolled back)
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        table = Calculation.__table__
+        ids = []
+        items = iter(items)
+        while True:
+            chunk = list(islice(items, chunk_size))
+            if not chunk:
+                return ids
+            rows = cls.build_rows(chunk, start=len(ids))
+            db.execute(insert(table), rows)
+            record_added(db.connection(), rows)
+            ids.extend(row["id"] for row in rows)
@@ -0,0 +1,116 @@
+"""
+Streaming Operations
+
+This module evaluates an unbounded stream of newline-delimited JSON (NDJSON)
+operations. Each input line is an object such as {"op": "add", "a": 1, "b": 2}
+and produces one output line with either a "result" or an "error".
+
+Lines are parsed and evaluated as soon as they arrive, and only the current
+partial line is buffered, so memory use stays constant regardless of how
+long the stream is. Because the output is produced by an async generator,
+the next chunk of input is only read once the previous results have been
+handed to the client, which gives natural backpressure.
+
+evaluate_item() is also used by the WebSocket endpoint, which receives one
+operation per message instead of one per line.
+
+Usage:
+    from app.operations.stream import evaluate_ndjson
+    async for line in evaluate_ndjson(request.stream()):
+        ...
+"""
+
+import json
+import math
+from typing import Any, AsyncIterable, AsyncIterator, Dict
+
+from app.operations import OPERATIONS
+
+# Longest input line accepted before it is rejected, in bytes
+MAX_LINE_BYTES = 64 * 1024
+
+
+def evaluate_line(line: bytes) -> Dict[str, Any]:
+    """
+    Evaluate a single NDJSON operation line.
+
+    Args:
+        line: One JSON object with "op", "a" and "b" keys
+
+    Returns:
+        {"result": <number>} on success or {"error": <message>} on failure
+    """
+    try:
+        item = json.loads(line)
+    except ValueError:
+        return {"error": "Line is not valid JSON."}
+    return evaluate_item(item)
+
+
+def evaluate_item(item: Any) -> Dict[str, Any]:
+    """
+    Evaluate a single decoded operation.
+
+    Args:
+        item: A decoded JSON value, expected to be an object with "op", "a"
+              and "b" keys
+
+    Returns:
+        {"result": <number>} on success or {"error": <message>} on failure
+    """
+    if not isinstance(item, dict):
+        return {"error": "Line must be a JSON object."}
+    op = item.get("op")
+    operation = OPERATIONS.get(op) if isinstance(op, str) else None
+    if operation is None:
+        return {"error": f"op must be one of: {', '.join(sorted(OPERATIONS))}"}
+    operands = (item.get("a"), item.get("b"))
+    if any(isinstance(x, bool) or not isinstance(x, (int, float)) for x in operands):
+        return {"error": "Both a and b must be numbers."}
+    try:
+        # Same coercion as the OperationRequest model used by the single routes
+        a, b = float(operands[0]), float(operands[1])
+    except OverflowError:
+        return {"error": "Both a and b must be numbers."}
+    try:
+        result = operation(a, b)
+    except ValueError as e:
+        return {"error": str(e)}
+    if not math.isfinite(result):
+        return {"error": "Result is not a finite number."}
+    return {"result": result}
+
+
+async def evaluate_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """
+    Evaluate an NDJSON stream of operations, yielding NDJSON results.
+
+    Blank lines are skipped. Every other line produces exactly one output
+    line, in input order, so clients can match results to their requests by
+    position.
+
+    Args:
+        chunks: The raw request body, in arbitrarily sized chunks
+
+    Yields:
+        One encoded JSON line (terminated by a newline) per operation
+    """
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if skipping:
+                # Tail end of an over-long line that was already reported
+                skipping = False
+                continue
+            if line.strip():
+                yield (json.dumps(evaluate_line(line)) + "\n").encode()
+        if len(buffer) > MAX_LINE_BYTES:
+            if not skipping:
+                yield (json.dumps({"error": "Line is too long."}) + "\n").encode()
+            skipping = True
+            buffer = b""
+    if buffer.strip() and not skipping:
+        yield (json.dumps(evaluate_line(buffer)) + "\n").encode()
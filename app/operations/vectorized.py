@@ -0,0 +1,172 @@
+"""
+Vectorized Reductions
+
+This module computes calculation results over long input lists without a
+Python-level loop. It is used by the Calculation models' get_result() once
+the number of inputs reaches settings.VECTORIZE_THRESHOLD.
+
+The inputs are Python lists (what the inputs column loads into) and are
+reduced with C-implemented builtins (math.prod, sum, itertools.islice).
+Converting a list of boxed floats to a NumPy array costs more than a
+single reduction over it, so lists are never converted. Addition needs
+nothing here: get_result() already sums with the builtin sum().
+
+Two modes are available:
+
+- Fast (default): subtraction is computed as first - sum(rest) and
+  division as first / product(rest), one division per chunk of divisors.
+- Exact order (settings.VECTORIZE_EXACT_ORDER): every operation is applied
+  strictly left to right, giving bit-for-bit the same result as the loops
+  in get_result(). Subtraction and division have no faster exact
+  formulation, so None is returned and the caller keeps its loop.
+
+If the fast formulation overflows where the sequential one might not
+(e.g. a product of divisors that exceeds the float range), None is
+returned as well.
+
+Many calculations can also be reduced together with reduce_ragged(): their
+inputs are concatenated into one flat NumPy array, and each calculation is
+a segment of it starting at its offset. One ufunc.reduceat call then
+computes every segment, which is what Calculation.compute_results() builds
+on.
+
+Usage:
+    from app.operations.vectorized import reduce_inputs
+    reduce_inputs("division", [100.0, 2.0, 5.0])  # 10.0
+"""
+
+import math
+from itertools import islice
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.core.config import settings
+
+Number = Union[int, float]
+
+# NumPy ufuncs whose reduce applies each calculation type left to right
+REDUCTIONS = {
+    "addition": np.add,
+    "subtraction": np.subtract,
+    "multiplication": np.multiply,
+    "division": np.divide,
+}
+
+# Number of list divisors multiplied together before each division
+DIVISION_CHUNK_SIZE = 256
+
+
+def _is_finite_nonzero(value: Number) -> bool:
+    """Whether value is usable as a divisor (integers are always finite)."""
+    if isinstance(value, int):
+        return value != 0
+    return math.isfinite(value) and value != 0
+
+
+def _reduce_list(calculation_type: str, values: list, exact: bool) -> Optional[Number]:
+    """Reduce a list with C-implemented builtins, or return None."""
+    if calculation_type == "addition":
+        return sum(values)
+    if calculation_type == "multiplication":
+        # math.prod multiplies left to right, exactly like the loop
+        return math.prod(values)
+    if calculation_type not in ("subtraction", "division"):
+        raise ValueError(f"Unsupported calculation type: {calculation_type}")
+    if exact:
+        return None
+    first, rest = values[0], islice(values, 1, None)
+    if calculation_type == "subtraction":
+        result = first - sum(rest)
+        return result if not isinstance(result, float) or math.isfinite(result) else None
+    # Divide by the product of each chunk of divisors. Chunking keeps the
+    # partial products well inside the float range; a zero divisor makes a
+    # product zero (or NaN with an infinity), in which case the loop runs and
+    # raises
+    result = first
+    while True:
+        chunk = list(islice(rest, DIVISION_CHUNK_SIZE))
+        if not chunk:
+            return result
+        divisor = math.prod(chunk)
+        if not _is_finite_nonzero(divisor):
+            return None
+        try:
+            result /= divisor
+        except OverflowError:
+            return None
+
+
+def reduce_inputs(
+    calculation_type: str,
+    inputs: Sequence[Number],
+    exact: Optional[bool] = None,
+) -> Optional[Number]:
+    """
+    Compute the result of a calculation without a Python-level loop.
+
+    Args:
+        calculation_type: 'addition', 'subtraction', 'multiplication' or 'division'
+        inputs: At least two numbers, as a list
+        exact: Apply operations strictly in order (defaults to
+               settings.VECTORIZE_EXACT_ORDER)
+
+    Returns:
+        The result, or None if there is no faster way to compute it and the
+        caller should fall back to its loop (which also raises for a zero
+        divisor)
+
+    Raises:
+        ValueError: If the calculation type is unknown
+    """
+    if exact is None:
+        exact = settings.VECTORIZE_EXACT_ORDER
+    if not isinstance(inputs, list):
+        return None
+    return _reduce_list(calculation_type, inputs, exact)
+
+
+def reduce_ragged(
+    calculation_type: str,
+    values: np.ndarray,
+    offsets: np.ndarray,
+    exact: Optional[bool] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the results of many calculations of one type at once.
+
+    Args:
+        calculation_type: 'addition', 'subtraction', 'multiplication' or 'division'
+        values: The inputs of all calculations concatenated, as float64
+        offsets: Ascending start index of each calculation in values; every
+                 calculation must have at least two inputs
+        exact: Add strictly left to right (defaults to
+               settings.VECTORIZE_EXACT_ORDER); the other types always are
+
+    Returns:
+        A tuple (results, zero_division). results holds one value per
+        calculation; zero_division is a boolean mask of the division
+        calculations with a zero divisor, whose results are meaningless.
+
+    Raises:
+        ValueError: If the calculation type is unknown
+    """
+    if calculation_type not in REDUCTIONS:
+        raise ValueError(f"Unsupported calculation type: {calculation_type}")
+    if exact is None:
+        exact = settings.VECTORIZE_EXACT_ORDER
+    zero_division = np.zeros(len(offsets), dtype=bool)
+    with np.errstate(all="ignore"):
+        if calculation_type == "addition" and exact:
+            # add.reduceat sums pairwise; a - (-b) is exactly a + b and
+            # subtract.reduceat runs left to right
+            negated = np.negative(values)
+            negated[offsets] = values[offsets]
+            results = np.subtract.reduceat(negated, offsets)
+        else:
+            results = REDUCTIONS[calculation_type].reduceat(values, offsets)
+        if calculation_type == "division":
+            zero = values == 0
+            zero[offsets] = False  # The first input is a dividend
+            zero_division = np.logical_or.reduceat(zero, offsets)
+    return results, zero_division
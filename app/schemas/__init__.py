@@ -11,7 +11,8 @@ from app.schemas.calculation import (
     CalculationBase,
     CalculationCreate,
     CalculationUpdate,
-    CalculationResponse
+    CalculationResponse,
+    CalculationPage
 )
 
 __all__ = [
@@ -19,5 +20,6 @@ __all__ = [
     "CalculationBase",
     "CalculationCreate",
     "CalculationUpdate",
-    "CalculationResponse"
+    "CalculationResponse",
+    "CalculationPage"
 ]
@@ -1,23 +1,126 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+import asyncio
+import math
+import struct
+from contextlib import asynccontextmanager, suppress
+from typing import List, Literal, Optional, Union
+from uuid import UUID
+from fastapi import Body, Depends, FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field, field_validator  # Use @validator for Pydantic 1.x
+from pydantic import BaseModel, Field, ValidationError, field_validator  # Use @validator for Pydantic 1.x
 from fastapi.exceptions import RequestValidationError
 from app.operations import add, subtract, multiply, divide  # Ensure correct import path
+from app.operations.batch import evaluate_batch
+from app.operations.cache import OperationCache
+from app.operations.stream import evaluate_item, evaluate_ndjson
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.static_pages import PrecompressedPage
+from app.core.compression import CompressionMiddleware
+from app.core.etags import etag_matches
+from app.core.metrics import (
+    OPERATION_ERRORS,
+    VALIDATION_ERRORS,
+    MetricsMiddleware,
+    mark_process_dead,
+    render_metrics,
+    route_label,
+)
+from app.crud import calculation as calculation_crud
+from app.crud.partitions import ensure_partitions
+from app.database import async_engine, engine, get_async_db, get_db, get_pool_stats, get_read_db
+from fastapi.concurrency import run_in_threadpool
+from app.schemas.calculation import (
+    CalculationCreate,
+    CalculationPage,
+    CalculationResponse,
+    CalculationStatsResponse,
+    CalculationUpdate,
+    calculation_etag,
+    calculation_page_etag,
+    calculation_payload,
+    calculation_payloads,
+    validate_calculations_json,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 import uvicorn
 import logging
+import json
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+async def ensure_calculation_partitions():
+    """
+    Create the upcoming calculations partitions. Only does anything when
+    the table is partitioned; a failure is logged rather than raised, since
+    rows still go to the default partition.
+    """
+    try:
+        created = await run_in_threadpool(ensure_partitions, engine, settings.CALCULATION_PARTITIONS_AHEAD)
+        if created:
+            logger.info("Created calculations partitions: %s", ", ".join(created))
+    except Exception:
+        logger.exception("Could not create calculations partitions")
+
+async def maintain_partitions(interval: float):
+    """
+    Keep creating partitions every interval seconds, so a long-running
+    server does not reach a month without one.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        await ensure_calculation_partitions()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: create upcoming calculations partitions on
+    startup (and periodically while running) and release resources on
+    shutdown.
+    """
+    maintenance = None
+    if engine.dialect.name == "postgresql":
+        await ensure_calculation_partitions()
+        if settings.CALCULATION_PARTITIONS_INTERVAL > 0:
+            maintenance = asyncio.create_task(maintain_partitions(settings.CALCULATION_PARTITIONS_INTERVAL))
+    yield
+    if maintenance is not None:
+        maintenance.cancel()
+        with suppress(asyncio.CancelledError):
+            await maintenance
+    # Close pooled async connections on the event loop that opened them
+    await async_engine.dispose()
+    # Stop counting this worker's in-flight requests (multiprocess metrics)
+    mark_process_dead()
+
+# FastJSONResponse encodes with orjson; calculation routes go further and
+# build their response data straight from stored rows (calculation_payload)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Compress larger, complete responses with brotli or gzip
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Record request counts, latencies and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
 
 # Setup templates directory
 templates = Jinja2Templates(directory="templates")
 
+# Landing page prebuilt by scripts/build_index.py, if configured
+index_page = (
+    PrecompressedPage.from_directory(settings.INDEX_PAGE_DIR, max_age=settings.INDEX_PAGE_MAX_AGE)
+    if settings.INDEX_PAGE_DIR else None
+)
+
+# Cache of recent operation results, keyed by operation_key()
+operation_cache = OperationCache(maxsize=settings.OPERATION_CACHE_SIZE, ttl=settings.OPERATION_CACHE_TTL)
+
 # Pydantic model for request data
 class OperationRequest(BaseModel):
     a: float = Field(..., description="The first number")
@@ -37,11 +140,42 @@ class OperationResponse(BaseModel):
 class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
 
+# Pydantic model for a single item of a batch request
+class BatchOperation(BaseModel):
+    op: Literal["add", "subtract", "multiply", "divide"] = Field(..., description="The operation to perform")
+    a: float = Field(..., description="The first number")
+    b: float = Field(..., description="The second number")
+
+# Pydantic model for a per-item batch error
+class BatchError(BaseModel):
+    index: int = Field(..., description="Position of the failed item in the request")
+    error: str = Field(..., description="Error message")
+
+# Pydantic model for batch response
+class BatchResponse(BaseModel):
+    results: List[Optional[float]] = Field(..., description="Result per item, null if the item failed")
+    errors: List[BatchError] = Field(..., description="Errors for the items that failed")
+
+# Streaming response for endpoints that read the request body while responding
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that does not listen for client disconnects.
+
+    The default StreamingResponse consumes `receive()` to watch for a
+    disconnect, which would swallow the request body chunks that the
+    response generator is still reading. Here the generator reads the body
+    itself and stops when the client goes away.
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
 # Custom Exception Handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     logger.error(f"HTTPException on {request.url.path}: {exc.detail}")
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={"error": exc.detail},
     )
@@ -51,28 +185,79 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     # Extracting error messages
     error_messages = "; ".join([f"{err['loc'][-1]}: {err['msg']}" for err in exc.errors()])
     logger.error(f"ValidationError on {request.url.path}: {error_messages}")
-    return JSONResponse(
+    VALIDATION_ERRORS.labels(route_label(request.scope)).inc()
+    return FastJSONResponse(
         status_code=400,
         content={"error": error_messages},
     )
 
+# Calculations may change at any time: clients may keep responses but must
+# revalidate them (If-None-Match) before reusing them
+CALCULATION_CACHE_CONTROL = "private, no-cache"
+
+def calculation_response(calculation, status_code: int = 200):
+    """
+    Response with one stored calculation (an ORM object or row) as
+    CalculationResponse JSON, without validating it again, and its ETag.
+    """
+    headers = {
+        "ETag": calculation_etag(calculation),
+        "Cache-Control": CALCULATION_CACHE_CONTROL,
+    }
+    return FastJSONResponse(calculation_payload(calculation), status_code=status_code, headers=headers)
+
+def not_modified_response(etag: str):
+    """304 Not Modified for a conditional GET whose ETag matched."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CALCULATION_CACHE_CONTROL})
+
+def calculation_list_response(calculations, status_code: int = 200):
+    """Response with a list of stored calculations as CalculationResponse JSON."""
+    return FastJSONResponse(calculation_payloads(calculations), status_code=status_code)
+
 @app.get("/")
 async def read_root(request: Request):
     """
-    Serve the index.html template.
+    Serve the index page: the precompressed build when INDEX_PAGE_DIR is
+    set, otherwise the index.html template.
     """
+    if index_page is not None:
+        return index_page.response(request.headers)
     return templates.TemplateResponse("index.html", {"request": request})
 
+def operation_key(op: str, operation: OperationRequest):
+    """
+    Cache key of an operation: the operands' float64 bytes rather than the
+    floats themselves, since 0.0 == -0.0 (with the same hash) but the signs
+    can give different results, e.g. 0.0 * -1 and -0.0 * -1.
+    """
+    return (op, struct.pack("<dd", operation.a, operation.b))
+
+def check_finite(result):
+    """
+    Return result, or raise ValueError if it is not a finite number (e.g.
+    an overflow): OperationResponse.result is a float, and /batch and
+    /stream report the same error.
+    """
+    if not math.isfinite(result):
+        raise ValueError("Result is not a finite number.")
+    return result
+
 @app.post("/add", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
 async def add_route(operation: OperationRequest):
     """
     Add two numbers.
     """
+    key = operation_key("add", operation)
+    cached = operation_cache.get(key)
+    if cached is not None:
+        return FastJSONResponse(content={"result": cached})
     try:
-        result = add(operation.a, operation.b)
+        result = check_finite(add(operation.a, operation.b))
+        operation_cache.set(key, result)
         return OperationResponse(result=result)
     except Exception as e:
         logger.error(f"Add Operation Error: {str(e)}")
+        OPERATION_ERRORS.labels("add").inc()
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/subtract", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
@@ -80,11 +265,17 @@ async def subtract_route(operation: OperationRequest):
     """
     Subtract two numbers.
     """
+    key = operation_key("subtract", operation)
+    cached = operation_cache.get(key)
+    if cached is not None:
+        return FastJSONResponse(content={"result": cached})
     try:
-        result = subtract(operation.a, operation.b)
+        result = check_finite(subtract(operation.a, operation.b))
+        operation_cache.set(key, result)
         return OperationResponse(result=result)
     except Exception as e:
         logger.error(f"Subtract Operation Error: {str(e)}")
+        OPERATION_ERRORS.labels("subtract").inc()
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/multiply", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
@@ -92,11 +283,17 @@ async def multiply_route(operation: OperationRequest):
     """
     Multiply two numbers.
     """
+    key = operation_key("multiply", operation)
+    cached = operation_cache.get(key)
+    if cached is not None:
+        return FastJSONResponse(content={"result": cached})
     try:
-        result = multiply(operation.a, operation.b)
+        result = check_finite(multiply(operation.a, operation.b))
+        operation_cache.set(key, result)
         return OperationResponse(result=result)
     except Exception as e:
         logger.error(f"Multiply Operation Error: {str(e)}")
+        OPERATION_ERRORS.labels("multiply").inc()
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/divide", response_model=OperationResponse, responses={400: {"model": ErrorResponse}})
@@ -104,15 +301,335 @@ async def divide_route(operation: OperationRequest):
     """
     Divide two numbers.
     """
+    key = operation_key("divide", operation)
+    cached = operation_cache.get(key)
+    if cached is not None:
+        return FastJSONResponse(content={"result": cached})
     try:
-        result = divide(operation.a, operation.b)
+        result = check_finite(divide(operation.a, operation.b))
+        operation_cache.set(key, result)
         return OperationResponse(result=result)
     except ValueError as e:
         logger.error(f"Divide Operation Error: {str(e)}")
+        OPERATION_ERRORS.labels("divide").inc()
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Divide Operation Internal Error: {str(e)}")
+        OPERATION_ERRORS.labels("divide").inc()
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+@app.post("/batch", response_model=BatchResponse, responses={400: {"model": ErrorResponse}})
+async def batch_route(
+    operations: List[BatchOperation] = Body(..., max_length=settings.BATCH_MAX_ITEMS)
+):
+    """
+    Evaluate many operations in one request.
+
+    Items are grouped by operation and computed with vectorized array math.
+    A failing item (e.g. division by zero) is reported in `errors` and does
+    not fail the rest of the batch.
+    """
+    results, errors = evaluate_batch(
+        [item.op for item in operations],
+        [item.a for item in operations],
+        [item.b for item in operations],
+    )
+    for index in errors:
+        OPERATION_ERRORS.labels(operations[index].op).inc()
+    return BatchResponse(
+        results=results,
+        errors=[BatchError(index=index, error=message) for index, message in sorted(errors.items())],
+    )
+
+@app.post("/stream", response_class=DuplexStreamingResponse)
+async def stream_route(request: Request):
+    """
+    Evaluate a newline-delimited JSON stream of operations.
+
+    Each request line is an object like {"op": "add", "a": 1, "b": 2}; each
+    response line is {"result": ...} or {"error": ...}, in the same order.
+    Results are streamed back as they are computed.
+    """
+    return DuplexStreamingResponse(
+        evaluate_ndjson(request.stream()),
+        media_type="application/x-ndjson",
+    )
+
+@app.websocket("/ws")
+async def websocket_route(websocket: WebSocket):
+    """
+    Evaluate operations over a long-lived WebSocket connection.
+
+    Each message is a JSON object like {"id": 1, "op": "add", "a": 1, "b": 2}
+    and is answered with {"id": 1, "result": 3} or {"id": 1, "error": "..."}.
+    The optional "id" is echoed back so clients can correlate replies.
+    Messages may be sent as text or binary (UTF-8 JSON) frames.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("text")
+            if data is None:
+                data = message.get("bytes") or b""
+            try:
+                item = json.loads(data)
+            except ValueError:
+                await websocket.send_json({"id": None, "error": "Message is not valid JSON."})
+                continue
+            reply = {"id": item.get("id") if isinstance(item, dict) else None}
+            reply.update(evaluate_item(item))
+            await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_route():
+    """
+    Prometheus metrics, aggregated across worker processes when
+    PROMETHEUS_MULTIPROC_DIR is set.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/stats/pool")
+async def pool_stats_route():
+    """
+    Connection pool usage for this worker process.
+
+    Reports checkout wait times, connections in use and overflow for the
+    sync and async database engines.
+    """
+    return get_pool_stats()
+
+@app.get("/stats/cache")
+async def cache_stats_route():
+    """
+    Operation result cache counters for this worker process.
+    """
+    return operation_cache.stats()
+
+@app.post(
+    "/calculations",
+    status_code=201,
+    response_model=Union[CalculationResponse, List[CalculationResponse]],
+    responses={400: {"model": ErrorResponse}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "oneOf": [
+                            {"$ref": "#/components/schemas/CalculationCreate"},
+                            {"type": "array", "items": {"$ref": "#/components/schemas/CalculationCreate"}},
+                        ]
+                    }
+                }
+            },
+        }
+    },
+)
+async def create_calculations_route(request: Request, db: Session = Depends(get_db)):
+    """
+    Create a calculation, or many calculations when given a list.
+
+    The JSON shape picks the schema: an array is validated as a list of
+    CalculationCreate (at most BATCH_MAX_ITEMS) and inserted with a single
+    multi-row INSERT statement, anything else as one CalculationCreate. Errors
+    only mention the schema that applies.
+    """
+    body = await request.body()
+    if body.lstrip()[:1] == b"[":
+        items = validate_json_body(validate_calculations_json, body)
+        calculations = await run_in_threadpool(create_calculation_list, db, items)
+        return calculation_list_response(calculations, status_code=201)
+    data = validate_json_body(CalculationCreate.model_validate_json, body)
+    calculation = await run_in_threadpool(create_single_calculation, db, data)
+    return calculation_response(calculation, status_code=201)
+
+def validate_json_body(validate, body: bytes):
+    """
+    Validate a raw JSON request body with validate, answering errors like
+    FastAPI's own body validation does.
+    """
+    try:
+        return validate(body)
+    except ValidationError as e:
+        # Locate the errors in the body, like FastAPI's own validation does
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+
+def create_single_calculation(db: Session, data: CalculationCreate):
+    """
+    Insert one calculation, answering a 400 when the user does not exist.
+    Blocking: async routes call it in the threadpool.
+    """
+    try:
+        return calculation_crud.create_calculation(db, data)
+    except IntegrityError as e:
+        db.rollback()
+        logger.error(f"Create Calculation Error: {str(e.orig)}")
+        raise HTTPException(status_code=400, detail="User does not exist.")
+
+def create_calculation_list(db: Session, items: List[CalculationCreate]):
+    """
+    Insert many calculations in one statement, answering a 400 when a user
+    does not exist. Blocking: async routes call it in the threadpool.
+    """
+    try:
+        return calculation_crud.bulk_create_calculations(db, items)
+    except IntegrityError as e:
+        db.rollback()
+        logger.error(f"Create Calculation Error: {str(e.orig)}")
+        raise HTTPException(status_code=400, detail="User does not exist.")
+
+@app.post(
+    "/calculations/bulk",
+    status_code=201,
+    response_model=List[CalculationResponse],
+    responses={400: {"model": ErrorResponse}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/CalculationCreate"}}
+                }
+            },
+        }
+    },
+)
+async def bulk_create_calculations_route(request: Request, db: Session = Depends(get_db)):
+    """
+    Create many calculations from a JSON array.
+
+    The raw request body is parsed and validated in one pydantic-core call
+    (validate_calculations_json) instead of being decoded to Python objects
+    and validated item by item, which roughly doubles validation throughput
+    for large arrays. At most BATCH_MAX_ITEMS calculations per request;
+    validation stops at the first item over the limit.
+    """
+    items = validate_json_body(validate_calculations_json, await request.body())
+    # The session is synchronous: insert (and roll back) off the event loop
+    calculations = await run_in_threadpool(create_calculation_list, db, items)
+    return calculation_list_response(calculations, status_code=201)
+
+def openapi_schema():
+    """
+    The app's OpenAPI schema, plus the CalculationCreate schema that the
+    request bodies of the create routes refer to: those routes validate
+    their raw bodies themselves, so FastAPI does not collect it.
+    """
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        components = schema["components"]["schemas"]
+        create_schema = CalculationCreate.model_json_schema(ref_template="#/components/schemas/{model}")
+        for name, definition in create_schema.pop("$defs", {}).items():
+            components.setdefault(name, definition)
+        components["CalculationCreate"] = create_schema
+    return app.openapi_schema
+
+app.openapi = openapi_schema
+
+@app.get("/calculations/{calculation_id}", response_model=CalculationResponse, responses={404: {"model": ErrorResponse}})
+async def get_calculation_route(calculation_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get a calculation by id.
+
+    Responses carry a weak ETag. A request whose If-None-Match still
+    matches gets a 304 after reading only the calculation's updated_at and
+    result.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        version = await calculation_crud.get_calculation_version_async(db, calculation_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Calculation not found.")
+        etag = calculation_etag(version)
+        if etag_matches(if_none_match, [etag]):
+            return not_modified_response(etag)
+    calculation = await calculation_crud.get_calculation_async(db, calculation_id)
+    if calculation is None:
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+    return calculation_response(calculation)
+
+@app.patch(
+    "/calculations/{calculation_id}",
+    response_model=CalculationResponse,
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+def update_calculation_route(calculation_id: UUID, data: CalculationUpdate, db: Session = Depends(get_db)):
+    """
+    Update the inputs of a calculation and recompute its result.
+    """
+    calculation = calculation_crud.get_calculation(db, calculation_id)
+    if calculation is None:
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+    try:
+        return calculation_response(calculation_crud.update_calculation(db, calculation, data))
+    except ValueError as e:
+        logger.error(f"Update Calculation Error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/calculations/{calculation_id}", status_code=204, responses={404: {"model": ErrorResponse}})
+def delete_calculation_route(calculation_id: UUID, db: Session = Depends(get_db)):
+    """
+    Delete a calculation.
+    """
+    calculation = calculation_crud.get_calculation(db, calculation_id)
+    if calculation is None:
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+    calculation_crud.delete_calculation(db, calculation)
+    return Response(status_code=204)
+
+@app.get("/users/{user_id}/calculations", response_model=CalculationPage, responses={400: {"model": ErrorResponse}})
+def list_user_calculations_route(
+    user_id: UUID,
+    request: Request,
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of calculations to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    List a user's calculations, newest first, one page at a time.
+
+    Selects plain rows with just the response's columns rather than loading
+    Calculation objects. Served by a read replica when one is configured, so
+    a calculation just created may take a moment to appear.
+
+    Pages carry a weak ETag. For a request with If-None-Match, the page's
+    ids, updated_at and results are read first (no inputs), and a 304 is returned
+    when the ETag still matches.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    try:
+        if if_none_match:
+            versions, next_cursor = calculation_crud.list_user_calculation_rows(
+                db, user_id, limit, cursor, columns=["updated_at", "result"]
+            )
+            etag = calculation_page_etag(versions, next_cursor)
+            if etag_matches(if_none_match, [etag]):
+                return not_modified_response(etag)
+        items, next_cursor = calculation_crud.list_user_calculation_rows(
+            db, user_id, limit, cursor, columns=list(CalculationResponse.model_fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": calculation_page_etag(items, next_cursor), "Cache-Control": CALCULATION_CACHE_CONTROL}
+    return FastJSONResponse({"items": calculation_payloads(items), "next_cursor": next_cursor}, headers=headers)
+
+@app.get("/users/{user_id}/calculations/stats", response_model=List[CalculationStatsResponse])
+def user_calculation_stats_route(user_id: UUID, db: Session = Depends(get_read_db)):
+    """
+    Count, total, average, minimum and maximum result of a user's
+    calculations, per type.
+
+    Read from the incrementally maintained calculation_stats table, so the
+    cost does not grow with the number of calculations.
+    """
+    return calculation_crud.get_user_calculation_stats(db, user_id)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,37 @@
+"""
+Backfill Calculation Results
+
+Computes and stores the result of every calculation whose result column is
+still NULL (rows written before results were computed on write). Work is done
+in small committed chunks so it can run against a live database.
+
+Usage:
+    PYTHONPATH=. python scripts/backfill_results.py --chunk-size 1000 --pause 0.1
+"""
+
+import argparse
+import time
+
+from app.crud.calculation import backfill_results
+from app.database import SessionLocal
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill in NULL calculation results.")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per transaction (default: 1000)")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between chunks (default: 0)")
+    args = parser.parse_args(argv)
+
+    updated = failed = 0
+    with SessionLocal() as db:
+        for chunk_updated, chunk_failed in backfill_results(db, chunk_size=args.chunk_size):
+            updated += chunk_updated
+            failed += chunk_failed
+            print(f"Updated {updated} rows so far ({failed} could not be computed)")
+            if args.pause:
+                time.sleep(args.pause)
+    print(f"Backfill complete: {updated} rows updated, {failed} left NULL.")
+
+
+if __name__ == "__main__":
+    main()
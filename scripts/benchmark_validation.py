@@ -0,0 +1,64 @@
+"""
+Benchmark Calculation Validation
+
+Measures how many calculations per second are validated from a JSON array
+(as received in a request body), three ways:
+
+- per item: json.loads() then CalculationCreate.model_validate() for each
+  item, which is what validating a List[CalculationCreate] body costs
+  item by item
+- adapter (python): json.loads() then one TypeAdapter.validate_python()
+- adapter (json): one TypeAdapter.validate_json() on the raw bytes, as used
+  by POST /calculations/bulk
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_validation.py --items 10000 --repeat 5
+"""
+
+import argparse
+import json
+import time
+import uuid
+
+from app.schemas.calculation import CalculationCreate, CalculationCreateList, validate_calculations_json
+
+TYPES = ("Addition", "subtraction", "multiplication", "division")
+
+
+def build_payload(items: int) -> bytes:
+    user_id = str(uuid.uuid4())
+    return json.dumps([
+        {"type": TYPES[index % len(TYPES)], "inputs": [index, 1.5, 2, 3], "user_id": user_id}
+        for index in range(items)
+    ]).encode()
+
+
+def best_time(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark validation of calculation payloads.")
+    parser.add_argument("--items", type=int, default=10000, help="Calculations per payload (default: 10000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per method; the best is reported (default: 5)")
+    args = parser.parse_args(argv)
+
+    payload = build_payload(args.items)
+    methods = {
+        "per item": lambda: [CalculationCreate.model_validate(item) for item in json.loads(payload)],
+        "adapter (python)": lambda: CalculationCreateList.validate_python(json.loads(payload)),
+        "adapter (json)": lambda: validate_calculations_json(payload),
+    }
+    print(f"{args.items} items, {len(payload) / 1024:.0f} KiB, best of {args.repeat}")
+    for name, function in methods.items():
+        seconds = best_time(function, args.repeat)
+        print(f"{name:>18}: {seconds * 1000:8.1f} ms  {args.items / seconds:12,.0f} items/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Build the Precompressed Landing Page
+
+Renders templates/index.html once, minifies it and writes it with its
+gzip/brotli compressed copies, for GET / to serve as a static asset when
+INDEX_PAGE_DIR points at the output directory (see app/core/static_pages.py).
+Run it whenever the template changes; the Dockerfile runs it at build time.
+
+Usage:
+    PYTHONPATH=. python scripts/build_index.py
+    PYTHONPATH=. python scripts/build_index.py --output build/index
+"""
+
+import argparse
+from pathlib import Path
+
+from app.core.static_pages import build_page
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the minified, precompressed landing page.")
+    parser.add_argument("--templates", default="templates", help="Template directory (default: templates)")
+    parser.add_argument("--name", default="index.html", help="Template to build (default: index.html)")
+    parser.add_argument("--output", default="build/index", help="Output directory (default: build/index)")
+    args = parser.parse_args(argv)
+
+    written = build_page(args.templates, args.name, args.output)
+    source_size = (Path(args.templates) / args.name).stat().st_size
+    for encoding, path in written.items():
+        print(f"{path}\t{path.stat().st_size} bytes\t({encoding or 'identity'})")
+    print(f"Template: {source_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
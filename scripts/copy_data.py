@@ -0,0 +1,51 @@
+"""
+Bulk Import and Export
+
+Streams the users and calculations tables to and from files, using COPY on
+PostgreSQL and batched SELECT/INSERT on other databases. Memory use is
+constant, so it is suitable for backups and migrating large histories.
+
+Import users before calculations, since calculations reference their users.
+
+Usage:
+    PYTHONPATH=. python scripts/copy_data.py export users users.csv
+    PYTHONPATH=. python scripts/copy_data.py export calculations calculations.bin --format binary
+    PYTHONPATH=. python scripts/copy_data.py import users users.csv
+    PYTHONPATH=. python scripts/copy_data.py import calculations calculations.bin --format binary --chunk-size 50000
+"""
+
+import argparse
+import time
+
+from app.crud.transfer import FORMATS, TABLES, export_table, import_table
+from app.database import engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import users and calculations in bulk.")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("table", choices=list(TABLES))
+    parser.add_argument("path", help="File to write (export) or read (import)")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="File format (default: csv)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per transaction when importing (default: 10000)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.action == "export":
+        with open(args.path, "wb") as out:
+            count = export_table(
+                engine, args.table, out, file_format=args.format,
+                progress=lambda written: print(f"Written {written / (1 << 20):.0f} MiB so far"),
+            )
+        print(f"Exported {count} rows from {args.table} in {time.perf_counter() - start:.1f}s.")
+    else:
+        count = 0
+        with open(args.path, "rb") as source:
+            for chunk_count in import_table(engine, args.table, source, file_format=args.format, chunk_size=args.chunk_size):
+                count += chunk_count
+                print(f"Imported {count} rows so far")
+        print(f"Imported {count} rows into {args.table} in {time.perf_counter() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
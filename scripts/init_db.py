@@ -1,7 +1,52 @@
+"""
+Create Database Tables
+
+Creates every table and index that does not exist yet. With --partitioned
+(PostgreSQL only) the calculations table is created partitioned by month of
+created_at instead; see app/crud/partitions.py.
+
+Usage:
+    PYTHONPATH=. python scripts/init_db.py
+    PYTHONPATH=. python scripts/init_db.py --partitioned --months-ahead 3
+"""
+
+import argparse
+
+from sqlalchemy import inspect
+
 from app.models.calculation import Base
+from app.models.calculation_stats import CalculationStats, rebuild_calculation_stats
 from app.models.user import User  # Ensure User table is registered
+from app.crud.partitions import create_partitioned_table
 from app.database import engine
 
-if __name__ == "__main__":
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create the database tables.")
+    parser.add_argument("--partitioned", action="store_true",
+                        help="Create the calculations table partitioned by month (PostgreSQL only)")
+    parser.add_argument("--months-ahead", type=int, default=3,
+                        help="Monthly partitions to create after the current month (default: 3)")
+    args = parser.parse_args(argv)
+
+    if args.partitioned:
+        created = create_partitioned_table(engine, months_ahead=args.months_ahead)
+        print(f"Partitioned calculations table ready ({len(created)} partitions created).")
+
+    new_stats_table = not inspect(engine).has_table(CalculationStats.__tablename__)
     Base.metadata.create_all(bind=engine)
+    # create_all() skips tables that already exist, so add any indexes
+    # introduced since those tables were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    if new_stats_table:
+        # Fill the statistics in for calculations written before the table existed
+        with engine.begin() as connection:
+            rows = rebuild_calculation_stats(connection)
+        print(f"Calculation statistics built ({rows} rows).")
     print("Database tables created.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Migrate Calculation Inputs Storage
+
+Converts the calculations.inputs column to another storage format: "json",
+"array" (PostgreSQL float8[]) or "binary" (packed little-endian float64).
+Rows are converted in small committed chunks so it can run against a live
+database; only the final column swap locks the table.
+
+Once it completes, restart the application with CALCULATION_INPUTS_STORAGE
+set to the new format.
+
+Usage:
+    PYTHONPATH=. python scripts/migrate_inputs_storage.py --to array --chunk-size 1000
+"""
+
+import argparse
+
+from app.crud.calculation import get_inputs_storage, migrate_inputs_storage
+from app.database import engine
+from app.models.types import INPUTS_STORAGES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the storage format of calculation inputs.")
+    parser.add_argument("--to", required=True, choices=INPUTS_STORAGES, help="Target storage format")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per transaction (default: 1000)")
+    args = parser.parse_args(argv)
+
+    with engine.connect() as connection:
+        print(f"Current storage: {get_inputs_storage(connection)}")
+    converted = 0
+    for chunk_converted in migrate_inputs_storage(engine, args.to, chunk_size=args.chunk_size):
+        converted += chunk_converted
+        print(f"Converted {converted} rows so far")
+    with engine.connect() as connection:
+        storage = get_inputs_storage(connection)
+    print(f"Migration complete: {converted} rows converted, storage is now {storage}.")
+    print(f"Set CALCULATION_INPUTS_STORAGE={args.to} and restart the application.")
+
+
+if __name__ == "__main__":
+    main()
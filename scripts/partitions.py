@@ -0,0 +1,63 @@
+"""
+Manage Calculations Partitions
+
+Works on a calculations table created with scripts/init_db.py --partitioned.
+
+- ensure: create the partitions for the current month and the next months.
+  The API does this at startup and every CALCULATION_PARTITIONS_INTERVAL
+  seconds; with the interval set to 0, run it daily from cron instead, e.g.
+  0 3 * * * cd /app && PYTHONPATH=. python scripts/partitions.py ensure
+- list: show the partitions and their date ranges
+- detach: detach one month's partition (e.g. to archive it with pg_dump),
+  and with --drop delete it. This replaces a DELETE of every old row.
+
+Usage:
+    PYTHONPATH=. python scripts/partitions.py ensure --months-ahead 6
+    PYTHONPATH=. python scripts/partitions.py list
+    PYTHONPATH=. python scripts/partitions.py detach 2024-01 --drop
+"""
+
+import argparse
+from datetime import datetime
+
+from app.core.config import settings
+from app.crud.partitions import detach_partition, ensure_partitions, list_partitions
+from app.database import engine
+
+
+def parse_month(value: str):
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a month as YYYY-MM, got {value!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the monthly partitions of the calculations table.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="Create the upcoming partitions")
+    ensure.add_argument("--months-ahead", type=int, default=settings.CALCULATION_PARTITIONS_AHEAD,
+                        help=f"Months after the current one (default: {settings.CALCULATION_PARTITIONS_AHEAD})")
+    commands.add_parser("list", help="List the partitions")
+    detach = commands.add_parser("detach", help="Detach the partition of one month")
+    detach.add_argument("month", type=parse_month, help="Month of the partition, as YYYY-MM")
+    detach.add_argument("--drop", action="store_true", help="Drop the detached partition and its rows")
+    args = parser.parse_args(argv)
+
+    if args.command == "ensure":
+        created = ensure_partitions(engine, months_ahead=args.months_ahead)
+        print(f"Created {len(created)} partitions{': ' + ', '.join(created) if created else '.'}")
+    elif args.command == "list":
+        with engine.connect() as connection:
+            for name, bounds in list_partitions(connection):
+                print(f"{name}\t{bounds}")
+    else:
+        try:
+            name = detach_partition(engine, args.month, drop=args.drop)
+        except ValueError as error:
+            parser.error(str(error))
+        print(f"{'Dropped' if args.drop else 'Detached'} {name}.")
+
+
+if __name__ == "__main__":
+    main()
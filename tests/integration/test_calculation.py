@@ -19,6 +19,8 @@ These tests demonstrate key OOP principles:
 - Encapsulation: Each class encapsulates its calculation logic
 """
 
+import random
+
 import pytest
 import uuid
 
@@ -405,3 +407,269 @@ def test_polymorphic_method_calling():
         result = calc.get_result()
         assert result == expected, \
             f"{calc_type} failed: expected {expected}, got {result}"
+
+
+# ============================================================================
+# Tests for Persisted Results
+# ============================================================================
+
+def _create_user(db):
+    from app.models.user import User
+    user_id = dummy_user_id()
+    db.add(User(id=user_id, username=f"TestUser_{user_id}", email=f"test_{user_id}@example.com"))
+    db.commit()
+    return user_id
+
+
+def test_factory_sets_result():
+    """
+    Test that the factory computes the result when the calculation is created.
+    """
+    calc = Calculation.create("multiplication", dummy_user_id(), [2, 3, 4])
+    assert calc.result == 24
+
+
+def test_result_persisted_on_insert_and_update():
+    """
+    Test that the result is stored on insert and recomputed when inputs change.
+    """
+    with contextlib.closing(SessionLocal()) as db:
+        user_id = _create_user(db)
+        calc = Subtraction(user_id=user_id, inputs=[10, 3])
+        db.add(calc)
+        db.commit()
+        assert calc.result == 7
+
+        calc.inputs = [10, 3, 2]
+        db.commit()
+        db.expire_all()
+        assert db.get(Calculation, calc.id).result == 5
+
+
+def test_compute_results_matches_get_result():
+    """
+    Test that the bulk computation matches get_result() for mixed types and
+    input forms, in input order, and reports invalid items by index.
+    """
+    calc = Division(user_id=dummy_user_id(), inputs=[100, 2, 5])
+    items = [
+        ("addition", [1, 2, 3]),
+        calc,
+        ("subtraction", [10, 3, 2]),
+        ("multiplication", [2, 3, 4]),
+        ("division", [1, 0, 2]),
+        ("addition", [5]),
+        ("modulus", [5, 2]),
+        ("subtraction", "not a list"),
+        ("addition", [0.1, 0.2, 0.3]),
+    ]
+    results, errors = Calculation.compute_results(items)
+    assert results == [6, 10, 5, 24, None, None, None, None, 0.1 + 0.2 + 0.3]
+    assert errors == {
+        4: "Cannot divide by zero.",
+        5: "Inputs must be a list with at least two numbers.",
+        6: "Unsupported calculation type: modulus",
+        7: "Inputs must be a list of numbers.",
+    }
+
+
+@pytest.mark.parametrize("exact", [False, True], ids=["fast", "exact"])
+def test_compute_results_matches_get_result_for_long_inputs(monkeypatch, exact):
+    """
+    Test that calculations long enough for get_result()'s vectorized path
+    get the same results from compute_results() and from the factory's
+    single and bulk paths.
+    """
+    from app.core.config import settings
+    from app.operations.factory import CalculationFactory
+
+    monkeypatch.setattr(settings, "VECTORIZE_THRESHOLD", 100)
+    monkeypatch.setattr(settings, "VECTORIZE_EXACT_ORDER", exact)
+    rng = random.Random(12)
+    user_id = dummy_user_id()
+    items = [
+        (calculation_type, user_id, [rng.uniform(0.5, 2.0) for _ in range(length)])
+        for calculation_type in ("addition", "subtraction", "multiplication", "division")
+        for length in (3, 99, 100, 500)
+    ]
+
+    results, errors = Calculation.compute_results([(item[0], item[2]) for item in items])
+    assert errors == {}
+    expected = [CalculationFactory.create(*item).get_result() for item in items]
+    assert results == expected
+    assert [CalculationFactory.create(*item).result for item in items] == expected
+    assert [row["result"] for row in CalculationFactory.build_rows(items)] == expected
+
+
+def test_compute_results_falls_back_for_non_float_inputs():
+    """
+    Test that inputs NumPy cannot convert are computed with get_result().
+    """
+    big = 10 ** 400
+    results, errors = Calculation.compute_results(
+        [("addition", [big, 1]), ("multiplication", [2, "x"]), ("multiplication", [2, 3])]
+    )
+    assert results == [big + 1, "xx", 6]
+    assert errors == {}
+
+    results, errors = Calculation.compute_results([("division", [1, "x"])])
+    assert results == [None]
+    assert 0 in errors
+
+
+def test_backfill_results():
+    """
+    Test that the backfill fills in NULL results in chunks and skips invalid rows.
+    """
+    from sqlalchemy import insert, select
+    from app.crud.calculation import backfill_results
+
+    table = Calculation.__table__
+    with contextlib.closing(SessionLocal()) as db:
+        user_id = _create_user(db)
+        rows = [
+            {"id": dummy_user_id(), "user_id": user_id, "type": "addition", "inputs": [1, 2]},
+            {"id": dummy_user_id(), "user_id": user_id, "type": "division", "inputs": [9, 3]},
+            {"id": dummy_user_id(), "user_id": user_id, "type": "multiplication", "inputs": [2, 5]},
+            {"id": dummy_user_id(), "user_id": user_id, "type": "division", "inputs": [9, 0]},
+        ]
+        db.execute(insert(table), rows)
+        db.commit()
+        before = db.execute(select(table.c.id, table.c.updated_at).where(table.c.user_id == user_id)).all()
+
+        # Other rows in the database may also be NULL; only check this user's rows
+        chunks = list(backfill_results(db, chunk_size=2))
+        assert len(chunks) >= 2
+        assert sum(failed for _, failed in chunks) >= 1
+
+        results = dict(db.execute(select(table.c.id, table.c.result).where(table.c.user_id == user_id)).all())
+        assert [results[row["id"]] for row in rows] == [3, 3, 10, None]
+        after = db.execute(select(table.c.id, table.c.updated_at).where(table.c.user_id == user_id)).all()
+        assert sorted(before) == sorted(after)
+
+
+def test_computed_result_in_sql():
+    """
+    Test that the SQL result expression matches get_result() for every type,
+    including signs, zeros, division by zero and out-of-range products, and
+    that it can be aggregated and filtered on in the database.
+    """
+    from sqlalchemy import func, insert, select
+
+    cases = [
+        ("addition", [1.5, 2, -3]),
+        ("subtraction", [10, 3, 2]),
+        ("subtraction", [10, 0.5]),
+        ("multiplication", [2, -3, 4]),
+        ("multiplication", [-2, -3]),
+        ("multiplication", [5, 0, -2]),
+        ("multiplication", [1e300, 1e300]),
+        ("division", [100, -2, 5]),
+        ("division", [0, 3]),
+        ("division", [1, 1e-300, 1e-300]),
+        ("division", [1, 0, 2]),
+    ]
+    with contextlib.closing(SessionLocal()) as db:
+        user_id = _create_user(db)
+        rows = [
+            {"id": dummy_user_id(), "user_id": user_id, "type": calculation_type, "inputs": inputs}
+            for calculation_type, inputs in cases
+        ]
+        db.execute(insert(Calculation.__table__), rows)
+        db.commit()
+
+        computed = dict(db.execute(
+            select(Calculation.id, Calculation.computed_result).where(Calculation.user_id == user_id)
+        ).all())
+        expected, _ = Calculation.compute_results(cases)
+        for row, value in zip(rows, expected):
+            if value is None:
+                assert computed[row["id"]] is None
+            else:
+                assert computed[row["id"]] == pytest.approx(value, rel=1e-12)
+
+        total = db.execute(
+            select(func.sum(Calculation.computed_result))
+            .where(Calculation.user_id == user_id, Calculation.type == "addition")
+        ).scalar_one()
+        assert total == pytest.approx(0.5)
+
+        negative = db.execute(
+            select(Calculation.id).where(Calculation.user_id == user_id, Calculation.computed_result < 0)
+        ).scalars().all()
+        assert set(negative) == {rows[3]["id"], rows[7]["id"]}
+
+    # On an instance, the hybrid is just get_result()
+    assert Multiplication(user_id=dummy_user_id(), inputs=[2, 5]).computed_result == 10
+
+
+def test_computed_result_with_array_storage():
+    """
+    Test that the SQL result expression gives the same results when the
+    inputs are stored as a float8[] column (unnest() instead of
+    json_array_elements_text()).
+    """
+    from types import SimpleNamespace
+    from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+    from app.models.calculation import _result_expression
+    from app.models.types import CalculationInputs
+
+    cases = [
+        ("addition", [1.5, 2, -3]),
+        ("subtraction", [10, 3, 2]),
+        ("multiplication", [-2, -3, 4]),
+        ("multiplication", [5, 0, -2]),
+        ("division", [100, -2, 5]),
+        ("division", [1, 0, 2]),
+    ]
+    table = Table(
+        "computed_result_array_check",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("type", String),
+        Column("inputs", CalculationInputs("array")),
+        prefixes=["TEMPORARY"],
+    )
+    calculations = SimpleNamespace(__table__=table, type=table.c.type, inputs=table.c.inputs)
+    with contextlib.closing(SessionLocal()) as db:
+        connection = db.connection()
+        table.create(connection)
+        connection.execute(
+            insert(table),
+            [{"id": index, "type": kind, "inputs": inputs} for index, (kind, inputs) in enumerate(cases)],
+        )
+        computed = connection.execute(
+            select(_result_expression(calculations)).select_from(table).order_by(table.c.id)
+        ).scalars().all()
+        db.rollback()
+
+    expected, _ = Calculation.compute_results(cases)
+    assert computed == [None if value is None else pytest.approx(value, rel=1e-12) for value in expected]
+
+
+def test_factory_create_many():
+    """
+    Test that create_many inserts validated rows in chunks and returns their
+    ids in order, and that an invalid item names its position in the import.
+    """
+    from sqlalchemy import func, select
+    from app.operations.factory import CalculationFactory
+
+    with contextlib.closing(SessionLocal()) as db:
+        user_id = _create_user(db)
+        items = (("addition", user_id, [i, 1]) for i in range(25))
+        ids = CalculationFactory.create_many(db, items, chunk_size=10)
+        db.commit()
+
+        assert len(ids) == 25
+        results = dict(db.execute(
+            select(Calculation.id, Calculation.result).where(Calculation.user_id == user_id)
+        ).all())
+        assert [results[calculation_id] for calculation_id in ids] == [i + 1 for i in range(25)]
+
+        items = [("addition", user_id, [1, 2])] * 12 + [("division", user_id, [1, 0])]
+        with pytest.raises(ValueError, match="Item 12: Cannot divide by zero."):
+            CalculationFactory.create_many(db, items, chunk_size=10)
+        db.rollback()
+        count = db.execute(select(func.count()).where(Calculation.user_id == user_id)).scalar_one()
+        assert count == 25
@@ -0,0 +1,436 @@
+# tests/integration/test_calculation_api.py
+"""
+Integration Tests for the Calculations REST API
+
+These tests exercise the /calculations routes in main.py against the
+configured database, covering single and bulk creation, reads, partial
+updates and deletes.
+"""
+
+import contextlib
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database import SessionLocal, async_engine, engine
+from app.models.user import User
+from main import app
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def user_id():
+    """
+    Create a user to own the calculations and delete it (with its
+    calculations) after the test.
+    """
+    user_id = uuid.uuid4()
+    with contextlib.closing(SessionLocal()) as db:
+        db.add(User(id=user_id, username=f"ApiUser_{user_id}", email=f"api_{user_id}@example.com"))
+        db.commit()
+    yield user_id
+    with contextlib.closing(SessionLocal()) as db:
+        db.delete(db.get(User, user_id))
+        db.commit()
+
+
+def test_create_and_get_calculation(client, user_id):
+    response = client.post("/calculations", json={"type": "Addition", "inputs": [1, 2, 3], "user_id": str(user_id)})
+    assert response.status_code == 201
+    created = response.json()
+    assert created["type"] == "addition"
+    assert created["result"] == 6
+
+    response = client.get(f"/calculations/{created['id']}")
+    assert response.status_code == 200
+    assert response.json() == created
+
+
+def test_bulk_create_uses_single_insert(client, user_id):
+    payload = [
+        {"type": "addition", "inputs": [1, 2], "user_id": str(user_id)},
+        {"type": "subtraction", "inputs": [10, 3, 2], "user_id": str(user_id)},
+        {"type": "multiplication", "inputs": [2, 3, 4], "user_id": str(user_id)},
+        {"type": "division", "inputs": [100, 2, 5], "user_id": str(user_id)},
+    ]
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO calculations "):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/calculations", json=payload)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 201
+    assert len(statements) == 1
+    body = response.json()
+    assert [item["type"] for item in body] == ["addition", "subtraction", "multiplication", "division"]
+    assert [item["result"] for item in body] == [3, 5, 24, 10]
+    assert len({item["id"] for item in body}) == 4
+
+
+def test_bulk_create_too_many(client):
+    from app.core.config import settings
+
+    item = {"type": "addition", "inputs": [1, 2], "user_id": str(uuid.uuid4())}
+    for url in ("/calculations", "/calculations/bulk"):
+        response = client.post(url, json=[item] * (settings.BATCH_MAX_ITEMS + 1))
+        # Request validation errors are answered with 400 by the app's handler
+        assert response.status_code == 400
+        assert f"at most {settings.BATCH_MAX_ITEMS} items" in response.json()["error"]
+
+
+def test_bulk_create_empty_list(client):
+    response = client.post("/calculations", json=[])
+    assert response.status_code == 201
+    assert response.json() == []
+
+
+def test_create_calculation_unknown_user(client):
+    response = client.post("/calculations", json={"type": "addition", "inputs": [1, 2], "user_id": str(uuid.uuid4())})
+    assert response.status_code == 400
+    assert response.json()["error"] == "User does not exist."
+
+
+def test_create_calculation_division_by_zero(client, user_id):
+    response = client.post("/calculations", json={"type": "division", "inputs": [1, 0], "user_id": str(user_id)})
+    assert response.status_code == 400
+    # Only the single calculation schema is reported, not the list one
+    assert response.json()["error"] == "body: Value error, Cannot divide by zero"
+
+
+def test_create_calculation_invalid_fields(client):
+    response = client.post("/calculations", json={"type": "power", "inputs": [1]})
+    assert response.status_code == 400
+    assert response.json()["error"] == (
+        "type: Value error, Type must be one of: addition, division, multiplication, subtraction; "
+        "inputs: List should have at least 2 items after validation, not 1; "
+        "user_id: Field required"
+    )
+
+    response = client.post("/calculations", json=[{"type": "addition", "inputs": [1, 2]}])
+    assert response.status_code == 400
+    assert response.json()["error"] == "user_id: Field required"
+
+
+def test_create_calculation_schema(client):
+    schema = client.get("/openapi.json").json()
+    body = schema["paths"]["/calculations"]["post"]["requestBody"]["content"]["application/json"]["schema"]
+    assert body["oneOf"][0] == {"$ref": "#/components/schemas/CalculationCreate"}
+    assert schema["components"]["schemas"]["CalculationCreate"]["required"] == ["type", "inputs", "user_id"]
+
+
+def test_update_calculation(client, user_id):
+    created = client.post("/calculations", json={"type": "division", "inputs": [100, 2], "user_id": str(user_id)}).json()
+
+    response = client.patch(f"/calculations/{created['id']}", json={"inputs": [81, 3, 3]})
+    assert response.status_code == 200
+    assert response.json()["inputs"] == [81, 3, 3]
+    assert response.json()["result"] == 9
+
+    # Invalid update is rejected and leaves the calculation unchanged
+    response = client.patch(f"/calculations/{created['id']}", json={"inputs": [81, 0]})
+    assert response.status_code == 400
+    assert client.get(f"/calculations/{created['id']}").json()["result"] == 9
+
+
+def test_delete_calculation(client, user_id):
+    created = client.post("/calculations", json={"type": "addition", "inputs": [1, 2], "user_id": str(user_id)}).json()
+
+    response = client.delete(f"/calculations/{created['id']}")
+    assert response.status_code == 204
+    assert client.get(f"/calculations/{created['id']}").status_code == 404
+    assert client.delete(f"/calculations/{created['id']}").status_code == 404
+
+
+def test_calculation_not_found(client):
+    missing = uuid.uuid4()
+    assert client.get(f"/calculations/{missing}").status_code == 404
+    assert client.patch(f"/calculations/{missing}", json={"inputs": [1, 2]}).status_code == 404
+
+
+def test_list_user_calculations_pages(client, user_id):
+    for inputs in ([1, 1], [1, 2], [1, 3], [1, 4], [1, 5]):
+        client.post("/calculations", json={"type": "addition", "inputs": inputs, "user_id": str(user_id)})
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/users/{user_id}/calculations", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Newest first, every calculation exactly once
+    assert [item["result"] for item in seen] == [6, 5, 4, 3, 2]
+    keys = [(item["created_at"], item["id"]) for item in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_list_user_calculations_invalid_cursor(client, user_id):
+    response = client.get(f"/users/{user_id}/calculations", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["error"] == "Invalid cursor."
+
+
+def test_calculation_row_queries(client, user_id):
+    from app.crud.calculation import (
+        list_user_calculation_rows,
+        list_user_calculations,
+        stream_user_calculation_rows,
+    )
+
+    for inputs in ([1, 1], [1, 2], [1, 3]):
+        client.post("/calculations", json={"type": "addition", "inputs": inputs, "user_id": str(user_id)})
+
+    with contextlib.closing(SessionLocal()) as db:
+        rows, cursor = list_user_calculation_rows(db, user_id, limit=2)
+        # Summary columns only: no inputs, and no ORM objects in the session
+        assert rows[0]._fields == ("id", "type", "result", "created_at")
+        assert [row.result for row in rows] == [4, 3]
+        assert len(db.identity_map) == 0
+
+        rows, next_cursor = list_user_calculation_rows(db, user_id, limit=2, cursor=cursor, columns=["inputs"])
+        assert rows[0]._fields == ("inputs", "id", "created_at")
+        assert [row.inputs for row in rows] == [[1, 1]]
+        assert next_cursor is None
+
+        calculations, _ = list_user_calculations(db, user_id, limit=3)
+        streamed = list(stream_user_calculation_rows(db, user_id, columns=["id"], chunk_size=2))
+        assert [row.id for row in streamed] == [calculation.id for calculation in calculations]
+
+        with pytest.raises(ValueError, match="Unknown calculation columns: nope"):
+            list_user_calculation_rows(db, user_id, columns=["id", "nope"])
+        with pytest.raises(ValueError, match="Unknown calculation columns"):
+            stream_user_calculation_rows(db, user_id, columns=["nope"])
+
+
+def test_calculation_stats(client, user_id):
+    payload = [
+        {"type": "addition", "inputs": [1, 2], "user_id": str(user_id)},
+        {"type": "addition", "inputs": [10, 20], "user_id": str(user_id)},
+        {"type": "division", "inputs": [9, 3], "user_id": str(user_id)},
+    ]
+    created = client.post("/calculations", json=payload).json()
+    client.patch(f"/calculations/{created[1]['id']}", json={"inputs": [2, 2]})
+    client.delete(f"/calculations/{created[2]['id']}")
+
+    response = client.get(f"/users/{user_id}/calculations/stats")
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == 1
+    assert {key: body[0][key] for key in ("type", "count", "total", "average", "minimum", "maximum")} == {
+        "type": "addition", "count": 2, "total": 7.0, "average": 3.5, "minimum": 3.0, "maximum": 4.0,
+    }
+    assert client.get(f"/users/{uuid.uuid4()}/calculations/stats").json() == []
+
+
+def test_calculation_stats_concurrent_writes(user_id):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.crud.calculation import get_user_calculation_stats
+    from app.models.calculation import Calculation
+    from app.models.calculation_stats import rebuild_calculation_stats
+    from app.operations.factory import CalculationFactory
+
+    def write(worker):
+        with contextlib.closing(SessionLocal()) as db:
+            calculations = []
+            for i in range(10):
+                calculation = CalculationFactory.create("addition", user_id, [worker, i])
+                db.add(calculation)
+                db.commit()
+                calculations.append(calculation)
+            for calculation in calculations[::3]:
+                calculation.inputs = [worker, 100]
+                db.commit()
+            for calculation in calculations[1::3]:
+                db.delete(calculation)
+                db.commit()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(write, range(4)))
+
+    def current():
+        with contextlib.closing(SessionLocal()) as db:
+            return [
+                (row.count, round(row.total, 6), row.minimum, row.maximum)
+                for row in get_user_calculation_stats(db, user_id)
+            ]
+
+    incremental = current()
+    with engine.begin() as connection:
+        rebuild_calculation_stats(connection, user_id)
+    assert incremental == current()
+    with contextlib.closing(SessionLocal()) as db:
+        assert incremental[0][0] == db.query(Calculation).filter(Calculation.user_id == user_id).count() == 28
+
+
+def test_bulk_create_from_json(client, user_id):
+    payload = [
+        {"type": "Addition", "inputs": [1, 2], "user_id": str(user_id)},
+        {"type": "division", "inputs": [100, 2, 5], "user_id": str(user_id)},
+    ]
+    response = client.post("/calculations/bulk", json=payload)
+    assert response.status_code == 201
+    assert [(item["type"], item["result"]) for item in response.json()] == [("addition", 3), ("division", 10)]
+
+    payload[1]["inputs"] = [1, 0]
+    response = client.post("/calculations/bulk", json=payload)
+    assert response.status_code == 400
+    assert "Cannot divide by zero" in response.json()["error"]
+
+    response = client.post("/calculations/bulk", json=[{**payload[0], "user_id": str(uuid.uuid4())}])
+    assert response.status_code == 400
+    assert response.json()["error"] == "User does not exist."
+
+
+def test_list_response_matches_validated_models(client, user_id):
+    from app.crud.calculation import list_user_calculations
+    from app.schemas.calculation import CalculationPage
+
+    for inputs in ([1, 2], [2.5, 0.5, 3], [7, 1e-3]):
+        client.post("/calculations", json={"type": "multiplication", "inputs": inputs, "user_id": str(user_id)})
+
+    response = client.get(f"/users/{user_id}/calculations", params={"limit": 10})
+    with contextlib.closing(SessionLocal()) as db:
+        calculations, next_cursor = list_user_calculations(db, user_id, limit=10)
+        validated = CalculationPage(items=calculations, next_cursor=next_cursor).model_dump_json()
+    assert response.content == validated.encode()
+
+
+def test_get_calculation_not_modified(client, user_id):
+    created = client.post("/calculations", json={"type": "addition", "inputs": [1, 2], "user_id": str(user_id)})
+    etag = created.headers["etag"]
+    assert etag.startswith('W/"')
+    url = f"/calculations/{created.json()['id']}"
+
+    response = client.get(url)
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # The route uses the async engine, whose statements go through its sync_engine
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.get(url, headers={"If-None-Match": f'"other", {etag}'})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    # Only the version columns were read
+    assert len(statements) == 1
+    assert statements[0].startswith("SELECT calculations.id, calculations.updated_at, calculations.result ")
+
+    # An update changes the ETag, so the old one no longer matches
+    updated = client.patch(url, json={"inputs": [2, 1]})
+    assert updated.headers["etag"] != etag
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == updated.json()
+    assert response.headers["etag"] == updated.headers["etag"]
+
+    client.delete(url)
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_list_user_calculations_not_modified(client, user_id):
+    for inputs in ([1, 1], [1, 2], [1, 3]):
+        client.post("/calculations", json={"type": "addition", "inputs": inputs, "user_id": str(user_id)})
+    url = f"/users/{user_id}/calculations"
+
+    first = client.get(url, params={"limit": 2})
+    etag = first.headers["etag"]
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(url, params={"limit": 2}, headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 304
+    # One query for the ids, updated_at and results of the page, without the inputs
+    selects = [statement for statement in statements if statement.startswith("SELECT")]
+    assert len(selects) == 1
+    assert "calculations.updated_at" in selects[0] and "inputs" not in selects[0]
+    assert response.headers["etag"] == etag
+
+    # Every page has its own ETag
+    second = client.get(url, params={"limit": 2, "cursor": first.json()["next_cursor"]})
+    assert second.headers["etag"] != etag
+    assert client.get(url, params={"limit": 3}).headers["etag"] != etag
+
+    # Updating a calculation on the page, adding one and deleting one all change it
+    newest = first.json()["items"][0]
+    client.patch(f"/calculations/{newest['id']}", json={"inputs": [3, 0]})
+    response = client.get(url, params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    created = client.post("/calculations", json={"type": "addition", "inputs": [0, 0], "user_id": str(user_id)})
+    response = client.get(url, params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    client.delete(f"/calculations/{created.json()['id']}")
+    response = client.get(url, params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [item["result"] for item in response.json()["items"]] == [3, 3]
+
+
+def test_backfilled_result_changes_etags(client, user_id):
+    from sqlalchemy import update
+
+    from app.crud.calculation import backfill_results
+    from app.models.calculation import Calculation
+
+    created = client.post("/calculations", json={"type": "addition", "inputs": [1, 2], "user_id": str(user_id)}).json()
+    url = f"/calculations/{created['id']}"
+    list_url = f"/users/{user_id}/calculations"
+    with engine.begin() as connection:
+        connection.execute(
+            update(Calculation.__table__)
+            .where(Calculation.__table__.c.id == uuid.UUID(created["id"]))
+            .values(result=None, updated_at=Calculation.__table__.c.updated_at)
+        )
+    etag = client.get(url).headers["etag"]
+    list_etag = client.get(list_url).headers["etag"]
+
+    with contextlib.closing(SessionLocal()) as db:
+        for _ in backfill_results(db):
+            pass
+
+    # updated_at is unchanged, but the result is new, so are the ETags
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["result"] == 3
+    assert response.json()["updated_at"] == created["updated_at"]
+    response = client.get(list_url, headers={"If-None-Match": list_etag})
+    assert response.status_code == 200
+    assert response.json()["items"][0]["result"] == 3
@@ -13,15 +13,23 @@ Key Testing Concepts:
 4. Business Rules: Verify domain-specific validation (e.g., no division by 0)
 """
 
+import math
 import pytest
+from datetime import datetime
+from types import SimpleNamespace
 from uuid import uuid4
 from pydantic import ValidationError
+from app.core.responses import dumps
+from app.models.calculation import Division
 from app.schemas.calculation import (
     CalculationType,
     CalculationBase,
     CalculationCreate,
     CalculationUpdate,
-    CalculationResponse
+    CalculationResponse,
+    calculation_payload,
+    calculation_payloads,
+    validate_calculations_json
 )
 
 
@@ -339,3 +347,83 @@ def test_schema_with_mixed_int_and_float():
     }
     calc = CalculationBase(**data)
     assert len(calc.inputs) == 4
+
+
+# ============================================================================
+# Tests for Bulk Validation from JSON
+# ============================================================================
+
+def test_validate_calculations_json():
+    """Test that a JSON array is validated with the CalculationCreate rules."""
+    user_id = uuid4()
+    data = (
+        f'[{{"type": "Addition", "inputs": [1, 2], "user_id": "{user_id}"}},'
+        f' {{"type": "division", "inputs": [9, 3], "user_id": "{user_id}"}}]'
+    ).encode()
+    items = validate_calculations_json(data)
+    assert [item.type for item in items] == [CalculationType.ADDITION, CalculationType.DIVISION]
+    assert items[1] == CalculationCreate(type="division", inputs=[9, 3], user_id=user_id)
+
+
+def test_validate_calculations_json_errors():
+    """Test that errors name the failing item and keep the usual messages."""
+    user_id = uuid4()
+    data = (
+        f'[{{"type": "addition", "inputs": [1, 2], "user_id": "{user_id}"}},'
+        f' {{"type": "modulus", "inputs": [1, 2], "user_id": "{user_id}"}},'
+        f' {{"type": "division", "inputs": [1, 0], "user_id": "{user_id}"}},'
+        f' {{"type": "addition", "inputs": 5, "user_id": "{user_id}"}}]'
+    )
+    with pytest.raises(ValidationError) as exc_info:
+        validate_calculations_json(data)
+    errors = {err["loc"][:2]: err["msg"] for err in exc_info.value.errors()}
+    assert "Type must be one of" in errors[(1, "type")]
+    assert "Cannot divide by zero" in errors[(2,)]
+    assert "Input should be a valid list" in errors[(3, "inputs")]
+
+    with pytest.raises(ValidationError):
+        validate_calculations_json(b'[{"type": "addition"')
+
+
+def test_validate_calculations_json_limit():
+    """Test that validation stops at the first item over BATCH_MAX_ITEMS."""
+    from app.core.config import settings
+
+    item = f'{{"type": "addition", "inputs": [1, 2], "user_id": "{uuid4()}"}}'
+    data = "[" + ", ".join([item] * settings.BATCH_MAX_ITEMS + ['{"type": "modulus"}']) + "]"
+    with pytest.raises(ValidationError) as exc_info:
+        validate_calculations_json(data)
+    # The invalid item after the limit is never validated
+    assert [err["type"] for err in exc_info.value.errors()] == ["too_long"]
+
+
+# ============================================================================
+# Tests for the Trusted Response Payload
+# ============================================================================
+
+@pytest.mark.parametrize(
+    "inputs, result",
+    [([1, 2, 3], 6), ([10.5, 3.25], 7.25), ([1e300, 1e300], math.inf), ([0.1] * 50, 1e-16)],
+    ids=["integers", "floats", "infinite_result", "long_inputs"]
+)
+def test_calculation_payload_matches_validated_response(inputs, result):
+    """Test that the unvalidated payload encodes exactly like CalculationResponse."""
+    row = SimpleNamespace(
+        id=uuid4(), user_id=uuid4(), type="addition", inputs=inputs, result=result,
+        created_at=datetime(2025, 1, 2, 3, 4, 5, 678901), updated_at=datetime(2025, 1, 2, 3, 4, 5),
+    )
+    validated = CalculationResponse.model_validate(row).model_dump_json().encode()
+    assert dumps(calculation_payload(row)) == validated
+
+
+def test_calculation_payloads_from_orm_objects():
+    """Test parity for Calculation objects, as returned by the create routes."""
+    calculations = [
+        Division(id=uuid4(), user_id=uuid4(), inputs=[100, 8], result=12.5,
+                 created_at=datetime(2025, 5, 6), updated_at=datetime(2025, 5, 7, 8, 9, 10, 11))
+        for _ in range(3)
+    ]
+    validated = b"[" + b",".join(
+        CalculationResponse.model_validate(calculation).model_dump_json().encode() for calculation in calculations
+    ) + b"]"
+    assert dumps(calculation_payloads(calculations)) == validated
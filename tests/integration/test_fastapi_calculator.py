@@ -99,6 +99,25 @@ def test_multiply_api(client):
     # Assert that the JSON response contains the correct 'result' value
     assert response.json()['result'] == 50, f"Expected result 50, got {response.json()['result']}"
 
+def test_multiply_api_overflow(client, monkeypatch):
+    """
+    Test that a result too large for a float is rejected with a 400 error.
+
+    The result is declared as a float, so infinity is reported as an error
+    like /batch and /stream do, rather than returned as null. The error is
+    not cached either.
+    """
+    import main
+    from app.operations.cache import OperationCache
+
+    monkeypatch.setattr(main, 'operation_cache', OperationCache(maxsize=16, ttl=60))
+    for route, payload in [('/multiply', {'a': 1e200, 'b': 1e200}), ('/multiply', {'a': 1e200, 'b': 1e200}),
+                           ('/add', {'a': 1e308, 'b': 1e308}), ('/divide', {'a': 1e308, 'b': 1e-308})]:
+        response = client.post(route, json=payload)
+        assert response.status_code == 400, f"Expected status code 400, got {response.status_code}"
+        assert response.json() == {'error': 'Result is not a finite number.'}
+    assert client.get('/stats/cache').json()['size'] == 0
+
 # ---------------------------------------------
 # Test Function: test_divide_api
 # ---------------------------------------------
@@ -152,3 +171,279 @@ def test_divide_by_zero_api(client):
     # Assert that the 'error' field contains the correct error message
     assert "Cannot divide by zero!" in response.json()['error'], \
         f"Expected error message 'Cannot divide by zero!', got '{response.json()['error']}'"
+
+# ---------------------------------------------
+# Test Function: test_batch_api
+# ---------------------------------------------
+
+def test_batch_api(client):
+    """
+    Test the Batch API Endpoint.
+
+    This test verifies that the `/batch` endpoint evaluates every item of the array
+    and reports a division by zero as a per-item error without failing the batch.
+
+    Steps:
+    1. Send a POST request to the `/batch` endpoint with four operations, one dividing by zero.
+    2. Assert that the response status code is `200 OK`.
+    3. Assert that the results and errors are reported per item.
+    """
+    # Send a POST request to the '/batch' endpoint with a JSON array of operations
+    response = client.post('/batch', json=[
+        {'op': 'add', 'a': 10, 'b': 5},
+        {'op': 'subtract', 'a': 10, 'b': 5},
+        {'op': 'divide', 'a': 10, 'b': 0},
+        {'op': 'multiply', 'a': 10, 'b': 5},
+    ])
+
+    # Assert that the response status code is 200 (OK)
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
+
+    # Assert that each item has its own result or error
+    assert response.json()['results'] == [15, 5, None, 50]
+    assert response.json()['errors'] == [{'index': 2, 'error': 'Cannot divide by zero!'}]
+
+# ---------------------------------------------
+# Test Function: test_batch_api_invalid_operation
+# ---------------------------------------------
+
+def test_batch_api_invalid_operation(client):
+    """
+    Test that the Batch API Endpoint rejects unknown operations with `400 Bad Request`.
+    """
+    response = client.post('/batch', json=[{'op': 'modulus', 'a': 10, 'b': 5}])
+
+    assert response.status_code == 400, f"Expected status code 400, got {response.status_code}"
+    assert 'error' in response.json(), "Response JSON does not contain 'error' field"
+
+# ---------------------------------------------
+# Test Function: test_stream_api
+# ---------------------------------------------
+
+def test_stream_api(client):
+    """
+    Test the Streaming API Endpoint.
+
+    This test verifies that the `/stream` endpoint reads newline-delimited JSON operations
+    and returns one NDJSON result line per operation, in order.
+    """
+    body = '{"op": "add", "a": 10, "b": 5}\n{"op": "divide", "a": 10, "b": 0}\n'
+    response = client.post('/stream', content=body, headers={'Content-Type': 'application/x-ndjson'})
+
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    assert response.text.splitlines() == ['{"result": 15.0}', '{"error": "Cannot divide by zero!"}']
+
+# ---------------------------------------------
+# Test Function: test_websocket_api
+# ---------------------------------------------
+
+def test_websocket_api(client):
+    """
+    Test the WebSocket API Endpoint.
+
+    This test verifies that the `/ws` endpoint answers several operations over one
+    connection and echoes each message's `id` back with its result or error.
+    """
+    with client.websocket_connect('/ws') as websocket:
+        websocket.send_json({'id': 1, 'op': 'add', 'a': 10, 'b': 5})
+        assert websocket.receive_json() == {'id': 1, 'result': 15}
+
+        websocket.send_json({'id': 'abc', 'op': 'divide', 'a': 10, 'b': 0})
+        assert websocket.receive_json() == {'id': 'abc', 'error': 'Cannot divide by zero!'}
+
+        websocket.send_json({'op': 'modulus', 'a': 10, 'b': 5})
+        assert websocket.receive_json()['error'].startswith('op must be one of')
+
+        websocket.send_text('not json')
+        assert websocket.receive_json() == {'id': None, 'error': 'Message is not valid JSON.'}
+
+def test_websocket_binary_messages(client):
+    """
+    Test that the `/ws` endpoint answers JSON sent in binary frames, and
+    reports binary frames that are not JSON without closing the connection.
+    """
+    with client.websocket_connect('/ws') as websocket:
+        websocket.send_bytes(b'{"id": 2, "op": "multiply", "a": 3, "b": 4}')
+        assert websocket.receive_json() == {'id': 2, 'result': 12}
+
+        websocket.send_bytes(b'\xff\xfe')
+        assert websocket.receive_json() == {'id': None, 'error': 'Message is not valid JSON.'}
+
+        websocket.send_text('{"id": 3, "op": "subtract", "a": 3, "b": 4}')
+        assert websocket.receive_json() == {'id': 3, 'result': -1}
+
+# ---------------------------------------------
+# Test Function: test_pool_stats_api
+# ---------------------------------------------
+
+def test_pool_stats_api(client):
+    """
+    Test that the `/stats/pool` endpoint reports usage for both database engines.
+    """
+    response = client.get('/stats/pool')
+
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
+    for name in ('sync', 'async'):
+        assert {'checkouts', 'wait_seconds_avg', 'in_use', 'overflow'} <= response.json()[name].keys()
+
+# ---------------------------------------------
+# Test Function: test_operation_cache_api
+# ---------------------------------------------
+
+def test_operation_cache_api(client, monkeypatch):
+    """
+    Test that repeated operations are served from the result cache when it is enabled.
+
+    Steps:
+    1. Enable the cache by replacing it with one that can hold entries.
+    2. Send the same `/multiply` request twice and a failing `/divide` request.
+    3. Assert that both multiply responses match and the cache counted one miss and one hit.
+    4. Assert that the failed division was not cached.
+    """
+    import main
+    from app.operations.cache import OperationCache
+
+    monkeypatch.setattr(main, 'operation_cache', OperationCache(maxsize=16, ttl=60))
+
+    first = client.post('/multiply', json={'a': 6, 'b': 7})
+    second = client.post('/multiply', json={'a': 6, 'b': 7})
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == {'result': 42}
+
+    assert client.post('/divide', json={'a': 1, 'b': 0}).status_code == 400
+
+    stats = client.get('/stats/cache').json()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['size'] == 1
+
+def test_operation_cache_keeps_signed_zeros(client, monkeypatch):
+    """
+    Test that operands differing only in the sign of zero do not share a cache entry.
+    """
+    import main
+    from app.operations.cache import OperationCache
+
+    monkeypatch.setattr(main, 'operation_cache', OperationCache(maxsize=16, ttl=60))
+
+    first = client.post('/multiply', content='{"a": -0.0, "b": -1}', headers={'Content-Type': 'application/json'})
+    second = client.post('/multiply', content='{"a": 0.0, "b": -1}', headers={'Content-Type': 'application/json'})
+    assert first.content == b'{"result":0.0}'
+    assert second.content == b'{"result":-0.0}'
+    assert client.get('/stats/cache').json()['hits'] == 0
+
+# ---------------------------------------------
+# Test Function: test_metrics_api
+# ---------------------------------------------
+
+def test_metrics_api(client):
+    """
+    Test the Prometheus `/metrics` endpoint.
+
+    This test verifies that request counts are labelled by route template and status code,
+    and that operation errors and validation failures are counted.
+
+    Steps:
+    1. Send a successful request, a division by zero and an invalid request.
+    2. Fetch `/metrics`.
+    3. Assert that each of them is reflected in the exposed metrics.
+    """
+    from prometheus_client import REGISTRY
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    before_errors = sample('operation_errors_total', operation='divide')
+    before_validation = sample('validation_errors_total', route='/add')
+    before_requests = sample('http_requests_total', method='POST', route='/add', status='200')
+
+    client.post('/add', json={'a': 1, 'b': 2})
+    client.post('/divide', json={'a': 1, 'b': 0})
+    client.post('/add', json={'a': 'x', 'b': 2})
+
+    response = client.get('/metrics')
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="POST",route="/add",status="200"}' in response.text
+    assert 'http_requests_in_flight' in response.text
+
+    assert sample('http_requests_total', method='POST', route='/add', status='200') == before_requests + 1
+    assert sample('operation_errors_total', operation='divide') == before_errors + 1
+    assert sample('validation_errors_total', route='/add') == before_validation + 1
+
+    # Unknown URLs share one label value instead of creating new series
+    client.get('/no-such-page')
+    assert sample('http_requests_total', method='GET', route='<unmatched>', status='404') >= 1
+
+# ---------------------------------------------
+# Test Function: test_index_page
+# ---------------------------------------------
+
+def test_index_page(client, monkeypatch, tmp_path):
+    """
+    Test the landing page, rendered from the template and served prebuilt.
+
+    Steps:
+    1. Fetch `/` with the template and assert that it is compressed on the fly.
+    2. Build the page with `build_page` and serve it through `index_page`.
+    3. Assert that the prebuilt, brotli compressed page comes with an ETag and Cache-Control.
+    4. Revalidate with the ETag and assert a `304 Not Modified`.
+    """
+    import main
+    from app.core.static_pages import PrecompressedPage, build_page
+
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'async function calculate(operation)' in response.text
+    assert 'etag' not in response.headers
+
+    build_page('templates', 'index.html', tmp_path)
+    monkeypatch.setattr(main, 'index_page', PrecompressedPage.from_directory(tmp_path, max_age=60))
+
+    response = client.get('/', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == 'br'
+    assert response.headers['cache-control'] == 'public, max-age=60'
+    assert response.headers['content-type'].startswith('text/html')
+    assert 'async function calculate(operation)' in response.text
+    assert '<!--' not in response.text
+
+    response = client.get('/', headers={'Accept-Encoding': 'gzip, br', 'If-None-Match': response.headers['etag']})
+    assert response.status_code == 304
+    assert response.content == b''
+
+# ---------------------------------------------
+# Test Function: test_maintain_partitions
+# ---------------------------------------------
+
+def test_maintain_partitions(monkeypatch):
+    """
+    Test that partitions keep being ensured periodically while the server runs.
+
+    Steps:
+    1. Replace `ensure_calculation_partitions` with a function counting its calls.
+    2. Run `maintain_partitions` with a short interval for a moment, then cancel it.
+    3. Assert that it ran repeatedly, and not before the first interval.
+    """
+    import asyncio
+    import main
+
+    calls = []
+
+    async def ensure():
+        calls.append(asyncio.get_running_loop().time())
+
+    monkeypatch.setattr(main, 'ensure_calculation_partitions', ensure)
+
+    async def run():
+        start = asyncio.get_running_loop().time()
+        task = asyncio.create_task(main.maintain_partitions(0.02))
+        await asyncio.sleep(0.15)
+        task.cancel()
+        return start
+
+    start = asyncio.run(run())
+    assert len(calls) >= 2
+    assert calls[0] - start >= 0.02
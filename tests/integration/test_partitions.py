@@ -0,0 +1,177 @@
+# tests/integration/test_partitions.py
+"""
+Integration Tests for the Partitioned Calculations Table
+
+The partitioned table is created in a separate schema of the configured
+PostgreSQL database (dropped afterwards), so the regular tables are left
+alone. The ORM models are used unchanged against it.
+"""
+
+import time
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.partitions import (
+    DEFAULT_PARTITION,
+    create_partition,
+    create_partitioned_table,
+    detach_partition,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+)
+from app.models.calculation import Calculation
+from app.models.calculation_stats import CalculationStats
+from app.models.user import User
+from app.operations.factory import CalculationFactory
+
+SCHEMA = "partition_test"
+
+
+@pytest.fixture(scope="module")
+def partitioned_engine():
+    admin = create_engine(settings.DATABASE_URL)
+    with admin.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    engine = create_engine(settings.DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    User.__table__.create(engine)
+    yield engine
+    engine.dispose()
+    with admin.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    admin.dispose()
+
+
+@pytest.fixture(scope="module")
+def user_id(partitioned_engine):
+    created = create_partitioned_table(partitioned_engine, months_ahead=1)
+    CalculationStats.__table__.create(partitioned_engine)
+    today = datetime.utcnow().date()
+    assert created[0] == f"calculations_{today:%Y_%m}"
+    assert len(created) == 2
+    user_id = uuid.uuid4()
+    with partitioned_engine.begin() as connection:
+        connection.execute(insert(User.__table__).values(
+            id=user_id, username=f"PartitionUser_{user_id}", email=f"partition_{user_id}@example.com"
+        ))
+    return user_id
+
+
+def partition_of(engine, calculation_id):
+    with engine.connect() as connection:
+        return connection.execute(
+            text("SELECT tableoid::regclass::text FROM calculations WHERE id = :id"), {"id": calculation_id}
+        ).scalar()
+
+
+def test_table_is_partitioned(partitioned_engine, user_id):
+    with partitioned_engine.connect() as connection:
+        assert is_partitioned(connection)
+        names = [name for name, _ in list_partitions(connection)]
+    assert DEFAULT_PARTITION in names
+    assert f"calculations_{datetime.utcnow():%Y_%m}" in names
+    # Creating it again is a no-op
+    assert create_partitioned_table(partitioned_engine, months_ahead=1) == []
+
+
+def test_orm_mapping_unchanged(partitioned_engine, user_id):
+    with Session(partitioned_engine) as db:
+        calculation = CalculationFactory.create("addition", user_id, [1, 2, 3])
+        db.add(calculation)
+        db.commit()
+        calculation_id = calculation.id
+    assert partition_of(partitioned_engine, calculation_id) == f"calculations_{datetime.utcnow():%Y_%m}"
+
+    with Session(partitioned_engine) as db:
+        calculation = db.get(Calculation, calculation_id)
+        assert calculation.type == "addition"
+        assert calculation.result == 6
+        calculation.inputs = [10, 5]
+        db.commit()
+        assert db.get(Calculation, calculation_id).result == 15
+        db.delete(calculation)
+        db.commit()
+        assert db.get(Calculation, calculation_id) is None
+
+
+def test_new_partition_takes_rows_from_default(partitioned_engine, user_id):
+    calculation_id = uuid.uuid4()
+    with partitioned_engine.begin() as connection:
+        connection.execute(insert(Calculation.__table__).values(
+            id=calculation_id, user_id=user_id, type="addition", inputs=[1, 2], result=3,
+            created_at=datetime(2100, 1, 15), updated_at=datetime(2100, 1, 15),
+        ))
+    assert partition_of(partitioned_engine, calculation_id) == DEFAULT_PARTITION
+
+    assert ensure_partitions(partitioned_engine, months_ahead=0, today=date(2100, 1, 20)) == ["calculations_2100_01"]
+    assert partition_of(partitioned_engine, calculation_id) == "calculations_2100_01"
+    with partitioned_engine.begin() as connection:
+        assert not create_partition(connection, date(2100, 1, 1))
+
+
+def test_concurrent_partition_creation(partitioned_engine, user_id):
+    """
+    A second process that found the partition missing before the first one
+    created it waits for the table lock and then leaves it alone.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    month = date(2101, 3, 1)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with partitioned_engine.begin() as first:
+            assert create_partition(first, month)
+
+            def second():
+                with partitioned_engine.begin() as connection:
+                    return create_partition(connection, month)
+
+            # Let the second one get past the first existence check and
+            # wait for the lock the first transaction still holds
+            waiting = executor.submit(second)
+            with partitioned_engine.connect() as observer:
+                for _ in range(100):
+                    if observer.execute(text(
+                        "SELECT count(*) FROM pg_locks WHERE NOT granted AND relation = to_regclass('calculations')"
+                    )).scalar():
+                        break
+                    time.sleep(0.05)
+                else:
+                    pytest.fail("The second creation never waited for the table lock")
+        assert waiting.result(timeout=10) is False
+    with partitioned_engine.connect() as connection:
+        assert "calculations_2101_03" in [name for name, _ in list_partitions(connection)]
+
+
+def test_detach_partition(partitioned_engine, user_id):
+    month = date(2099, 6, 1)
+    ensure_partitions(partitioned_engine, months_ahead=0, today=month)
+    with partitioned_engine.begin() as connection:
+        connection.execute(insert(Calculation.__table__), [
+            {"id": uuid.uuid4(), "user_id": user_id, "type": "addition", "inputs": [i, 1], "result": i + 1,
+             "created_at": datetime(2099, 6, 10), "updated_at": datetime(2099, 6, 10)}
+            for i in range(3)
+        ])
+
+    assert detach_partition(partitioned_engine, month) == "calculations_2099_06"
+    with partitioned_engine.connect() as connection:
+        assert "calculations_2099_06" not in [name for name, _ in list_partitions(connection)]
+        # The rows are gone from the table but kept in the detached one
+        assert connection.execute(
+            select(func.count()).select_from(Calculation.__table__).where(Calculation.created_at < datetime(2099, 7, 1),
+                                                                           Calculation.created_at >= datetime(2099, 6, 1))
+        ).scalar() == 0
+        assert connection.execute(text("SELECT count(*) FROM calculations_2099_06")).scalar() == 3
+
+    with pytest.raises(ValueError, match="No partition named calculations_2099_06"):
+        detach_partition(partitioned_engine, month)
+
+    ensure_partitions(partitioned_engine, months_ahead=0, today=date(2099, 7, 1))
+    detach_partition(partitioned_engine, date(2099, 7, 1), drop=True)
+    with partitioned_engine.connect() as connection:
+        assert connection.execute(text("SELECT to_regclass('calculations_2099_07')")).scalar() is None
@@ -0,0 +1,80 @@
+# tests/integration/test_transfer.py
+"""
+Integration Tests for Bulk Import and Export
+
+These tests run COPY against the configured PostgreSQL database. Each test
+exports the whole calculations table, keeps only the rows of a user it
+created, deletes them and imports them back.
+"""
+
+import io
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, select
+
+from app.crud.transfer import BINARY_SIGNATURE, BINARY_TRAILER, export_table, import_table, split_binary
+from app.database import engine
+from app.models.calculation import Calculation
+from app.models.user import User
+
+table = Calculation.__table__
+
+
+@pytest.fixture
+def user_id():
+    user_id = uuid.uuid4()
+    with engine.begin() as connection:
+        connection.execute(insert(User.__table__).values(
+            id=user_id, username=f"CopyUser_{user_id}", email=f"copy_{user_id}@example.com"
+        ))
+        connection.execute(insert(table), [
+            {"id": uuid.uuid4(), "user_id": user_id, "type": "addition", "inputs": [i, 0.5],
+             "result": None if i % 2 else i + 0.5}
+            for i in range(5)
+        ])
+    yield user_id
+    with engine.begin() as connection:
+        connection.execute(delete(User.__table__).where(User.id == user_id))
+
+
+def user_rows(user_id):
+    with engine.connect() as connection:
+        return sorted(connection.execute(select(table).where(table.c.user_id == user_id)).all())
+
+
+def delete_user_rows(user_id):
+    with engine.begin() as connection:
+        connection.execute(delete(table).where(table.c.user_id == user_id))
+
+
+def test_copy_csv_round_trip(user_id):
+    before = user_rows(user_id)
+    out = io.BytesIO()
+    assert export_table(engine, "calculations", out) >= 5
+
+    header, *lines = out.getvalue().splitlines(keepends=True)
+    mine = [line for line in lines if str(user_id).encode() in line]
+    assert len(mine) == 5
+    delete_user_rows(user_id)
+
+    chunks = list(import_table(engine, "calculations", io.BytesIO(header + b"".join(mine)), chunk_size=2))
+    assert chunks == [2, 2, 1]
+    assert user_rows(user_id) == before
+
+
+def test_copy_binary_round_trip(user_id):
+    before = user_rows(user_id)
+    out = io.BytesIO()
+    export_table(engine, "calculations", out, file_format="binary")
+    out.seek(0)
+
+    # Each one-row chunk is a complete file: keep this user's rows
+    header_length = len(BINARY_SIGNATURE) + 8
+    mine = [chunk for chunk, _ in split_binary(out, 1) if user_id.bytes in chunk]
+    assert len(mine) == 5
+    data = mine[0][:header_length] + b"".join(chunk[header_length:-2] for chunk in mine) + BINARY_TRAILER
+    delete_user_rows(user_id)
+
+    assert list(import_table(engine, "calculations", io.BytesIO(data), file_format="binary", chunk_size=3)) == [3, 2]
+    assert user_rows(user_id) == before
@@ -0,0 +1,43 @@
+# tests/unit/conftest.py
+
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.calculation import Calculation
+from app.models.calculation_stats import CalculationStats
+from app.models.user import User
+
+
+@pytest.fixture
+def sqlite_engine():
+    """
+    Factory of SQLite engines (in memory by default) with the users,
+    calculations and calculation statistics tables, disposed after the test.
+    """
+    engines = []
+
+    def make(url="sqlite://"):
+        engines.append(create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False}))
+        Base.metadata.create_all(engines[-1], tables=[User.__table__, Calculation.__table__, CalculationStats.__table__])
+        return engines[-1]
+
+    yield make
+    for created in engines:
+        created.dispose()
+
+
+@pytest.fixture
+def engine(sqlite_engine):
+    return sqlite_engine()
+
+
+@pytest.fixture
+def user_id(engine):
+    user_id = uuid.uuid4()
+    with engine.begin() as connection:
+        connection.execute(insert(User.__table__).values(id=user_id, username="unit", email="unit@example.com"))
+    return user_id
@@ -0,0 +1,70 @@
+# tests/unit/test_batch.py
+
+import pytest  # Import the pytest framework for writing and running tests
+from app.operations import add, subtract, multiply, divide  # Scalar functions used as the reference
+from app.operations.batch import evaluate_batch  # Import the vectorized batch evaluator
+
+
+# ---------------------------------------------
+# Unit Tests for the 'evaluate_batch' Function
+# ---------------------------------------------
+
+def test_evaluate_batch_matches_scalar_functions() -> None:
+    """
+    Test that 'evaluate_batch' gives the same results as the scalar functions.
+
+    Steps:
+    1. Build a mixed batch of all four operations.
+    2. Evaluate it with 'evaluate_batch'.
+    3. Assert that every result equals the matching scalar call and no errors are reported.
+    """
+    scalar = {"add": add, "subtract": subtract, "multiply": multiply, "divide": divide}
+    ops = ["add", "subtract", "multiply", "divide"] * 3
+    a = [2, -2.5, 10, 1e10, 7, 0, 3.5, -8, 1, 2, 3, 4]
+    b = [3, 3.5, -4, 2, 0.5, 9, 2, -2, 1, 2, 3, 4]
+
+    results, errors = evaluate_batch(ops, a, b)
+
+    assert errors == {}
+    for op, x, y, result in zip(ops, a, b, results):
+        assert result == pytest.approx(scalar[op](x, y))
+
+
+def test_evaluate_batch_reports_per_item_errors() -> None:
+    """
+    Test that a failing item does not fail the whole batch.
+
+    Division by zero and results that overflow to infinity are reported per item,
+    while the other items are still computed.
+    """
+    results, errors = evaluate_batch(
+        ["divide", "add", "multiply", "divide"],
+        [1, 1, 1e308, 9],
+        [0, 2, 10, 3],
+    )
+
+    assert results == [None, 3.0, None, 3.0]
+    assert errors == {0: "Cannot divide by zero!", 2: "Result is not a finite number."}
+
+
+def test_evaluate_batch_empty() -> None:
+    """
+    Test that an empty batch returns empty results.
+    """
+    assert evaluate_batch([], [], []) == ([], {})
+
+
+@pytest.mark.parametrize(
+    "ops, a, b",
+    [
+        (["modulus"], [1], [2]),   # Unsupported operation
+        (["add", "add"], [1], [2]),  # Mismatched lengths
+    ],
+    ids=["unsupported_operation", "mismatched_lengths"]
+)
+def test_evaluate_batch_invalid_input(ops, a, b) -> None:
+    """
+    Test that 'evaluate_batch' raises ValueError for invalid input.
+    """
+    with pytest.raises(ValueError):
+        evaluate_batch(ops, a, b)
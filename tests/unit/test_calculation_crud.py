@@ -0,0 +1,194 @@
+# tests/unit/test_calculation_crud.py
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.crud.calculation import (
+    bulk_create_calculations,
+    create_calculation,
+    decode_cursor,
+    delete_calculation,
+    encode_cursor,
+    get_calculation,
+    get_calculation_async,
+    get_calculation_version_async,
+    get_user_calculation_stats,
+    list_user_calculation_rows,
+    list_user_calculations,
+    stream_user_calculation_rows,
+    update_calculation,
+)
+from app.database import get_async_database_url, get_async_engine, get_async_sessionmaker
+from app.models.calculation import Addition, Division
+from app.models.user import User
+from app.schemas.calculation import CalculationCreate, CalculationUpdate
+
+
+def add_history(engine, user_id, count):
+    """Insert count additions a minute apart; returns their ids, newest first."""
+    start = datetime(2025, 1, 1)
+    with Session(engine) as db:
+        calculations = [
+            Addition(user_id=user_id, inputs=[i, 1], created_at=start + timedelta(minutes=i))
+            for i in range(count)
+        ]
+        db.add_all(calculations)
+        db.commit()
+        return [calculation.id for calculation in reversed(calculations)]
+
+
+def stats(db, user_id):
+    return {row.type: (row.count, row.total) for row in get_user_calculation_stats(db, user_id)}
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 1, 2, 3, 4, 5, 678901)
+    calculation_id = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, calculation_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, calculation_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bnVsbA", "WyJ4IiwgInkiXQ"])
+def test_decode_cursor_invalid(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        decode_cursor(cursor)
+
+
+def test_create_get_update_delete(engine, user_id):
+    with Session(engine) as db:
+        calculation = create_calculation(
+            db, CalculationCreate(type="addition", inputs=[1, 2, 3], user_id=user_id)
+        )
+        assert isinstance(calculation, Addition)
+        assert calculation.result == 6
+        assert get_calculation(db, calculation.id) is calculation
+
+        update_calculation(db, calculation, CalculationUpdate(inputs=[4, 5]))
+        assert calculation.inputs == [4, 5]
+        assert calculation.result == 9
+        assert stats(db, user_id) == {"addition": (1, 9.0)}
+
+        # No inputs: nothing changes
+        update_calculation(db, calculation, CalculationUpdate())
+        assert calculation.result == 9
+
+        delete_calculation(db, calculation)
+        assert get_calculation(db, calculation.id) is None
+        assert stats(db, user_id) == {}
+
+
+def test_update_invalid_inputs_leaves_row_untouched(engine, user_id):
+    with Session(engine) as db:
+        calculation = create_calculation(
+            db, CalculationCreate(type="division", inputs=[10, 2], user_id=user_id)
+        )
+        with pytest.raises(ValueError, match="Cannot divide by zero"):
+            update_calculation(db, calculation, CalculationUpdate(inputs=[10, 0]))
+        db.expire_all()
+        assert get_calculation(db, calculation.id).inputs == [10, 2]
+
+
+def test_bulk_create_keeps_request_order(engine, user_id):
+    items = [
+        CalculationCreate(type=kind, inputs=inputs, user_id=user_id)
+        for kind, inputs in [("division", [8, 2]), ("addition", [1, 1]), ("addition", [2, 3])]
+    ]
+    with Session(engine) as db:
+        rows = bulk_create_calculations(db, items)
+        assert [(row.type, row.inputs, row.result) for row in rows] == [
+            ("division", [8, 2], 4.0),
+            ("addition", [1, 1], 2.0),
+            ("addition", [2, 3], 5.0),
+        ]
+        assert all(row.user_id == user_id for row in rows)
+        assert stats(db, user_id) == {"addition": (2, 7.0), "division": (1, 4.0)}
+        assert isinstance(get_calculation(db, rows[0].id), Division)
+
+        assert bulk_create_calculations(db, []) == []
+
+
+def test_get_calculation_async(sqlite_engine, tmp_path):
+    # A database file, so the async engine sees what the sync one wrote
+    url = f"sqlite:///{tmp_path}/crud.db"
+    engine = sqlite_engine(url)
+    user_id = uuid.uuid4()
+    with Session(engine) as db:
+        db.execute(insert(User.__table__).values(id=user_id, username="crud", email="crud@example.com"))
+        calculation = create_calculation(
+            db, CalculationCreate(type="multiplication", inputs=[2, 3], user_id=user_id)
+        )
+        calculation_id, updated_at = calculation.id, calculation.updated_at
+
+    async def read():
+        async_engine = get_async_engine(get_async_database_url(url))
+        try:
+            async with get_async_sessionmaker(async_engine)() as db:
+                calculation = await get_calculation_async(db, calculation_id)
+                version = await get_calculation_version_async(db, calculation_id)
+                missing = await get_calculation_version_async(db, uuid.uuid4())
+                return calculation.result, tuple(version), missing
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(read()) == (6.0, (calculation_id, updated_at, 6.0), None)
+
+
+def test_list_user_calculations_pages(engine, user_id):
+    ids = add_history(engine, user_id, 5)
+    other = uuid.uuid4()
+    with engine.begin() as connection:
+        connection.execute(insert(User.__table__).values(id=other, username="other", email="other@example.com"))
+    add_history(engine, other, 2)
+
+    with Session(engine) as db:
+        pages, cursor = [], None
+        while True:
+            page, cursor = list_user_calculations(db, user_id, limit=2, cursor=cursor)
+            pages.append([calculation.id for calculation in page])
+            if cursor is None:
+                break
+    assert pages == [ids[:2], ids[2:4], ids[4:]]
+
+
+def test_list_user_calculations_last_page_is_full(engine, user_id):
+    ids = add_history(engine, user_id, 2)
+    with Session(engine) as db:
+        page, cursor = list_user_calculations(db, user_id, limit=2)
+    assert [calculation.id for calculation in page] == ids
+    assert cursor is None
+
+
+def test_list_user_calculation_rows(engine, user_id):
+    ids = add_history(engine, user_id, 3)
+    with Session(engine) as db:
+        rows, cursor = list_user_calculation_rows(db, user_id, limit=2)
+        assert [row.id for row in rows] == ids[:2]
+        assert rows[0]._fields == ("id", "type", "result", "created_at")
+        assert [(row.type, row.result) for row in rows] == [("addition", 3.0), ("addition", 2.0)]
+
+        # id and created_at are added for the cursor
+        rows, cursor = list_user_calculation_rows(db, user_id, limit=2, cursor=cursor, columns=["inputs"])
+        assert [tuple(row) for row in rows] == [([0, 1], ids[2], datetime(2025, 1, 1))]
+        assert cursor is None
+
+
+def test_stream_user_calculation_rows(engine, user_id):
+    ids = add_history(engine, user_id, 5)
+    with Session(engine) as db:
+        rows = list(stream_user_calculation_rows(db, user_id, columns=["id", "result"], chunk_size=2))
+    assert [tuple(row) for row in rows] == [(ids[i], 5.0 - i) for i in range(5)]
+
+
+@pytest.mark.parametrize("query", [list_user_calculation_rows, stream_user_calculation_rows])
+def test_row_queries_unknown_column(engine, user_id, query):
+    with Session(engine) as db:
+        with pytest.raises(ValueError, match="Unknown calculation columns: password, secret"):
+            query(db, user_id, columns=["id", "password", "secret"])
@@ -230,3 +230,29 @@ def test_calculation_create_schema_division_by_zero():
             inputs=[10, 0],
             user_id=dummy_user_id()
         )
+
+def test_factory_build_rows():
+    user_id = dummy_user_id()
+    items = [
+        ("Addition", user_id, [1, 2, 3]),
+        CalculationCreate(type=CalculationType.DIVISION, inputs=[100, 2, 5], user_id=user_id),
+    ]
+    rows = CalculationFactory.build_rows(items)
+    assert [(row["type"], row["inputs"], row["result"]) for row in rows] == [
+        ("addition", [1, 2, 3], 6),
+        ("division", [100, 2, 5], 10),
+    ]
+    assert all(row["user_id"] == user_id for row in rows)
+    assert len({row["id"] for row in rows}) == 2
+
+@pytest.mark.parametrize(
+    "items, start, message",
+    [
+        ([("addition", None, [1, 2]), ("modulus", None, [1, 2])], 0, "Item 1: Unsupported calculation type: modulus"),
+        ([("division", None, [1, 0]), ("division", None, [1, 0])], 0, "Item 0: Cannot divide by zero."),
+        ([("addition", None, [1])], 5, "Item 5: Inputs must be a list with at least two numbers."),
+    ]
+)
+def test_factory_build_rows_invalid(items, start, message):
+    with pytest.raises(ValueError, match=message):
+        CalculationFactory.build_rows(items, start=start)
@@ -0,0 +1,108 @@
+# tests/unit/test_calculation_stats.py
+
+import uuid
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.crud.calculation import backfill_results, get_user_calculation_stats
+from app.models.calculation import Calculation
+from app.models.calculation_stats import CalculationStats, rebuild_calculation_stats
+from app.models.user import User
+from app.operations.factory import CalculationFactory
+
+
+def stats(engine, user_id):
+    with Session(engine) as db:
+        return {
+            row.type: (row.count, row.total, row.minimum, row.maximum)
+            for row in get_user_calculation_stats(db, user_id)
+        }
+
+
+def rebuilt(engine, user_id):
+    with engine.begin() as connection:
+        rebuild_calculation_stats(connection, user_id)
+    return stats(engine, user_id)
+
+
+def test_orm_insert_update_delete(engine, user_id):
+    with Session(engine) as db:
+        calculations = [
+            CalculationFactory.create("addition", user_id, [1, 2]),
+            CalculationFactory.create("addition", user_id, [10, 5]),
+            CalculationFactory.create("addition", user_id, [4, 4]),
+            CalculationFactory.create("division", user_id, [9, 3]),
+        ]
+        db.add_all(calculations)
+        db.commit()
+        assert stats(engine, user_id) == {"addition": (3, 26.0, 3.0, 15.0), "division": (1, 3.0, 3.0, 3.0)}
+
+        # Replacing a result that is neither the minimum nor the maximum
+        calculations[2].inputs = [1, 1]
+        db.commit()
+        assert stats(engine, user_id)["addition"] == (3, 20.0, 2.0, 15.0)
+
+        # Replacing the maximum with a smaller result recomputes the maximum
+        calculations[1].inputs = [1, 3]
+        db.commit()
+        assert stats(engine, user_id)["addition"] == (3, 9.0, 2.0, 4.0)
+
+        # Deleting the minimum recomputes the minimum
+        db.delete(calculations[2])
+        db.commit()
+        assert stats(engine, user_id)["addition"] == (2, 7.0, 3.0, 4.0)
+
+        # Deleting the last calculation of a type removes its statistics
+        db.delete(calculations[3])
+        db.commit()
+        assert stats(engine, user_id) == {"addition": (2, 7.0, 3.0, 4.0)}
+    assert rebuilt(engine, user_id) == {"addition": (2, 7.0, 3.0, 4.0)}
+
+
+def test_update_of_expired_result(engine, user_id):
+    with Session(engine) as db:
+        calculation = CalculationFactory.create("multiplication", user_id, [2, 3])
+        db.add(calculation)
+        db.commit()
+        # After the commit the old result is not loaded when it is replaced
+        calculation.inputs = [2, 5]
+        db.commit()
+    assert stats(engine, user_id) == {"multiplication": (1, 10.0, 10.0, 10.0)}
+
+
+def test_bulk_insert_and_backfill(engine, user_id):
+    with Session(engine) as db:
+        CalculationFactory.create_many(db, [("addition", user_id, [i, 1]) for i in range(5)], chunk_size=2)
+        db.commit()
+    assert stats(engine, user_id) == {"addition": (5, 15.0, 1.0, 5.0)}
+
+    with engine.begin() as connection:
+        connection.execute(update(Calculation.__table__).values(result=None))
+        rebuild_calculation_stats(connection)
+    assert stats(engine, user_id) == {"addition": (5, 0.0, None, None)}
+
+    with Session(engine) as db:
+        assert list(backfill_results(db, chunk_size=2)) == [(2, 0), (2, 0), (1, 0)]
+    assert stats(engine, user_id) == {"addition": (5, 15.0, 1.0, 5.0)}
+
+
+def test_rebuild(engine, user_id):
+    with engine.begin() as connection:
+        connection.execute(insert(Calculation.__table__), [
+            {"id": uuid.uuid4(), "user_id": user_id, "type": "subtraction", "inputs": [i, 1], "result": i - 1}
+            for i in range(4)
+        ])
+    # Core inserts without record_added() are not counted until a rebuild
+    assert stats(engine, user_id) == {}
+    assert rebuilt(engine, user_id) == {"subtraction": (4, 2.0, -1.0, 2.0)}
+
+
+def test_stats_deleted_with_user(engine, user_id):
+    with Session(engine) as db:
+        db.add(CalculationFactory.create("addition", user_id, [1, 2]))
+        db.commit()
+        db.delete(db.get(User, user_id))
+        db.commit()
+    with engine.connect() as connection:
+        assert connection.execute(select(CalculationStats.__table__)).all() == []
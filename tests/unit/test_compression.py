@@ -0,0 +1,112 @@
+# tests/unit/test_compression.py
+
+import gzip
+
+import brotli
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, compress, is_compressible, negotiate_encoding
+
+BIG = {"items": [{"id": i, "result": i * 1.5} for i in range(200)]}
+
+
+def build_app(**kwargs):
+    async def chunks():
+        yield b'{"result": 1}\n' * 100
+        yield b'{"result": 2}\n' * 100
+
+    routes = [
+        Route("/big", lambda request: JSONResponse(BIG)),
+        Route("/small", lambda request: JSONResponse({"result": 3})),
+        Route("/stream", lambda request: StreamingResponse(chunks(), media_type="application/x-ndjson")),
+        Route("/binary", lambda request: Response(b"\x00" * 5000, media_type="application/octet-stream")),
+        Route("/encoded", lambda request: PlainTextResponse(
+            gzip.compress(b"x" * 5000), headers={"Content-Encoding": "gzip"})),
+    ]
+    app = Starlette(routes=routes)
+    app.add_middleware(CompressionMiddleware, minimum_size=500, **kwargs)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "header, available, expected",
+    [
+        ("gzip, deflate, br", ("br", "gzip"), "br"),
+        ("gzip;q=1.0, br;q=0.5", ("br", "gzip"), "br"),
+        ("gzip, br;q=0", ("br", "gzip"), "gzip"),
+        ("br", ("gzip",), None),
+        ("*", ("br", "gzip"), "br"),
+        ("*, br;q=0", ("br", "gzip"), "gzip"),
+        ("GZIP; Q=0.8", ("br", "gzip"), "gzip"),
+        ("gzip;q=oops", ("gzip",), None),
+        ("identity", ("br", "gzip"), None),
+        ("", ("br", "gzip"), None),
+    ]
+)
+def test_negotiate_encoding(header, available, expected):
+    assert negotiate_encoding(header, available) == expected
+
+
+def test_compress_round_trip():
+    body = b"calculation " * 100
+    assert brotli.decompress(compress(body, "br")) == body
+    assert gzip.decompress(compress(body, "gzip")) == body
+    # No timestamp: the same body always compresses to the same bytes
+    assert compress(body, "gzip") == compress(body, "gzip")
+    with pytest.raises(ValueError, match="Unsupported content encoding: deflate"):
+        compress(body, "deflate")
+
+
+@pytest.mark.parametrize(
+    "content_type, expected",
+    [
+        ("application/json", True),
+        ("text/html; charset=utf-8", True),
+        ("application/problem+json", True),
+        ("application/octet-stream", False),
+        ("image/png", False),
+        ("", False),
+    ]
+)
+def test_is_compressible(content_type, expected):
+    assert is_compressible(content_type) is expected
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_large_responses_are_compressed(encoding):
+    client = build_app()
+    response = client.get("/big", headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(JSONResponse(BIG).body)
+    # The test client decodes the body again
+    assert response.json() == BIG
+
+
+def test_gzip_only_server():
+    client = build_app(encodings=("gzip",))
+    response = client.get("/big", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+
+
+@pytest.mark.parametrize("path", ["/small", "/stream", "/binary"])
+def test_responses_left_uncompressed(path):
+    response = build_app().get(path, headers={"Accept-Encoding": "br, gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_no_accept_encoding():
+    response = build_app().get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == BIG
+
+
+def test_already_encoded_response_is_not_compressed_again():
+    response = build_app().get("/encoded", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == b"x" * 5000
@@ -0,0 +1,16 @@
+# tests/unit/test_computed_result.py
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, MetaData, String, Table
+
+from app.models.calculation import _result_expression
+from app.models.types import CalculationInputs
+
+
+def test_computed_result_needs_json_or_array_storage():
+    table = Table("calculations", MetaData(), Column("type", String), Column("inputs", CalculationInputs("binary")))
+    calculations = SimpleNamespace(__table__=table, type=table.c.type, inputs=table.c.inputs)
+    with pytest.raises(NotImplementedError, match="binary inputs storage"):
+        _result_expression(calculations)
@@ -0,0 +1,54 @@
+# tests/unit/test_etags.py
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.etags import etag_matches, weak_etag
+from app.schemas.calculation import calculation_etag, calculation_page_etag
+
+
+def test_weak_etag():
+    etag = weak_etag("a", 1)
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert weak_etag("a", 1) == etag
+    assert weak_etag("a", 2) != etag
+    # Parts are separated, so they cannot run into each other
+    assert weak_etag("ab", "c") != weak_etag("a", "bc")
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('"other", W/"abc"', True),
+        ("*", True),
+        ('"other"', False),
+        ('W/"abcd"', False),
+        ("", False),
+    ]
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, ['W/"abc"']) is expected
+
+
+def test_calculation_page_etag():
+    now = datetime(2025, 1, 2, 3, 4, 5, 678901)
+    rows = [SimpleNamespace(id=uuid.uuid4(), updated_at=now, result=1.0) for _ in range(2)]
+    etag = calculation_page_etag(rows, None)
+
+    assert calculation_page_etag(list(rows), None) == etag
+    assert calculation_page_etag(rows[:1], None) != etag
+    assert calculation_page_etag(rows, "next") != etag
+    rows[1].updated_at = now.replace(microsecond=678902)
+    assert calculation_page_etag(rows, None) != etag
+    etag = calculation_page_etag(rows, None)
+    # A backfilled result changes the ETag although updated_at is kept
+    rows[0].result = None
+    assert calculation_page_etag(rows, None) != etag
+
+    assert calculation_etag(rows[0]) != calculation_etag(rows[1])
+    assert calculation_etag(rows[1]) != calculation_etag(SimpleNamespace(id=rows[1].id, updated_at=now, result=2.0))
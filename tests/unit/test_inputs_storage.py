@@ -0,0 +1,96 @@
+# tests/unit/test_inputs_storage.py
+
+import struct
+import uuid
+
+import pytest
+from sqlalchemy import Column, MetaData, Table, create_engine, event, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.crud.calculation import get_inputs_storage, migrate_inputs_storage
+from app.database import Base
+from app.models.calculation import Calculation
+from app.models.types import CalculationInputs, pack_inputs, unpack_inputs
+from app.models.user import User
+
+
+def test_pack_inputs_is_little_endian_float64():
+    assert pack_inputs([1.5, -2]) == struct.pack("<2d", 1.5, -2.0)
+    assert unpack_inputs(pack_inputs([1.5, -2, 1e300])) == [1.5, -2.0, 1e300]
+    assert unpack_inputs(memoryview(pack_inputs([3.25]))) == [3.25]
+
+
+def test_pack_inputs_rejects_non_numbers():
+    with pytest.raises(TypeError):
+        pack_inputs([1, "two"])
+
+
+def test_unknown_storage():
+    with pytest.raises(ValueError, match="Unsupported inputs storage"):
+        CalculationInputs("csv")
+
+
+@pytest.mark.parametrize(
+    "storage, dialect, expected",
+    [
+        ("json", postgresql.dialect(), "JSON"),
+        ("array", postgresql.dialect(), "DOUBLE PRECISION[]"),
+        ("array", sqlite.dialect(), "BLOB"),
+        ("binary", postgresql.dialect(), "BYTEA"),
+    ],
+    ids=["json", "array_postgresql", "array_sqlite", "binary"]
+)
+def test_column_type_per_dialect(storage, dialect, expected):
+    assert CalculationInputs(storage).compile(dialect=dialect) == expected
+
+
+@pytest.mark.parametrize("storage", ["json", "array", "binary"])
+def test_round_trip(storage):
+    engine = create_engine("sqlite://")
+    table = Table("inputs_round_trip", MetaData(), Column("inputs", CalculationInputs(storage)))
+    table.create(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(table), [{"inputs": [1.5, 2, -3]}])
+        assert connection.execute(select(table.c.inputs)).scalar_one() == [1.5, 2, -3]
+
+
+def test_migrate_inputs_storage(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__, Calculation.__table__])
+    user_id = uuid.uuid4()
+    rows = [
+        {"id": uuid.uuid4(), "user_id": user_id, "type": "addition", "inputs": [i, 0.5]}
+        for i in range(25)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(User.__table__).values(id=user_id, username="user", email="user@example.com"))
+        connection.execute(insert(Calculation.__table__), rows)
+
+    assert list(migrate_inputs_storage(engine, "json")) == []
+
+    selects = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT calculations.id, calculations.inputs "):
+            selects.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert list(migrate_inputs_storage(engine, "binary", chunk_size=10)) == [10, 10, 5]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    # Each pass starts at the lowest id, later chunks continue after the
+    # last converted one instead of rescanning it
+    assert ["calculations.id >" in statement for statement in selects] == [False, True, True, True, False]
+    with engine.connect() as connection:
+        assert get_inputs_storage(connection) == "binary"
+        migrated = Table("calculations", MetaData(), Column("id", Calculation.__table__.c.id.type),
+                         Column("inputs", CalculationInputs("binary")))
+        stored = dict(connection.execute(select(migrated.c.id, migrated.c.inputs)).all())
+    assert stored == {row["id"]: [float(value) for value in row["inputs"]] for row in rows}
+
+    assert sum(migrate_inputs_storage(engine, "json")) == 25
+    with engine.connect() as connection:
+        assert get_inputs_storage(connection) == "json"
+        stored = dict(connection.execute(select(Calculation.id, Calculation.inputs)).all())
+    assert stored == {row["id"]: row["inputs"] for row in rows}
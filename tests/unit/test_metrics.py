@@ -0,0 +1,108 @@
+# tests/unit/test_metrics.py
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from starlette.routing import Route
+
+from app.core.metrics import (
+    UNMATCHED_ROUTE,
+    MetricsMiddleware,
+    mark_process_dead,
+    render_metrics,
+    route_label,
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def build_client():
+    # FastAPI (unlike a bare Starlette router) records the matched route in the scope
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return item_id
+
+    @app.get("/fail")
+    def fail():
+        raise RuntimeError("boom")
+
+    app.add_middleware(MetricsMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_route_label():
+    assert route_label({"route": Route("/items/{item_id}", lambda request: None)}) == "/items/{item_id}"
+    assert route_label({}) == UNMATCHED_ROUTE
+
+
+def test_middleware_records_requests_by_route_template():
+    client = build_client()
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    before = sample("http_requests_total", **labels)
+    before_latency = sample("http_request_duration_seconds_count", **labels)
+
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+
+    assert sample("http_requests_total", **labels) == before + 2
+    assert sample("http_request_duration_seconds_count", **labels) == before_latency + 2
+    assert sample("http_requests_in_flight") == 0
+
+
+def test_middleware_records_errors_and_unmatched_routes():
+    client = build_client()
+    failed = {"method": "GET", "route": "/fail", "status": "500"}
+    unmatched = {"method": "GET", "route": UNMATCHED_ROUTE, "status": "404"}
+    before_failed = sample("http_requests_total", **failed)
+    before_unmatched = sample("http_requests_total", **unmatched)
+
+    assert client.get("/fail").status_code == 500
+    assert client.get("/nowhere").status_code == 404
+
+    assert sample("http_requests_total", **failed) == before_failed + 1
+    assert sample("http_requests_total", **unmatched) == before_unmatched + 1
+
+
+def test_middleware_passes_other_scopes_through():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["type"])
+
+    asyncio.run(MetricsMiddleware(app)({"type": "lifespan"}, None, None))
+    assert calls == ["lifespan"]
+
+
+def test_render_metrics(monkeypatch, tmp_path):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    body, content_type = render_metrics()
+    assert content_type.startswith("text/plain")
+    assert b"http_requests_total" in body
+
+    # In multiprocess mode only the files in the directory are aggregated
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    body, _ = render_metrics()
+    assert b"http_requests_total" not in body
+
+
+def test_mark_process_dead(monkeypatch, tmp_path):
+    live = tmp_path / "gauge_livesum_123.db"
+    other = tmp_path / "counter_123.db"
+    live.touch()
+    other.touch()
+
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    mark_process_dead(123)
+    assert live.exists()
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    mark_process_dead(123)
+    # The live gauge values go, the counters keep counting toward the totals
+    assert not live.exists()
+    assert other.exists()
@@ -0,0 +1,75 @@
+# tests/unit/test_operation_cache.py
+
+import pytest  # Import the pytest framework for writing and running tests
+from app.operations import cache as cache_module
+from app.operations.cache import OperationCache
+
+
+# ---------------------------------------------
+# Unit Tests for the 'OperationCache' Class
+# ---------------------------------------------
+
+def test_cache_hit_and_miss() -> None:
+    """
+    Test that a stored value is returned and counted as a hit, and a missing key as a miss.
+    """
+    cache = OperationCache(maxsize=2, ttl=60)
+    assert cache.get(("add", 1.0, 2.0)) is None
+    cache.set(("add", 1.0, 2.0), 3.0)
+    assert cache.get(("add", 1.0, 2.0)) == 3.0
+    assert cache.stats() == {"size": 1, "maxsize": 2, "ttl": 60, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """
+    Test that the least recently used entry is evicted when the cache is full.
+    """
+    cache = OperationCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # 'a' is now more recently used than 'b'
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_cache_entries_expire(monkeypatch) -> None:
+    """
+    Test that entries are no longer returned once their TTL has passed.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = OperationCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+
+    now[0] += 4.9
+    assert cache.get("a") == 1
+    now[0] += 0.2
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_disabled_cache() -> None:
+    """
+    Test that a cache with maxsize 0 stores nothing.
+    """
+    cache = OperationCache(maxsize=0)
+    cache.set("a", 1)
+    assert not cache.enabled
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_clear() -> None:
+    """
+    Test that clear() removes all entries and resets the counters.
+    """
+    cache = OperationCache(maxsize=10)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.clear()
+    assert cache.stats() == {"size": 0, "maxsize": 10, "ttl": 60.0, "hits": 0, "misses": 0, "evictions": 0}
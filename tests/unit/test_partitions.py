@@ -0,0 +1,62 @@
+# tests/unit/test_partitions.py
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.crud.partitions import (
+    _month_start,
+    create_partitioned_table,
+    detach_partition,
+    ensure_partitions,
+    is_partitioned,
+    partition_name,
+    partitioned_table,
+)
+from app.models.calculation import Calculation
+
+
+def test_month_start():
+    assert _month_start(date(2025, 1, 31)) == date(2025, 1, 1)
+    assert _month_start(date(2025, 11, 15), 2) == date(2026, 1, 1)
+    assert _month_start(date(2025, 1, 15), -1) == date(2024, 12, 1)
+    assert _month_start(date(2024, 12, 1), 13) == date(2026, 1, 1)
+
+
+def test_partition_name():
+    assert partition_name(date(2025, 3, 1)) == "calculations_2025_03"
+    assert partition_name(date(999, 12, 1)) == "calculations_0999_12"
+
+
+def test_partitioned_table_ddl():
+    table = partitioned_table()
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    assert "PRIMARY KEY (id, created_at)" in ddl
+    assert "PARTITION BY RANGE (created_at)" in ddl
+    indexes = [str(CreateIndex(index).compile(dialect=postgresql.dialect())) for index in table.indexes]
+    assert any("USING brin (created_at)" in index for index in indexes)
+    # The mapped table is untouched
+    assert [column.name for column in Calculation.__table__.primary_key] == ["id"]
+    assert Calculation.__table__.dialect_options["postgresql"]["partition_by"] is None
+
+
+def test_partitioning_needs_postgresql():
+    with pytest.raises(ValueError, match="needs PostgreSQL"):
+        create_partitioned_table(create_engine("sqlite://"))
+
+
+def test_is_partitioned_needs_postgresql():
+    with create_engine("sqlite://").connect() as connection:
+        assert is_partitioned(connection) is False
+
+
+def test_detach_partition_needs_partitioned_table():
+    with pytest.raises(ValueError, match="is not partitioned"):
+        detach_partition(create_engine("sqlite://"), date(2025, 1, 1))
+
+
+def test_ensure_partitions_without_partitioned_table():
+    assert ensure_partitions(create_engine("sqlite://")) == []
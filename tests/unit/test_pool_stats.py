@@ -0,0 +1,64 @@
+# tests/unit/test_pool_stats.py
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.core.pool_stats import InstrumentedQueuePool, PoolStats, instrument_engine
+
+
+@pytest.fixture
+def pool_engine():
+    """
+    A small instrumented pool (1 connection + 1 overflow) on an in-memory database.
+    """
+    engine = create_engine(
+        "sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_instrumented_pool_records_checkouts(pool_engine):
+    stats = instrument_engine(pool_engine)
+
+    first = pool_engine.connect()
+    second = pool_engine.connect()
+    snapshot = stats.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["connections_opened"] == 2
+    assert snapshot["in_use"] == 2
+    assert snapshot["overflow"] == 1
+
+    # Pool and overflow are exhausted, so the next checkout times out
+    with pytest.raises(exc.TimeoutError):
+        pool_engine.connect()
+    assert stats.snapshot()["timeouts"] == 1
+
+    first.close()
+    second.close()
+    snapshot = stats.snapshot()
+    assert snapshot["in_use"] == 0
+    assert snapshot["in_use_peak"] == 2
+    assert snapshot["overflow_peak"] == 1
+    assert snapshot["wait_seconds_max"] >= snapshot["wait_seconds_avg"] > 0
+
+
+def test_stats_survive_dispose(pool_engine):
+    stats = instrument_engine(pool_engine)
+    pool_engine.dispose()
+
+    with pool_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    snapshot = stats.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["wait_seconds_total"] > 0
+
+
+def test_pool_stats_reset():
+    stats = PoolStats()
+    stats.record_checkout(overflow=0)
+    stats.record_wait(0.5)
+    stats.reset()
+    assert stats.snapshot()["checkouts"] == 0
+    assert stats.snapshot()["wait_seconds_avg"] == 0.0
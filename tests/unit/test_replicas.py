@@ -0,0 +1,94 @@
+# tests/unit/test_replicas.py
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import app.database as database
+from app.core.replicas import ReplicaSet, parse_replica_urls
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def sqlite_engine(path):
+    return create_engine(f"sqlite:///{path}")
+
+
+@pytest.fixture
+def replica_engines(tmp_path):
+    engines = []
+    for name in ("one", "two"):
+        engine = sqlite_engine(tmp_path / f"{name}.db")
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE replica (name TEXT)"))
+            connection.execute(text("INSERT INTO replica VALUES (:name)"), {"name": name})
+        engines.append(engine)
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+def replica_name(connection):
+    with connection:
+        return connection.execute(text("SELECT name FROM replica")).scalar_one()
+
+
+def test_parse_replica_urls():
+    assert parse_replica_urls("") == []
+    assert parse_replica_urls(" postgresql://a/db , ,postgresql://b/db") == ["postgresql://a/db", "postgresql://b/db"]
+
+
+def test_round_robin(replica_engines):
+    replicas = ReplicaSet(replica_engines)
+    assert [replica_name(replicas.connect()) for _ in range(4)] == ["one", "two", "one", "two"]
+
+
+def test_no_replicas():
+    assert ReplicaSet([]).connect() is None
+
+
+def test_unreachable_replica_is_skipped_then_retried(replica_engines, tmp_path):
+    clock = FakeClock()
+    broken = sqlite_engine(tmp_path / "missing" / "replica.db")
+    replicas = ReplicaSet([broken, replica_engines[1]], retry_interval=10, clock=clock)
+
+    assert replica_name(replicas.connect()) == "two"
+    assert not replicas.is_healthy(0)
+    assert [replica_name(replicas.connect()) for _ in range(3)] == ["two"] * 3
+
+    # After the retry interval the replica is tried again and, now that it
+    # can be reached, used in turn
+    (tmp_path / "missing").mkdir()
+    with sqlite_engine(tmp_path / "missing" / "replica.db").begin() as connection:
+        connection.execute(text("CREATE TABLE replica (name TEXT)"))
+        connection.execute(text("INSERT INTO replica VALUES ('recovered')"))
+    clock.now = 10
+    assert {replica_name(replicas.connect()) for _ in range(2)} == {"recovered", "two"}
+    assert replicas.is_healthy(0)
+
+
+def test_all_replicas_down(tmp_path):
+    replicas = ReplicaSet([sqlite_engine(tmp_path / "missing" / "replica.db")])
+    assert replicas.connect() is None
+    assert replicas.connect() is None
+
+
+def test_get_read_db_uses_replica(monkeypatch, replica_engines):
+    monkeypatch.setattr(database, "replicas", ReplicaSet(replica_engines[:1]))
+    sessions = database.get_read_db()
+    db = next(sessions)
+    assert db.execute(text("SELECT name FROM replica")).scalar_one() == "one"
+    sessions.close()
+
+
+def test_get_read_db_falls_back_to_primary(monkeypatch):
+    monkeypatch.setattr(database, "replicas", ReplicaSet([]))
+    sessions = database.get_read_db()
+    db = next(sessions)
+    assert db.get_bind() is database.engine
+    sessions.close()
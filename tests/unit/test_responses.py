@@ -0,0 +1,47 @@
+# tests/unit/test_responses.py
+
+import json
+import math
+import uuid
+from datetime import datetime
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.core import responses
+from app.core.responses import FastJSONResponse, dumps
+
+
+class Item(BaseModel):
+    id: uuid.UUID
+    created_at: datetime
+    values: List[float]
+
+
+def make_item():
+    return Item(id=uuid.uuid4(), created_at=datetime(2025, 1, 2, 3, 4, 5, 678901), values=[1.5, math.nan, -math.inf])
+
+
+@pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "pydantic_core"])
+def test_dumps(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    item = make_item()
+    content = {"id": item.id, "created_at": item.created_at, "values": item.values, "model": item}
+    decoded = json.loads(dumps(content))
+    # Same UUID and datetime formats as FastAPI's jsonable_encoder
+    assert decoded["id"] == jsonable_encoder(item.id)
+    assert decoded["created_at"] == jsonable_encoder(item.created_at) == "2025-01-02T03:04:05.678901"
+    # NaN and infinity are not valid JSON and become null
+    assert decoded["values"] == [1.5, None, None]
+    # Pydantic models are encoded like their model_dump_json()
+    assert decoded["model"] == json.loads(item.model_dump_json())
+
+
+def test_fast_json_response():
+    response = FastJSONResponse({"result": math.inf}, status_code=201)
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert response.body == b'{"result":null}'
@@ -0,0 +1,129 @@
+# tests/unit/test_static_pages.py
+
+import gzip
+
+import brotli
+import pytest
+from starlette.datastructures import Headers
+
+from app.core.static_pages import PrecompressedPage, build_page, minify_html
+
+
+def test_minify_html_removes_comments_and_whitespace():
+    html = """<!DOCTYPE html>
+<!-- page comment -->
+<html>
+    <head>
+        <style>
+            /* heading colour */
+            h1 {
+                color: red; /* inline */
+                background: url(http://example.com/a.png);
+            }
+        </style>
+    </head>
+    <body>
+        <h1>Hello   World</h1>
+        <pre>  keep
+    this  </pre>
+        <script>
+            // Greeting
+            const url = 'ws://' + "/* not a comment */";
+            const text = `line one
+    line two`;  /* trailing */
+            console.log(url, text);
+        </script>
+    </body>
+</html>
+"""
+    assert minify_html(html) == """<!DOCTYPE html>
+<html>
+<head>
+<style>h1 {
+color: red;
+background: url(http://example.com/a.png);
+}</style>
+</head>
+<body>
+<h1>Hello World</h1>
+<pre>  keep
+    this  </pre>
+<script>const url = 'ws://' + "/* not a comment */";
+const text = `line one
+    line two`;
+console.log(url, text);</script>
+</body>
+</html>
+"""
+
+
+def test_build_page(tmp_path):
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "index.html").write_text("<p>{{ 1 + 1 }}</p>  <!-- two -->\n")
+
+    written = build_page(tmp_path / "templates", "index.html", tmp_path / "build")
+    assert sorted(path.name for path in written.values()) == ["index.html", "index.html.br", "index.html.gz"]
+    body = written[None].read_bytes()
+    assert body == b"<p>2</p>\n"
+    assert gzip.decompress(written["gzip"].read_bytes()) == body
+    assert brotli.decompress(written["br"].read_bytes()) == body
+
+
+def test_repository_index_page_shrinks(tmp_path):
+    written = build_page("templates", "index.html", tmp_path)
+    source = open("templates/index.html", "rb").read()
+    body = written[None].read_bytes()
+    assert b"<!--" not in body and b"/*" not in body
+    assert b"async function calculate(operation)" in body
+    assert len(body) < len(source) / 3
+    assert written["br"].stat().st_size < len(body) / 2
+
+
+@pytest.fixture
+def page():
+    return PrecompressedPage({None: b"<p>hi</p>", "gzip": b"gz-bytes", "br": b"br-bytes"}, max_age=60)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding, body",
+    [("gzip, br", "br", b"br-bytes"), ("gzip", "gzip", b"gz-bytes"), ("", None, b"<p>hi</p>")]
+)
+def test_page_response_variants(page, accept_encoding, encoding, body):
+    response = page.response(Headers({"accept-encoding": accept_encoding}))
+    assert response.status_code == 200
+    assert response.body == body
+    assert response.headers.get("content-encoding") == encoding
+    assert response.headers["etag"] == page.etags[encoding]
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.media_type == "text/html"
+
+
+def test_page_etags_are_strong_and_distinct(page):
+    etags = list(page.etags.values())
+    assert len(set(etags)) == 3
+    assert all(etag.startswith('"') and etag.endswith('"') for etag in etags)
+
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", 'W/{etag}', '"other", {etag}', "*", "{gzip_etag}"])
+def test_page_not_modified(page, if_none_match):
+    header = if_none_match.format(etag=page.etags["br"], gzip_etag=page.etags["gzip"])
+    response = page.response(Headers({"accept-encoding": "br", "if-none-match": header}))
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == page.etags["br"]
+
+
+def test_page_modified(page):
+    response = page.response(Headers({"accept-encoding": "br", "if-none-match": '"stale"'}))
+    assert response.status_code == 200
+
+
+def test_from_directory(tmp_path):
+    with pytest.raises(FileNotFoundError, match="build it with scripts/build_index.py"):
+        PrecompressedPage.from_directory(tmp_path)
+    (tmp_path / "index.html").write_bytes(b"<p>hi</p>")
+    (tmp_path / "index.html.gz").write_bytes(b"gz-bytes")
+    page = PrecompressedPage.from_directory(tmp_path)
+    assert page.variants == {None: b"<p>hi</p>", "gzip": b"gz-bytes"}
+    assert page.encodings == ["gzip"]
@@ -0,0 +1,87 @@
+# tests/unit/test_stream.py
+
+import asyncio  # Run the async stream evaluator from synchronous tests
+import json
+import pytest  # Import the pytest framework for writing and running tests
+from app.operations.stream import MAX_LINE_BYTES, evaluate_line, evaluate_ndjson
+
+
+def run_stream(chunks):
+    """
+    Feed the given byte chunks through 'evaluate_ndjson' and return the decoded output lines.
+    """
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [json.loads(line) async for line in evaluate_ndjson(source())]
+
+    return asyncio.run(collect())
+
+
+# ---------------------------------------------
+# Unit Tests for the 'evaluate_line' Function
+# ---------------------------------------------
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (b'{"op": "add", "a": 2, "b": 3}', {"result": 5}),
+        (b'{"op": "divide", "a": 6, "b": 3}', {"result": 2}),
+        (b'{"op": "divide", "a": 6, "b": 0}', {"error": "Cannot divide by zero!"}),
+        (b'{"op": "modulus", "a": 6, "b": 3}', {"error": "op must be one of: add, divide, multiply, subtract"}),
+        (b'{"op": ["add"], "a": 6, "b": 3}', {"error": "op must be one of: add, divide, multiply, subtract"}),
+        (b'{"op": "add", "a": "6", "b": 3}', {"error": "Both a and b must be numbers."}),
+        (b'{"op": "add", "a": true, "b": 3}', {"error": "Both a and b must be numbers."}),
+        (b'{"op": "multiply", "a": 1e308, "b": 10}', {"error": "Result is not a finite number."}),
+        (b'[1, 2]', {"error": "Line must be a JSON object."}),
+        (b'{"op": ', {"error": "Line is not valid JSON."}),
+    ],
+    ids=[
+        "add",
+        "divide",
+        "divide_by_zero",
+        "unsupported_operation",
+        "unhashable_operation",
+        "string_operand",
+        "boolean_operand",
+        "overflow",
+        "not_an_object",
+        "invalid_json",
+    ]
+)
+def test_evaluate_line(line, expected) -> None:
+    """
+    Test that 'evaluate_line' returns a result or an error message for a single line.
+    """
+    assert evaluate_line(line) == expected
+
+
+# ---------------------------------------------
+# Unit Tests for the 'evaluate_ndjson' Function
+# ---------------------------------------------
+
+def test_evaluate_ndjson_lines_split_across_chunks() -> None:
+    """
+    Test that lines split across chunk boundaries are reassembled and blank lines are skipped.
+    """
+    output = run_stream([
+        b'{"op": "add", "a": 1, "b": 2}\n{"op": "sub',
+        b'tract", "a": 5, "b": 3}\n\n',
+        b'{"op": "divide", "a": 1, "b": 0}',  # Last line without trailing newline
+    ])
+
+    assert output == [{"result": 3}, {"result": 2}, {"error": "Cannot divide by zero!"}]
+
+
+def test_evaluate_ndjson_line_too_long() -> None:
+    """
+    Test that an over-long line is reported once and the stream continues with the next line.
+    """
+    output = run_stream([
+        b'{"op": "add", "a": ' + b"1" * (MAX_LINE_BYTES + 1),
+        b'1, "b": 1}\n{"op": "multiply", "a": 2, "b": 4}\n',
+    ])
+
+    assert output == [{"error": "Line is too long."}, {"result": 8}]
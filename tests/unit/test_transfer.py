@@ -0,0 +1,106 @@
+# tests/unit/test_transfer.py
+
+import io
+import struct
+import uuid
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.crud.transfer import (
+    BINARY_SIGNATURE,
+    BINARY_TRAILER,
+    export_table,
+    import_table,
+    split_binary,
+    split_csv,
+)
+from app.models.calculation import Calculation
+from app.models.calculation_stats import CalculationStats
+from app.models.user import User
+
+
+def binary_copy(rows):
+    """
+    Build a file in PostgreSQL's binary COPY format with one int4 field per row.
+    """
+    data = BINARY_SIGNATURE + struct.pack("!ii", 0, 0)
+    for value in rows:
+        data += struct.pack("!hii", 1, 4, value)
+    return data + BINARY_TRAILER
+
+
+def test_split_csv_keeps_quoted_newlines_together():
+    source = io.BytesIO(b'1,"a\nb"\n2,"c""\n""d"\n3,e\n')
+    chunks = list(split_csv(source, 2))
+    assert chunks == [(b'1,"a\nb"\n2,"c""\n""d"\n', 2), (b"3,e\n", 1)]
+
+
+def test_split_csv_unterminated_quote():
+    with pytest.raises(ValueError, match="quoted field"):
+        list(split_csv(io.BytesIO(b'1,"a\n'), 10))
+
+
+def test_split_binary_chunks_are_complete_files():
+    chunks = list(split_binary(io.BytesIO(binary_copy([1, 2, 3])), 2))
+    assert chunks == [(binary_copy([1, 2]), 2), (binary_copy([3]), 1)]
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"not a copy file at all", "Not a PostgreSQL binary COPY file."),
+        (binary_copy([1])[:-4], "truncated"),
+    ],
+    ids=["signature", "truncated"]
+)
+def test_split_binary_invalid(data, message):
+    with pytest.raises(ValueError, match=message):
+        list(split_binary(io.BytesIO(data), 10))
+
+
+def test_round_trip_without_copy(sqlite_engine):
+    source, target = sqlite_engine(), sqlite_engine()
+    user_id = uuid.uuid4()
+    with source.begin() as connection:
+        connection.execute(insert(User.__table__).values(id=user_id, username='odd,"name', email="multi\nline"))
+        connection.execute(insert(Calculation.__table__), [
+            {"id": uuid.uuid4(), "user_id": user_id, "type": "addition", "inputs": [i, 0.1],
+             "result": None if i % 2 else i + 0.1}
+            for i in range(25)
+        ])
+
+    for table_name in ("users", "calculations"):
+        out = io.BytesIO()
+        assert export_table(source, table_name, out, chunk_size=10) == (1 if table_name == "users" else 25)
+        out.seek(0)
+        assert sum(import_table(target, table_name, out, chunk_size=10)) == (1 if table_name == "users" else 25)
+
+    for table in (User.__table__, Calculation.__table__):
+        with source.connect() as a, target.connect() as b:
+            assert sorted(a.execute(select(table)).all()) == sorted(b.execute(select(table)).all())
+
+    # The import rebuilt the statistics of the loaded calculations
+    with target.connect() as connection:
+        stats = connection.execute(select(CalculationStats.__table__)).one()
+    assert (stats.user_id, stats.type, stats.count) == (user_id, "addition", 25)
+    assert stats.total == pytest.approx(sum(i + 0.1 for i in range(0, 25, 2)))
+    assert (stats.minimum, stats.maximum) == (0.1, 24.1)
+
+
+def test_binary_format_needs_postgresql(engine):
+    with pytest.raises(ValueError, match="needs PostgreSQL"):
+        export_table(engine, "users", io.BytesIO(), file_format="binary")
+
+
+@pytest.mark.parametrize(
+    "table_name, data, message",
+    [
+        ("accounts", b"id\n", "Unknown table: accounts"),
+        ("users", b"", "no header line"),
+        ("users", b"id,password\n", "Unknown columns in CSV header: password"),
+    ]
+)
+def test_import_invalid(engine, table_name, data, message):
+    with pytest.raises(ValueError, match=message):
+        list(import_table(engine, table_name, io.BytesIO(data)))
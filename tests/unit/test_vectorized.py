@@ -0,0 +1,165 @@
+# tests/unit/test_vectorized.py
+
+import math
+import random
+import uuid
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.models.calculation import Addition, Calculation, Division, Multiplication, Subtraction
+from app.operations.vectorized import reduce_inputs, reduce_ragged
+
+CALCULATION_TYPES = ["addition", "subtraction", "multiplication", "division"]
+CALCULATION_CLASSES = {
+    "addition": Addition,
+    "subtraction": Subtraction,
+    "multiplication": Multiplication,
+    "division": Division,
+}
+
+
+def loop_result(calculation_type, inputs):
+    """
+    Compute a result with the models' get_result() (below the default threshold this is the Python loop).
+    """
+    calculation = CALCULATION_CLASSES[calculation_type](user_id=uuid.uuid4(), inputs=inputs)
+    return calculation.get_result()
+
+
+@pytest.fixture
+def inputs():
+    rng = random.Random(601)
+    return [rng.uniform(0.5, 1.5) for _ in range(5000)]
+
+
+@pytest.mark.parametrize("calculation_type", CALCULATION_TYPES)
+def test_exact_order_matches_loop_or_defers(calculation_type, inputs):
+    result = reduce_inputs(calculation_type, inputs, exact=True)
+    if calculation_type in ("subtraction", "division"):
+        assert result is None  # No faster exact formulation; the loop is used
+    else:
+        assert result == loop_result(calculation_type, inputs)
+
+
+@pytest.mark.parametrize("calculation_type", CALCULATION_TYPES)
+def test_fast_mode_matches_loop(calculation_type, inputs):
+    fast = reduce_inputs(calculation_type, inputs, exact=False)
+    assert math.isclose(fast, loop_result(calculation_type, inputs), rel_tol=1e-9)
+
+
+def test_fast_division_defers_when_product_overflows():
+    assert reduce_inputs("division", [1e300, 1e200, 1e200], exact=False) is None
+
+
+def test_division_by_zero_list_defers_to_loop():
+    assert reduce_inputs("division", [1.0, 2.0, 0.0, 4.0], exact=False) is None
+
+
+def test_integer_lists_stay_exact():
+    big = 10 ** 30
+    assert reduce_inputs("addition", [big, 1]) == big + 1
+    assert reduce_inputs("subtraction", [big, 1], exact=False) == big - 1
+    assert reduce_inputs("multiplication", [big, big]) == big * big
+
+
+@pytest.mark.parametrize(
+    "inputs",
+    [np.array([1.0, 2.0]), (1.0, 2.0)],
+    ids=["array", "tuple"]
+)
+def test_unsupported_containers_are_not_vectorized(inputs):
+    assert reduce_inputs("multiplication", inputs) is None
+
+
+def test_unsupported_type():
+    with pytest.raises(ValueError, match="Unsupported calculation type"):
+        reduce_inputs("modulus", [1.0, 2.0])
+
+
+@pytest.mark.parametrize("calculation_type", ["subtraction", "multiplication", "division"])
+def test_get_result_uses_vectorized_path_above_threshold(calculation_type, inputs, monkeypatch):
+    from app.models import calculation as calculation_module
+
+    expected = loop_result(calculation_type, inputs)
+    calls = []
+
+    def spy(*args, **kwargs):
+        calls.append(args[0])
+        return reduce_inputs(*args, **kwargs)
+
+    monkeypatch.setattr(calculation_module, "reduce_inputs", spy)
+    monkeypatch.setattr(settings, "VECTORIZE_THRESHOLD", 100)
+    assert math.isclose(loop_result(calculation_type, inputs), expected, rel_tol=1e-9)
+    assert calls == [calculation_type]
+
+    # Below the threshold the loop is used
+    loop_result(calculation_type, inputs[:99])
+    assert calls == [calculation_type]
+
+
+def test_get_result_vectorized_division_by_zero(monkeypatch):
+    monkeypatch.setattr(settings, "VECTORIZE_THRESHOLD", 2)
+    with pytest.raises(ValueError, match="Cannot divide by zero."):
+        loop_result("division", [1.0, 0.0, 2.0])
+
+
+def test_compute_results_reports_invalid_items(monkeypatch):
+    monkeypatch.setattr(settings, "VECTORIZE_THRESHOLD", 3)
+    results, errors = Calculation.compute_results([
+        ("modulus", [1, 2]),
+        ("addition", (1, 2)),
+        ("addition", [1]),
+        ("division", [1, 0, 2]),  # At the threshold: computed by get_result()
+        ("division", [8, 2]),
+        ("division", [1, "x"]),  # Not numbers: computed by get_result()
+    ])
+    assert results == [None, None, None, None, 4.0, None]
+    assert "unsupported operand" in errors.pop(5)
+    assert errors == {
+        0: "Unsupported calculation type: modulus",
+        1: "Inputs must be a list of numbers.",
+        2: "Inputs must be a list with at least two numbers.",
+        3: "Cannot divide by zero.",
+    }
+
+
+def ragged(rows):
+    """
+    Flatten rows of inputs into (values, offsets) for reduce_ragged().
+    """
+    lengths = [len(row) for row in rows]
+    offsets = np.concatenate([[0], np.cumsum(lengths[:-1])]).astype(np.intp)
+    return np.array([value for row in rows for value in row]), offsets
+
+
+@pytest.fixture
+def rows():
+    rng = random.Random(12)
+    return [[rng.uniform(-10, 10) for _ in range(rng.randint(2, 300))] for _ in range(200)]
+
+
+@pytest.mark.parametrize("calculation_type", CALCULATION_TYPES)
+def test_reduce_ragged_exact_matches_loop(calculation_type, rows):
+    results, zero_division = reduce_ragged(calculation_type, *ragged(rows), exact=True)
+    assert results.tolist() == [loop_result(calculation_type, row) for row in rows]
+    assert not zero_division.any()
+
+
+def test_reduce_ragged_fast_addition(rows):
+    results, _ = reduce_ragged("addition", *ragged(rows), exact=False)
+    expected = [loop_result("addition", row) for row in rows]
+    assert all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9) for a, b in zip(results, expected))
+
+
+def test_reduce_ragged_flags_zero_divisors():
+    rows = [[0.0, 2.0], [4.0, 0.0, 2.0], [8.0, 2.0, 2.0], [1.0, 1.0, 0.0]]
+    results, zero_division = reduce_ragged("division", *ragged(rows))
+    assert zero_division.tolist() == [False, True, False, True]
+    assert results[[0, 2]].tolist() == [0.0, 2.0]
+
+
+def test_reduce_ragged_unsupported_type():
+    with pytest.raises(ValueError, match="Unsupported calculation type"):
+        reduce_ragged("modulus", *ragged([[1.0, 2.0]]))